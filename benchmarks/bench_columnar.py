@@ -0,0 +1,147 @@
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.catalog import make_market
+from services.columnar import (build_market_columns, vehicle_row, _price_value,
+                               STATUS_MISSING, STATUS_OPTIONAL, PRICE_MISSING)
+
+# Run from the repository root:
+#   python -m benchmarks.bench_columnar --sizes 100x200,400x600
+#
+# Builds one market of VEHICLESxFEATURES cells, then measures the memory the
+# columnar model adds on top of the nested-dict JSON snapshot (the app keeps
+# both), checks that the model holds every cell by converting it back to the
+# same JSON, and times "all options for vehicle X" on each form.
+
+def traced(fn, *args):
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        allocated = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, allocated
+
+def market_to_json(columns):
+    # The market's JSON rebuilt from the model, to check it lost no cell.
+    vehicles = columns['vehicles']
+    features = columns['features']
+    labels = columns['statusLabels']
+    status = columns['status']
+    kinds = columns['priceKinds']
+
+    matrix = {}
+    matrix_vehicles = columns['matrixVehicles'].tolist()
+    for col in columns['matrixFeatures'].tolist():
+        codes = status[matrix_vehicles, col].tolist()
+        matrix[features[col]] = {
+            vehicles[row]: labels[code]
+            for row, code in zip(matrix_vehicles, codes) if code != STATUS_MISSING
+        }
+
+    feature_prices = {}
+    price_vehicles = columns['priceVehicles'].tolist()
+    for col in columns['priceFeatures'].tolist():
+        cell_kinds = kinds[price_vehicles, col].tolist()
+        feature_prices[features[col]] = {
+            vehicles[row]: _price_value(columns, row, col, kind)
+            for row, kind in zip(price_vehicles, cell_kinds) if kind != PRICE_MISSING
+        }
+
+    availability_data = {
+        'features': list(columns['availabilityFeatures']),
+        'vehicles': list(columns['availabilityVehicles']),
+        'matrix': matrix
+    }
+    pricing_data = {
+        'vehicles': [dict(v) for v in columns['pricingVehicles']],
+        'featurePrices': feature_prices
+    }
+    return availability_data, pricing_data
+
+def vehicle_options(columns, vehicle_id):
+    # Optional features for one vehicle with their numeric price (0 where the
+    # price is not a number): a boolean mask over the vehicle's row.
+    row = vehicle_row(columns, vehicle_id)
+    if row is None:
+        return []
+    cols = np.flatnonzero(columns['status'][row] == STATUS_OPTIONAL)
+    prices = np.nan_to_num(columns['prices'][row, cols], nan=0.0)
+    features = columns['features']
+    return [(features[col], price) for col, price in zip(cols.tolist(), prices.tolist())]
+
+def dict_options(availability_data, pricing_data, vehicle_id):
+    prices = pricing_data['featurePrices']
+    options = []
+    for feature, statuses in availability_data['matrix'].items():
+        if statuses.get(vehicle_id) == 'O':
+            price = prices.get(feature, {}).get(vehicle_id)
+            options.append((feature, price if isinstance(price, (int, float)) else 0.0))
+    return options
+
+def run(sizes):
+    results = []
+    for vehicle_count, feature_count in sizes:
+        text = json.dumps(make_market(vehicle_count, feature_count))
+        (availability_data, pricing_data), dict_bytes = traced(json.loads, text)
+        columns, columnar_bytes = traced(build_market_columns, availability_data, pricing_data)
+
+        round_trip = json.dumps(list(market_to_json(columns))) == text
+
+        vehicles = availability_data['vehicles']
+        start = time.perf_counter()
+        for vehicle_id in vehicles:
+            dict_options(availability_data, pricing_data, vehicle_id)
+        dict_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for vehicle_id in vehicles:
+            vehicle_options(columns, vehicle_id)
+        columnar_seconds = time.perf_counter() - start
+
+        entry = {
+            'vehicles': vehicle_count,
+            'features': feature_count,
+            'cells': vehicle_count * feature_count,
+            'dictBytes': dict_bytes,
+            'columnarBytes': columnar_bytes,
+            'totalBytes': dict_bytes + columnar_bytes,
+            'dictOptionsSeconds': dict_seconds,
+            'columnarOptionsSeconds': columnar_seconds,
+            'roundTrip': round_trip
+        }
+        results.append(entry)
+        print(format_entry(entry))
+    return results
+
+def format_entry(entry):
+    line = (
+        f"{entry['vehicles']:>6}x{entry['features']:<6} snapshot {entry['dictBytes'] / 1e6:7.1f} MB"
+        f"  + columnar {entry['columnarBytes'] / 1e6:6.1f} MB = {entry['totalBytes'] / 1e6:7.1f} MB"
+        f"  options/vehicle dicts {entry['dictOptionsSeconds']:.3f}s columnar {entry['columnarOptionsSeconds']:.3f}s"
+    )
+    if not entry['roundTrip']:
+        line += "  ROUND TRIP DIFFERS"
+    return line
+
+def parse_sizes(value):
+    return [tuple(int(n) for n in size.split('x')) for size in value.split(',')]
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Benchmark the columnar availability/price model')
+    arg_parser.add_argument('--sizes', default='100x200,400x600', help='Comma-separated VEHICLESxFEATURES market sizes')
+    arg_parser.add_argument('--output', help='Write results as JSON to this file')
+    args = arg_parser.parse_args()
+
+    results = run(parse_sizes(args.sizes))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if any(not r['roundTrip'] for r in results):
+        raise SystemExit('Columnar model does not convert back to the same JSON')
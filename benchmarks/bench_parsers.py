@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.catalog import save_sheet
+from services.parser import parse_availability_file, parse_pricing_file, parse_tech_file
+
+# Run from the repository root:
+#   python -m benchmarks.bench_parsers --sizes 50x20,200x50,500x100
+#
+# Each generated sheet is parsed with the original per-cell pandas loops
+# (reproduced below), the vectorized pandas path and the streaming path.
+# The vectorized path must match the original output exactly; the streaming
+# path is only reported, since it keeps numeric text as written ("185")
+# where pandas infers a float column ("185.0"), and keeps whole-number base
+# prices the original parser turned into 0 (see services/parser.py).
+
+def legacy_parse_availability_file(file_path):
+    df = pd.read_excel(file_path, engine='openpyxl')
+    features = [f for f in df.iloc[:, 0].tolist() if pd.notna(f) and f != '']
+    vehicles = df.columns[1:].tolist()
+    matrix = {}
+    for idx, feature in enumerate(features):
+        matrix[feature] = {}
+        for vehicle in vehicles:
+            value = df.iloc[idx][vehicle]
+            matrix[feature][vehicle] = str(value).strip() if pd.notna(value) else "NA"
+    return {"features": features, "vehicles": vehicles, "matrix": matrix}
+
+def legacy_parse_pricing_file(file_path, market):
+    df = pd.read_excel(file_path, engine='openpyxl')
+    vehicles = []
+    feature_prices = {}
+    for col in df.columns[1:]:
+        base_price_row = df[df.iloc[:, 0] == 'Base Price']
+        if not base_price_row.empty:
+            base_price = base_price_row[col].values[0]
+            if pd.notna(base_price):
+                vehicles.append({
+                    "id": col,
+                    "basePrice": float(base_price) if isinstance(base_price, (int, float)) else 0
+                })
+    for idx, row in df.iterrows():
+        feature_name = row.iloc[0]
+        if pd.notna(feature_name) and feature_name != 'Base Price':
+            feature_prices[feature_name] = {}
+            for col in df.columns[1:]:
+                value = row[col]
+                if pd.notna(value):
+                    try:
+                        feature_prices[feature_name][col] = float(value)
+                    except:
+                        feature_prices[feature_name][col] = "NA"
+                else:
+                    feature_prices[feature_name][col] = "NA"
+    return {"vehicles": vehicles, "featurePrices": feature_prices}
+
+def legacy_parse_tech_file(file_path):
+    df = pd.read_excel(file_path, engine='openpyxl')
+    engines = df.columns[1:].tolist()
+    params = [p for p in df.iloc[:, 0].tolist() if pd.notna(p) and p != '']
+    table = {}
+    for idx, param in enumerate(params):
+        table[param] = {}
+        for engine in engines:
+            value = df.iloc[idx][engine]
+            table[param][engine] = str(value) if pd.notna(value) else "N/A"
+    return {"engines": engines, "params": params, "table": table}
+
+def sheet_rows(kind, rows, cols, seed=0):
+    rng = random.Random(seed)
+    yield ['Feature'] + [f"Falcon | Engine {c % 7} | Body {c % 3} | Trim {c}" for c in range(cols)]
+
+    if kind == 'pricing':
+        yield ['Base Price'] + [float(18000 + 250 * c) for c in range(cols)]
+
+    for r in range(rows):
+        if kind == 'availability':
+            values = [rng.choice(['S', 'O', 'NA', None]) for _ in range(cols)]
+        elif kind == 'pricing':
+            # Every fourth column holds only whole numbers, which pandas reads
+            # as an int64 column rather than float or object.
+            values = [rng.choice([0, 350, 1200]) if c % 4 == 3 else rng.choice([0.0, 350.0, 1200.5, 'NA', None]) for c in range(cols)]
+        else:
+            values = [rng.choice(['185', '9.8', '450', 'N/A', None]) for _ in range(cols)]
+        yield [f"Row {r}"] + values
+
+def write_sheet(path, kind, rows, cols, seed=0):
+    save_sheet(path, sheet_rows(kind, rows, cols, seed))
+
+PARSERS = {
+    'availability': (legacy_parse_availability_file, parse_availability_file, ()),
+    'pricing': (legacy_parse_pricing_file, parse_pricing_file, ('UK',)),
+    'tech': (legacy_parse_tech_file, parse_tech_file, ())
+}
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def run(sizes, skip_legacy=False):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows, cols in sizes:
+            for kind, (legacy, parse, extra) in PARSERS.items():
+                path = os.path.join(tmp, f"{kind}_{rows}x{cols}.xlsx")
+                write_sheet(path, kind, rows, cols)
+
+                vectorized, vectorized_time = timed(parse, path, *extra, engine='pandas')
+                streamed, stream_time = timed(parse, path, *extra, engine='stream')
+                expected = json.dumps(vectorized)
+
+                entry = {
+                    'parser': kind,
+                    'rows': rows,
+                    'cols': cols,
+                    'cells': rows * cols,
+                    'pandasSeconds': vectorized_time,
+                    'streamSeconds': stream_time,
+                    'streamMatches': json.dumps(streamed) == expected
+                }
+
+                if not skip_legacy:
+                    baseline, legacy_time = timed(legacy, path, *extra)
+                    entry['legacySeconds'] = legacy_time
+                    entry['pandasMatches'] = json.dumps(baseline) == expected
+                    entry['speedup'] = legacy_time / vectorized_time if vectorized_time else None
+
+                results.append(entry)
+                print(format_entry(entry))
+    return results
+
+def format_entry(entry):
+    line = f"{entry['parser']:<13}{entry['rows']:>6}x{entry['cols']:<5} pandas {entry['pandasSeconds']:.3f}s  stream {entry['streamSeconds']:.3f}s"
+    if 'legacySeconds' in entry:
+        line += f"  legacy {entry['legacySeconds']:.3f}s  speedup x{entry['speedup']:.1f}"
+        if not entry['pandasMatches']:
+            line += "  PANDAS OUTPUT DIFFERS"
+    if not entry['streamMatches']:
+        line += "  (stream output differs)"
+    return line
+
+def parse_sizes(value):
+    return [tuple(int(n) for n in size.split('x')) for size in value.split(',')]
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Benchmark the workbook parsers')
+    arg_parser.add_argument('--sizes', default='50x20,200x50,500x100', help='Comma-separated ROWSxCOLS sheet sizes')
+    arg_parser.add_argument('--skip-legacy', action='store_true', help='Do not time the original per-cell implementation')
+    arg_parser.add_argument('--output', help='Write results as JSON to this file')
+    args = arg_parser.parse_args()
+
+    results = run(parse_sizes(args.sizes), args.skip_legacy)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    mismatches = [r for r in results if r.get('pandasMatches') is False]
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} parser outputs differ from the reference")
@@ -0,0 +1,304 @@
+import argparse
+import copy
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.catalog import make_catalog, write_workbooks
+
+# Run from the repository root:
+#   python -m benchmarks.bench_suite --markets 3 --trims 200 --features 100 --output before.json
+#   python -m benchmarks.bench_suite --markets 3 --trims 200 --features 100 --compare before.json
+#
+# Generates a synthetic catalog (benchmarks/catalog.py) in a temp folder,
+# points the app at it and times config loading, the catalog build,
+# validation, diffing, the rule-based editor, the three parsers and every
+# /api/* route through the Flask test client. Cached GET routes are timed
+# twice: with the response cache dropped before each call ("uncached", the
+# cost of building the payload) and warm. Routes the suite has no request
+# for are listed under "notCovered" so new endpoints do not go unmeasured.
+# Results are JSON keyed by benchmark name; --compare prints the ratio of
+# each median to an earlier results file.
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def measure(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'repeat': repeat}
+
+def prepare_app(folder, config, backend):
+    import main
+    from services import config_store, drafts, history, jobs
+
+    config_file = os.path.join(folder, 'config.json')
+    with open(config_file, 'w') as f:
+        json.dump(config, f, indent=2)
+
+    main.CONFIG_FILE = config_file
+    main.CONFIG_BACKEND = backend
+    main.CONFIG_DB = os.path.join(folder, 'config.db')
+    main.storage_ready = False
+    main.app.config['UPLOAD_FOLDER'] = os.path.join(folder, 'uploads')
+    jobs.JOBS_FOLDER = os.path.join(folder, 'jobs')
+    history.HISTORY_FOLDER = os.path.join(folder, 'history')
+    drafts.set_store(drafts.create_store('memory'))
+
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session['is_author'] = True
+    return main, config_store, client
+
+def wait_for_job(client, response):
+    url = response.get_json()['statusUrl']
+    while True:
+        job = client.get(url).get_json()
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.005)
+
+def check(response, *statuses):
+    if response.status_code not in (statuses or (200,)):
+        raise RuntimeError(f"{response.request.method} {response.request.path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+def route_requests(ctx):
+    # name -> (callable, cached). Each callable issues one request and
+    # consumes the whole body, so streamed responses are timed in full.
+    client = ctx['client']
+    market = ctx['market']
+    vehicle = ctx['vehicle']
+    feature = ctx['feature']
+
+    def get(url):
+        return lambda: check(client.get(url)).get_data()
+
+    def post(url, payload=None, *statuses):
+        return lambda: check(client.post(url, json=payload or {}), *statuses).get_data()
+
+    def upload():
+        with open(ctx['workbooks'][f"pricing_{market}.xlsx"], 'rb') as f:
+            data = {'file': (io.BytesIO(f.read()), f"pricing_{market}.xlsx")}
+        return wait_for_job(client, check(client.post('/api/author/upload', data=data, content_type='multipart/form-data'), 202))
+
+    def bulk_upload():
+        files = []
+        for name in (f"availability_{market}.xlsx", f"pricing_{market}.xlsx", 'technical.xlsx'):
+            with open(ctx['workbooks'][name], 'rb') as f:
+                files.append((io.BytesIO(f.read()), name))
+        wait_for_job(client, check(client.post('/api/author/upload/bulk', data={'files': files}, content_type='multipart/form-data'), 202))
+
+    def ai_edit_then_save():
+        check(client.post('/api/author/ai-edit', json={'instructions': f"+1% on all {market} options"}))
+        check(client.post('/api/author/save'))
+
+    def latest_revision():
+        return client.get('/api/author/versions?limit=1').get_json()['versions'][0]['revision']
+
+    batch = {'quotes': [{'market': market, 'vehicle': v, 'features': ctx['options'].get(v, [])[:3]} for v in ctx['vehicles'][:100]]}
+
+    return {
+        'GET /api': (get('/api'), False),
+        'GET /api/markets': (get('/api/markets'), True),
+        'GET /api/vehicles': (get(f'/api/vehicles?market={market}'), True),
+        'GET /api/features': (get(f'/api/features?market={market}'), True),
+        'GET /api/availability (matrix)': (get(f'/api/availability?market={market}'), True),
+        'GET /api/availability (vehicle)': (get(f'/api/availability?market={market}&vehicle={vehicle}'), True),
+        'GET /api/pricing (market)': (get(f'/api/pricing?market={market}'), True),
+        'GET /api/pricing (vehicle)': (get(f'/api/pricing?market={market}&vehicle={vehicle}'), True),
+        'GET /api/tech': (get('/api/tech'), True),
+        'GET /api/tech (vehicle)': (get(f'/api/tech?vehicle={vehicle}'), True),
+        'GET /api/tech (imperial)': (get(f'/api/tech?market=US&vehicle={vehicle}'), True),
+        'GET /api/vehicle-bundle': (get(f'/api/vehicle-bundle?market={market}&vehicle={vehicle}'), True),
+        'GET /api/search': (get(f'/api/search?market={market}&standard={feature}&maxPrice=40000&sort=price'), True),
+        'GET /api/export (csv)': (get(f'/api/export?market={market}&format=csv'), False),
+        'GET /api/export (ndjson)': (get(f'/api/export?market={market}&format=ndjson'), False),
+        'GET /api/export (xlsx)': (get(f'/api/export?market={market}&format=xlsx'), False),
+        'POST /api/quote': (post('/api/quote', {'market': market, 'vehicle': vehicle, 'features': ctx['options'].get(vehicle, [])[:3]}), False),
+        'POST /api/quote/batch': (post('/api/quote/batch', batch), False),
+        'GET /api/author/status': (get('/api/author/status'), False),
+        'GET /api/author/export': (get('/api/author/export'), False),
+        'GET /api/author/versions': (get('/api/author/versions'), False),
+        'GET /api/author/versions/<revision>/diff': (lambda: check(client.get(f'/api/author/versions/{latest_revision()}/diff')).get_data(), False),
+        'GET /api/author/jobs/<job_id>': (get(f"/api/author/jobs/{ctx['jobId']}"), False),
+        'GET /api/author/profiles': (get('/api/author/profiles'), False),
+        'GET /api/author/profiles/<profile_id>': (get(f"/api/author/profiles/{ctx['profileId']}"), False),
+        'GET /api/author/profiles/<profile_id> (text)': (get(f"/api/author/profiles/{ctx['profileId']}?format=text"), False),
+        'POST /api/author/ai-edit': (post('/api/author/ai-edit', {'instructions': f"+2% on all {market} options"}), False),
+        'POST /api/author/discard': (post('/api/author/discard'), False),
+        'POST /api/author/save': (ai_edit_then_save, False),
+        'POST /api/author/versions/<revision>/rollback': (lambda: check(client.post(f'/api/author/versions/{latest_revision()}/rollback')).get_data(), False),
+        'POST /api/author/upload': (upload, False),
+        'POST /api/author/upload/bulk': (bulk_upload, False)
+    }
+
+def covered_rule(name):
+    return name.split(' ')[1]
+
+def run(args):
+    from services.catalog import build_catalog
+    from services.validators import validate_config, validate_market
+    from services.ai_edit import generate_diff, apply_ai_edit_stub
+    from services.parser import parse_availability_file, parse_pricing_file, parse_tech_file
+
+    config = make_catalog(args.markets, args.trims, args.features, args.params, args.engines, args.seed)
+    market = config['markets'][0]
+    results = {}
+
+    def record(name, stats):
+        results[name] = stats
+        print(format_entry(name, stats))
+
+    with tempfile.TemporaryDirectory() as folder:
+        workbooks = write_workbooks(config, os.path.join(folder, 'workbooks'))
+        main, config_store, client = prepare_app(folder, config, args.backend)
+
+        def republish():
+            with open(main.CONFIG_FILE, 'r') as f:
+                config_store.write_atomic(main.CONFIG_FILE, f.read())
+
+        if args.backend == 'json':
+            record('load_config (cold)', measure(main.load_config, args.repeat, setup=republish))
+        record('load_config (warm)', measure(main.load_config, args.repeat))
+
+        loaded = main.load_config()
+        record('build_catalog', measure(lambda: build_catalog(loaded), args.repeat))
+        record('validate_config (cached)', measure(lambda: validate_config(loaded), args.repeat))
+        record('validate_market (all markets)', measure(
+            lambda: [validate_market(m, loaded['availability'][m], loaded['pricing'].get(m, {})) for m in loaded['availability']],
+            args.repeat))
+
+        edited = apply_ai_edit_stub(loaded, f"+5% on all {market} options\nincrease base price by 500 for all {market} trims")['config']
+        record('generate_diff', measure(lambda: generate_diff(loaded, edited), args.repeat))
+        record('apply_ai_edit_stub', measure(lambda: apply_ai_edit_stub(loaded, f"+5% on all {market} options"), args.repeat))
+        record('apply_ai_edit_stub (deep copy)', measure(lambda: apply_ai_edit_stub(copy.deepcopy(loaded), f"+5% on all {market} options"), args.repeat))
+
+        for engine in ('stream', 'pandas'):
+            record(f'parse_availability_file ({engine})', measure(
+                lambda: parse_availability_file(workbooks[f"availability_{market}.xlsx"], engine=engine), args.repeat))
+            record(f'parse_pricing_file ({engine})', measure(
+                lambda: parse_pricing_file(workbooks[f"pricing_{market}.xlsx"], market, engine=engine), args.repeat))
+            record(f'parse_tech_file ({engine})', measure(
+                lambda: parse_tech_file(workbooks['technical.xlsx'], engine=engine), args.repeat))
+
+        vehicles = loaded['availability'][market]['vehicles']
+        matrix = loaded['availability'][market]['matrix']
+        ctx = {
+            'client': client,
+            'market': market,
+            'vehicle': vehicles[0],
+            'vehicles': vehicles,
+            'feature': next(iter(matrix)),
+            'options': {v: [f for f, statuses in matrix.items() if statuses.get(v) == 'O'] for v in vehicles[:100]},
+            'workbooks': workbooks,
+            'jobId': None,
+            'profileId': None
+        }
+
+        # Seed one saved version, one finished job and one request profile
+        # for the routes that read them.
+        requests = route_requests(ctx)
+        requests['POST /api/author/save'][0]()
+        ctx['jobId'] = requests['POST /api/author/upload'][0]()['id']
+        ctx['profileId'] = check(client.get(f'/api/vehicles?market={market}&profile=1')).headers['X-Profile-Id']
+        requests = route_requests(ctx)
+
+        selected = [name for name in requests if not args.only or any(term in name for term in args.only)]
+        for name in selected:
+            fn, cached = requests[name]
+            fn()
+            if cached:
+                record(f'{name} (uncached)', measure(fn, args.repeat, setup=main.response_cache.invalidate))
+                record(f'{name} (cached)', measure(fn, args.repeat))
+            else:
+                record(name, measure(fn, args.route_repeat if 'upload' in name or 'xlsx' in name else args.repeat))
+
+        rules = sorted({rule.rule for rule in main.app.url_map.iter_rules() if rule.rule.startswith('/api')})
+        covered = {covered_rule(name).split('?')[0] for name in requests}
+        covered = {rule.replace('<int:', '<') for rule in covered}
+        not_covered = [rule for rule in rules if rule.replace('<int:', '<') not in covered]
+        if not_covered:
+            print(f"Not covered: {', '.join(not_covered)}")
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'backend': args.backend,
+            'markets': args.markets,
+            'trims': args.trims,
+            'features': args.features,
+            'params': args.params,
+            'engines': args.engines,
+            'repeat': args.repeat
+        },
+        'results': results,
+        'notCovered': not_covered
+    }
+
+def format_entry(name, stats):
+    return f"{name:<58} median {stats['median'] * 1000:10.3f} ms  min {stats['min'] * 1000:10.3f} ms"
+
+def compare(report, baseline, threshold):
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+    for name, stats in report['results'].items():
+        old = baseline['results'].get(name)
+        if not old or not old['median']:
+            print(f"{name:<58} new")
+            continue
+        ratio = stats['median'] / old['median']
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            flag = '  faster'
+        print(f"{name:<58} x{ratio:6.2f}{flag}")
+    return regressions
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Benchmark config loading, services and every API route on a synthetic catalog')
+    arg_parser.add_argument('--markets', type=int, default=3)
+    arg_parser.add_argument('--trims', type=int, default=200, help='Vehicles per market')
+    arg_parser.add_argument('--features', type=int, default=100)
+    arg_parser.add_argument('--params', type=int, default=12, help='Tech parameters')
+    arg_parser.add_argument('--engines', type=int, help='Distinct engines (default: trims / 10)')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark')
+    arg_parser.add_argument('--route-repeat', type=int, default=2, help='Timed runs for uploads and XLSX export')
+    arg_parser.add_argument('--only', nargs='*', help='Only run routes whose name contains one of these')
+    arg_parser.add_argument('--output', help='Write results as JSON to this file')
+    arg_parser.add_argument('--compare', help='Earlier results file to compare medians against')
+    arg_parser.add_argument('--threshold', type=float, default=1.25, help='Median ratio reported as a regression')
+    arg_parser.add_argument('--fail-on-regression', action='store_true')
+    args = arg_parser.parse_args()
+
+    report = run(args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            raise SystemExit(f"{len(regressions)} benchmarks slower than x{args.threshold}")
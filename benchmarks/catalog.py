@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import random
+
+from openpyxl import Workbook
+
+# Synthetic catalogs in the shape the parsers produce, scaled by markets,
+# trims per market, features and tech params, plus the matching .xlsx
+# workbooks so the same catalog can be pushed through the upload path.
+#
+#   python -m benchmarks.catalog --markets 5 --trims 400 --features 200 --params 20 --output /tmp/catalog
+#
+# writes /tmp/catalog/config.json and one availability/pricing workbook per
+# market plus technical.xlsx.
+
+MARKET_CODES = ['UK', 'EU', 'US']
+
+BASE_PARAMS = [
+    ('Top Speed (km/h)', 150, 260, 0),
+    ('0-100 km/h (s)', 3, 12, 1),
+    ('Power (hp)', 90, 600, 0),
+    ('Torque (Nm)', 120, 900, 0),
+    ('CO2 Emissions (g/km)', 0, 220, 0),
+    ('Fuel Consumption (l/100km)', 1, 10, 1),
+    ('Battery Capacity (kWh)', 10, 110, 1),
+    ('Electric Range (km)', 40, 650, 0)
+]
+
+def market_codes(count):
+    return (MARKET_CODES + [f"M{i:02d}" for i in range(len(MARKET_CODES), count)])[:count]
+
+def engine_names(count):
+    return [f"{1 + i % 4}.{i % 10}L Engine {i}" for i in range(count)]
+
+def make_market(vehicle_count, feature_count, seed=0, engines=None):
+    # One market's availability and pricing sections. Without engines every
+    # vehicle gets its own engine name, which is what the columnar benchmark
+    # measures against.
+    rng = random.Random(seed)
+    if engines:
+        vehicles = [
+            f"Falcon {i % 7} | {engines[i % len(engines)]} | Body {i % 5} | Trim {i}"
+            for i in range(vehicle_count)
+        ]
+    else:
+        vehicles = [
+            f"Falcon {i % 7} | {1 + i % 4}.{i % 10}L Engine {i} | Body {i % 5} | Trim {i % 9}"
+            for i in range(vehicle_count)
+        ]
+    features = [f"Feature {j} Package" for j in range(feature_count)]
+
+    matrix = {}
+    feature_prices = {}
+    for feature in features:
+        statuses = {vehicle: rng.choice(['S', 'O', 'NA']) for vehicle in vehicles}
+        matrix[feature] = statuses
+        feature_prices[feature] = {
+            vehicle: 0 if status == 'S' else ('NA' if status == 'NA' else float(rng.randint(100, 4000)))
+            for vehicle, status in statuses.items()
+        }
+
+    availability_data = {'features': features, 'vehicles': vehicles, 'matrix': matrix}
+    pricing_data = {
+        'vehicles': [{'id': vehicle, 'basePrice': float(rng.randint(18000, 60000))} for vehicle in vehicles],
+        'featurePrices': feature_prices
+    }
+    return availability_data, pricing_data
+
+def make_tech(engines, param_count, seed=0):
+    rng = random.Random(seed)
+    params = [name for name, _, _, _ in BASE_PARAMS[:param_count]]
+    ranges = list(BASE_PARAMS[:param_count])
+    for k in range(len(params), param_count):
+        params.append(f"Param {k} (kg)")
+        ranges.append((params[-1], 100, 2500, 0))
+
+    table = {}
+    for name, low, high, decimals in ranges:
+        table[name] = {
+            engine: 'N/A' if rng.random() < 0.1 else f"{rng.uniform(low, high):.{decimals}f}"
+            for engine in engines
+        }
+    return {'engines': list(engines), 'params': params, 'table': table}
+
+def make_catalog(markets=3, trims=50, features=40, params=8, engines=None, seed=0):
+    engines = engine_names(engines or max(1, trims // 10))
+    codes = market_codes(markets)
+
+    config = {'markets': codes, 'availability': {}, 'pricing': {}}
+    for position, market in enumerate(codes):
+        availability_data, pricing_data = make_market(trims, features, seed=seed + position, engines=engines)
+        config['availability'][market] = availability_data
+        config['pricing'][market] = pricing_data
+    config['tech'] = make_tech(engines, params, seed=seed)
+    config['metadata'] = {
+        'lastUpdated': '2024-01-01T00:00:00Z',
+        'uploadedFiles': [],
+        'version': '1.0.0',
+        'revision': 1
+    }
+    return config
+
+def save_sheet(path, rows):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+def availability_rows(availability_data):
+    vehicles = availability_data['vehicles']
+    yield ['Feature'] + vehicles
+    for feature in availability_data['features']:
+        statuses = availability_data['matrix'][feature]
+        yield [feature] + [statuses.get(vehicle) for vehicle in vehicles]
+
+def pricing_rows(pricing_data):
+    vehicles = [v['id'] for v in pricing_data['vehicles']]
+    yield ['Feature'] + vehicles
+    yield ['Base Price'] + [v['basePrice'] for v in pricing_data['vehicles']]
+    for feature, prices in pricing_data['featurePrices'].items():
+        yield [feature] + [prices.get(vehicle) for vehicle in vehicles]
+
+def tech_rows(tech_data):
+    engines = tech_data['engines']
+    yield ['Parameter'] + engines
+    for param in tech_data['params']:
+        values = tech_data['table'][param]
+        yield [param] + [None if values.get(engine) == 'N/A' else values.get(engine) for engine in engines]
+
+def write_workbooks(config, folder):
+    # Filenames follow the upload naming rules (file type and market code in
+    # the name). Returns {filename: path}.
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+    for market, availability_data in config['availability'].items():
+        name = f"availability_{market}.xlsx"
+        save_sheet(os.path.join(folder, name), availability_rows(availability_data))
+        paths[name] = os.path.join(folder, name)
+    for market, pricing_data in config['pricing'].items():
+        name = f"pricing_{market}.xlsx"
+        save_sheet(os.path.join(folder, name), pricing_rows(pricing_data))
+        paths[name] = os.path.join(folder, name)
+    if 'tech' in config:
+        save_sheet(os.path.join(folder, 'technical.xlsx'), tech_rows(config['tech']))
+        paths['technical.xlsx'] = os.path.join(folder, 'technical.xlsx')
+    return paths
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Generate a synthetic catalog and its workbooks')
+    arg_parser.add_argument('--markets', type=int, default=3)
+    arg_parser.add_argument('--trims', type=int, default=50, help='Vehicles per market')
+    arg_parser.add_argument('--features', type=int, default=40)
+    arg_parser.add_argument('--params', type=int, default=8, help='Tech parameters')
+    arg_parser.add_argument('--engines', type=int, help='Distinct engines (default: trims / 10)')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--output', required=True, help='Folder for config.json and the workbooks')
+    args = arg_parser.parse_args()
+
+    catalog = make_catalog(args.markets, args.trims, args.features, args.params, args.engines, args.seed)
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, 'config.json'), 'w') as f:
+        json.dump(catalog, f, indent=2)
+    for name in write_workbooks(catalog, args.output):
+        print(name)
@@ -1,56 +1,139 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Request, Response, render_template, request, jsonify, session, redirect, url_for, g
 from werkzeug.utils import secure_filename
 import os
 import json
 from datetime import datetime
 from dotenv import load_dotenv
 import copy
+import time
+import uuid
 
-from services.parser import parse_availability_file, parse_pricing_file, parse_tech_file, detect_file_type, extract_market_from_filename
-from services.pricing import get_currency_symbol, format_price, calculate_total_price, get_vehicle_base_price, get_feature_price
-from services.availability import get_feature_status, get_available_features, get_selectable_features
-from services.tech import get_vehicle_specs, get_key_highlights
-from services.validators import validate_config
+from services.parser import parse_availability_file, parse_pricing_file, parse_tech_file, parse_by_type, detect_file_type, extract_market_from_filename
+from services.pricing import get_currency_symbol, format_price, calculate_total_price, get_vehicle_base_price, get_feature_price, get_vehicle_feature_prices, calculate_batch_totals, quote_number
+from services.availability import get_feature_status, get_available_features, get_selectable_features, get_vehicle_features, validate_feature_selection
+from services.tech import get_vehicle_specs, get_key_highlights, get_unit_system
+from services.catalog import get_catalog, get_market_index
+from services.markets import get_registry, get_market_codes
+from services.search import parse_search_args, search_vehicles
+from services.exports import EXPORT_FORMATS, stream_export
+from services.validators import validate_config, get_validation_stats
 from services.ai_edit import apply_ai_edit, generate_diff
+from services.json_patch import generate_patch, apply_patch, PatchError
+from services.drafts import load_draft, save_draft, discard_draft, get_draft_stats
+from services import config_store, response_cache, sqlite_store, history, metrics, profiler
+from services.metrics import timed, record_parse
+from services.jobs import submit_job, update_job, report_progress, get_job
+from services.bulk_upload import save_workbooks, parse_workbooks, parsed_row_count
 
 load_dotenv()
 
+MAX_UPLOAD_MB = int(os.getenv('MAX_UPLOAD_MB', '10'))
+# A bulk upload carries many workbooks (or a zip of them) in one request, so
+# it gets its own, larger cap; every other route keeps MAX_UPLOAD_MB.
+BULK_MAX_UPLOAD_MB = int(os.getenv('BULK_MAX_UPLOAD_MB', '100'))
+
+class UploadRequest(Request):
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'api_author_upload_bulk':
+            return BULK_MAX_UPLOAD_MB * 1024 * 1024
+        return super().max_content_length
+
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.secret_key = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_MB * 1024 * 1024
 app.config['UPLOAD_FOLDER'] = 'data/uploads'
 
 ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', 'admin123')
 CONFIG_FILE = 'data/config.json'
+# 'json' keeps the catalog in CONFIG_FILE; 'sqlite' keeps it in normalized
+# tables in CONFIG_DB, seeded from CONFIG_FILE the first time.
+CONFIG_BACKEND = os.getenv('CONFIG_BACKEND', 'json')
+CONFIG_DB = os.getenv('CONFIG_DB', 'data/config.db')
+
+snapshot_validation = None
 
-working_config = None
+storage_ready = False
+
+def prepare_database():
+    global storage_ready
+    with config_store.write_lock(CONFIG_FILE):
+        if sqlite_store.is_empty(CONFIG_DB) and os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                sqlite_store.import_config(CONFIG_DB, json.load(f))
+    storage_ready = True
+
+def load_snapshot():
+    if CONFIG_BACKEND == 'sqlite':
+        if not storage_ready:
+            try:
+                prepare_database()
+            except Exception as e:
+                print(f"Error preparing config database: {e}")
+                return None
+        return config_store.get_db_snapshot(CONFIG_DB)
+    return config_store.get_snapshot(CONFIG_FILE)
 
 def load_config():
-    try:
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading config: {e}")
+    snapshot = load_snapshot()
+    if not snapshot:
         return None
+    return snapshot['config']
 
-def save_config(config):
+def load_config_copy():
+    config = load_config()
+    if config is None:
+        return None
+    return copy.deepcopy(config)
+
+def save_config(config, note=None, source_tree=None):
     try:
-        if 'metadata' not in config:
-            config['metadata'] = {
-                'lastUpdated': datetime.utcnow().isoformat() + 'Z',
-                'uploadedFiles': [],
-                'version': '1.0.0'
-            }
-        else:
-            config['metadata']['lastUpdated'] = datetime.utcnow().isoformat() + 'Z'
+        with config_store.write_lock(CONFIG_FILE):
+            current = load_snapshot()
+            revision = config_store.get_revision(current['config'] if current else None)
+            revision = max(revision, config_store.get_revision(config)) + 1
+            
+            if 'metadata' not in config:
+                config['metadata'] = {
+                    'lastUpdated': datetime.utcnow().isoformat() + 'Z',
+                    'uploadedFiles': [],
+                    'version': '1.0.0'
+                }
+            else:
+                config['metadata']['lastUpdated'] = datetime.utcnow().isoformat() + 'Z'
+            config['metadata']['revision'] = revision
+            
+            config_text = json.dumps(config, indent=2)
+            if CONFIG_BACKEND == 'sqlite':
+                if current:
+                    stamp = sqlite_store.save_changes(CONFIG_DB, current['config'], config)
+                else:
+                    stamp = sqlite_store.import_config(CONFIG_DB, config)
+                config_store.publish_stamped(CONFIG_DB, stamp, config_text)
+            else:
+                config_store.write_atomic(CONFIG_FILE, config_text)
+                config_store.publish(CONFIG_FILE, config_text)
+            
+            record_history(current, config, revision, note, source_tree)
         
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
+        response_cache.invalidate()
         return True
     except Exception as e:
         print(f"Error saving config: {e}")
         return False
 
+def record_history(current, config, revision, note, source_tree=None):
+    try:
+        if history.get_head() is None and current:
+            history.record_version(current['config'], config_store.get_revision(current['config']), 'Initial version')
+        history.record_version(config, revision, note, source_tree)
+    except Exception as e:
+        print(f"Error recording config history: {e}")
+
+def config_write_guard():
+    return config_store.write_lock(CONFIG_FILE)
+
 def ensure_metadata(config):
     if 'metadata' not in config:
         config['metadata'] = {
@@ -64,9 +147,106 @@ def ensure_metadata(config):
     
     return config
 
+def with_metadata(config):
+    # Shallow copy with its own metadata dict, so edits that share structure
+    # with the snapshot never write into it.
+    config = dict(config)
+    if 'metadata' in config:
+        config['metadata'] = dict(config['metadata'])
+    return ensure_metadata(config)
+
+def get_metadata(config):
+    metadata = dict(config.get('metadata', {}))
+    metadata.setdefault('uploadedFiles', [])
+    return metadata
+
+def validate_snapshot(snapshot):
+    global snapshot_validation
+    
+    cached = snapshot_validation
+    if cached and cached[0] == snapshot['generation']:
+        return cached[1]
+    
+    with timed('validate'):
+        validation = validate_config(snapshot['config'])
+    snapshot_validation = (snapshot['generation'], validation)
+    return validation
+
 def is_author():
     return session.get('is_author', False)
 
+def session_draft_id(create=False):
+    draft_id = session.get('draft_id')
+    if not draft_id and create:
+        draft_id = uuid.uuid4().hex
+        session['draft_id'] = draft_id
+    return draft_id
+
+def load_working_config(snapshot):
+    # The session's draft is a patch against the version it was started on.
+    # Its list indices are positional, so once another author has saved it
+    # could apply cleanly to the wrong rows; a stale draft is a conflict.
+    base = with_metadata(snapshot['config'])
+    draft = load_draft(session_draft_id())
+    if not draft:
+        return base, None, None
+    if draft['baseVersion'] != snapshot['version']:
+        raise PatchError(f"Draft was started on version {draft['baseVersion']}, the saved configuration is now version {snapshot['version']}")
+    return base, apply_patch(base, draft['patch']), draft
+
+def draft_conflict_response(e):
+    return jsonify({
+        'error': 'The configuration has been saved since your working configuration was started. Discard it and edit again.',
+        'details': str(e)
+    }), 409
+
+@app.before_request
+def start_request_timer():
+    metrics.start_request()
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    return metrics.finish_request(response, route, request.method)
+
+@app.before_request
+def start_profile():
+    # Authors can ask for a profile of any request; PROFILE_SAMPLE_RATE
+    # profiles a fraction of all requests with the stack sampler.
+    mode = profiler.requested_mode(request.args, request.headers)
+    if mode and not is_author():
+        mode = None
+    if mode is None and profiler.sampled():
+        mode = 'sample'
+    if mode:
+        g.profile_mode = mode
+        g.profile = profiler.start(mode)
+
+def finish_profile(status):
+    session = g.pop('profile', None)
+    if session is None:
+        return None
+    return profiler.stop(session, method=request.method, path=request.full_path.rstrip('?'), status=status)
+
+@app.after_request
+def stop_profile(response):
+    profile_id = finish_profile(response.status_code)
+    if profile_id:
+        response.headers['X-Profile-Id'] = profile_id
+    return response
+
+@app.teardown_request
+def discard_profile(error=None):
+    finish_profile(500)
+
+def job_function(fn):
+    # Upload jobs run on a worker thread, so a profiled upload request
+    # profiles its job separately.
+    mode = g.get('profile_mode')
+    if mode is None:
+        return fn
+    return profiler.wrap_job(fn, mode, path=request.path)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -97,8 +277,7 @@ def author_dashboard():
     config = load_config()
     
     if config:
-        config = ensure_metadata(config)
-        metadata = config.get('metadata', {})
+        metadata = get_metadata(config)
     else:
         metadata = {}
     
@@ -109,62 +288,318 @@ def author_dashboard():
         stats['total_features'] = sum(len(config['availability'].get(m, {}).get('features', [])) for m in config.get('markets', []))
         stats['engines'] = len(config.get('tech', {}).get('engines', []))
     
-    return render_template('author.html', metadata=metadata, stats=stats)
+    return render_template('author.html', metadata=metadata, stats=stats,
+                           max_upload_mb=MAX_UPLOAD_MB, bulk_max_upload_mb=BULK_MAX_UPLOAD_MB)
 
-@app.route('/api/markets')
-def api_markets():
-    config = load_config()
-    if not config:
+def cached_json_response(key, build):
+    snapshot = load_snapshot()
+    if not snapshot:
         return jsonify({'error': 'Configuration not loaded'}), 500
     
-    return jsonify(config.get('markets', []))
-
-@app.route('/api/vehicles')
-def api_vehicles():
-    market = request.args.get('market', 'UK')
-    config = load_config()
+    generation = snapshot['generation']
+    entry = response_cache.get(generation, key)
     
-    if not config:
-        return jsonify({'error': 'Configuration not loaded'}), 500
+    if entry is None:
+        with timed('build'):
+            payload, status = build(snapshot['config'])
+        if status != 200:
+            return jsonify(payload), status
+        
+        with timed('encode'):
+            body = (app.json.dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+        entry = response_cache.put(generation, key, body, response_cache.make_etag(snapshot['version'], body))
     
+    body, etag = entry
+    
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    
+    response.set_etag(etag)
+    return response
+
+def build_markets_payload(config):
+    return config.get('markets', []), 200
+
+def build_vehicles_payload(config, market):
     if market not in config.get('availability', {}):
-        return jsonify({'error': f'Market {market} not found'}), 404
+        return {'error': f'Market {market} not found'}, 404
     
     vehicles = config['availability'][market].get('vehicles', [])
     
     pricing_data = config.get('pricing', {}).get(market, {})
+    market_index = get_market_index(config, market)
+    registry = get_registry(config)
     vehicle_list = []
     
     for vehicle_id in vehicles:
-        base_price = get_vehicle_base_price(vehicle_id, pricing_data)
+        base_price = get_vehicle_base_price(vehicle_id, pricing_data, market_index.get('basePrices'))
         vehicle_list.append({
             'id': vehicle_id,
             'basePrice': base_price,
-            'basePriceFormatted': format_price(base_price, market)
+            'basePriceFormatted': format_price(base_price, market, registry)
         })
     
-    return jsonify(vehicle_list)
+    return vehicle_list, 200
 
-@app.route('/api/features')
-def api_features():
-    market = request.args.get('market', 'UK')
-    config = load_config()
+def build_features_payload(config, market):
+    if market not in config.get('availability', {}):
+        return {'error': f'Market {market} not found'}, 404
     
-    if not config:
-        return jsonify({'error': 'Configuration not loaded'}), 500
+    return config['availability'][market].get('features', []), 200
+
+def build_availability_payload(config, market, vehicle_id):
+    if market not in config.get('availability', {}):
+        return {'error': f'Market {market} not found'}, 404
+    
+    avail_data = config['availability'][market]
+    
+    if vehicle_id:
+        market_index = get_market_index(config, market)
+        features = get_vehicle_features(vehicle_id, avail_data, columns=market_index.get('columns'))
+        return {'vehicle': vehicle_id, 'features': features}, 200
+    
+    return avail_data.get('matrix', {}), 200
+
+def build_pricing_payload(config, market, vehicle_id):
+    if market not in config.get('pricing', {}):
+        return {'error': f'Market {market} not found'}, 404
+    
+    pricing_data = config['pricing'][market]
+    
+    if vehicle_id:
+        market_index = get_market_index(config, market)
+        registry = get_registry(config)
+        base_price = get_vehicle_base_price(vehicle_id, pricing_data, market_index.get('basePrices'))
+        feature_prices = {}
+        
+        for feature, price in get_vehicle_feature_prices(vehicle_id, pricing_data, columns=market_index.get('columns')).items():
+            feature_prices[feature] = {
+                'price': price,
+                'formatted': format_price(price, market, registry)
+            }
+        
+        return {
+            'vehicle': vehicle_id,
+            'basePrice': base_price,
+            'basePriceFormatted': format_price(base_price, market, registry),
+            'featurePrices': feature_prices,
+            'currencySymbol': get_currency_symbol(market, registry)
+        }, 200
+    
+    return pricing_data, 200
+
+def build_tech_payload(config, vehicle_id, market=None):
+    tech_data = config.get('tech', {})
+    
+    if market:
+        registry = get_registry(config)
+        unit_system = get_unit_system(market, registry)
+        view = get_catalog(config)['specViews'][unit_system]
+        
+        if vehicle_id:
+            return {
+                'vehicle': vehicle_id,
+                'market': market,
+                'unitSystem': unit_system,
+                'specs': get_vehicle_specs(vehicle_id, tech_data, view['specs']),
+                'highlights': get_key_highlights(vehicle_id, tech_data, view=view)
+            }, 200
+        
+        return {
+            'market': market,
+            'unitSystem': unit_system,
+            'engines': list(view['specs'].keys()),
+            'params': [view['names'][param] for param in tech_data.get('params', []) if param in view['names']],
+            'specs': view['specs']
+        }, 200
+    
+    if vehicle_id:
+        engine_specs = get_catalog(config)['engineSpecs']
+        specs = get_vehicle_specs(vehicle_id, tech_data, engine_specs)
+        highlights = get_key_highlights(vehicle_id, tech_data, engine_specs)
+        
+        return {
+            'vehicle': vehicle_id,
+            'specs': specs,
+            'highlights': highlights
+        }, 200
+    
+    return tech_data, 200
+
+def build_vehicle_bundle_payload(config, market, vehicle_id):
+    if not vehicle_id:
+        return {'error': 'No vehicle provided'}, 400
     
     if market not in config.get('availability', {}):
-        return jsonify({'error': f'Market {market} not found'}), 404
+        return {'error': f'Market {market} not found'}, 404
+    
+    avail_data = config['availability'][market]
+    pricing_data = config.get('pricing', {}).get(market, {})
+    tech_data = config.get('tech', {})
+    
+    catalog = get_catalog(config)
+    market_index = catalog['markets'].get(market, {})
+    registry = get_registry(config)
+    view = catalog['specViews'][get_unit_system(market, registry)]
+    
+    base_price = get_vehicle_base_price(vehicle_id, pricing_data, market_index.get('basePrices'))
+    feature_prices = get_vehicle_feature_prices(vehicle_id, pricing_data, columns=market_index.get('columns'))
+    
+    features = []
+    for item in get_vehicle_features(vehicle_id, avail_data, columns=market_index.get('columns')):
+        price = feature_prices.get(item['feature'])
+        features.append({
+            'feature': item['feature'],
+            'status': item['status'],
+            'price': price,
+            'priceFormatted': format_price(price, market, registry) if price is not None else None
+        })
+    
+    return {
+        'vehicle': vehicle_id,
+        'market': market,
+        'currencySymbol': get_currency_symbol(market, registry),
+        'basePrice': base_price,
+        'basePriceFormatted': format_price(base_price, market, registry),
+        'features': features,
+        'specs': get_vehicle_specs(vehicle_id, tech_data, view['specs']),
+        'highlights': get_key_highlights(vehicle_id, tech_data, view=view)
+    }, 200
+
+def build_search_payload(config, market, query):
+    if market not in config.get('availability', {}):
+        return {'error': f'Market {market} not found'}, 404
+    
+    market_index = get_market_index(config, market)
+    registry = get_registry(config)
+    try:
+        result = search_vehicles(market_index['search'], query)
+    except KeyError as e:
+        return {'error': e.args[0]}, 400
+    
+    results = []
+    for vehicle_id in result['vehicles']:
+        base_price = market_index['basePrices'].get(vehicle_id, 0)
+        results.append({
+            'id': vehicle_id,
+            'basePrice': base_price,
+            'basePriceFormatted': format_price(base_price, market, registry)
+        })
     
-    return jsonify(config['availability'][market].get('features', []))
+    return {
+        'market': market,
+        'total': result['total'],
+        'page': query['page'],
+        'perPage': query['perPage'],
+        'pages': -(-result['total'] // query['perPage']),
+        'results': results,
+        'facets': result['facets']
+    }, 200
+
+@app.route('/api/markets')
+def api_markets():
+    return cached_json_response(('markets',), build_markets_payload)
+
+@app.route('/api/vehicles')
+def api_vehicles():
+    market = request.args.get('market', 'UK')
+    return cached_json_response(('vehicles', market), lambda config: build_vehicles_payload(config, market))
+
+@app.route('/api/features')
+def api_features():
+    market = request.args.get('market', 'UK')
+    return cached_json_response(('features', market), lambda config: build_features_payload(config, market))
 
 @app.route('/api/availability')
 def api_availability():
     market = request.args.get('market', 'UK')
     vehicle_id = request.args.get('vehicle')
+    return cached_json_response(('availability', market, vehicle_id), lambda config: build_availability_payload(config, market, vehicle_id))
+
+@app.route('/api/pricing')
+def api_pricing():
+    market = request.args.get('market', 'UK')
+    vehicle_id = request.args.get('vehicle')
+    return cached_json_response(('pricing', market, vehicle_id), lambda config: build_pricing_payload(config, market, vehicle_id))
+
+@app.route('/api/tech')
+def api_tech():
+    vehicle_id = request.args.get('vehicle')
+    market = request.args.get('market')
+    return cached_json_response(('tech', vehicle_id, market), lambda config: build_tech_payload(config, vehicle_id, market))
+
+@app.route('/api/vehicle-bundle')
+def api_vehicle_bundle():
+    market = request.args.get('market', 'UK')
+    vehicle_id = request.args.get('vehicle')
+    return cached_json_response(('vehicle-bundle', market, vehicle_id), lambda config: build_vehicle_bundle_payload(config, market, vehicle_id))
+
+@app.route('/api/search')
+def api_search():
+    market = request.args.get('market', 'UK')
+    try:
+        query = parse_search_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    config = load_config()
+    key = ('search', tuple(sorted(request.args.items(multi=True))))
+    return cached_json_response(key, lambda config: build_search_payload(config, market, query))
+
+@app.route('/api/export')
+def api_export():
+    market = request.args.get('market', 'all')
+    export_format = request.args.get('format', 'csv')
+    
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    snapshot = load_snapshot()
+    if not snapshot:
+        return jsonify({'error': 'Configuration not loaded'}), 500
+    
+    config = snapshot['config']
+    availability = config.get('availability', {})
+    if market == 'all':
+        markets = list(availability.keys())
+    elif market in availability:
+        markets = [market]
+    else:
+        return jsonify({'error': f'Market {market} not found'}), 404
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    filename = f"falcon-{market.lower()}-{snapshot['version']}.{extension}"
+    
+    return Response(
+        stream_export(config, markets, export_format),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'X-Config-Version': str(snapshot['version'])
+        }
+    )
+
+@app.route('/api/quote', methods=['POST'])
+def api_quote():
+    data = request.get_json(silent=True) or {}
+    market = data.get('market', 'UK')
+    vehicle_id = data.get('vehicle')
+    features = data.get('features', [])
+    
+    if not isinstance(market, str):
+        return jsonify({'error': 'market must be a string'}), 400
     
+    if not vehicle_id:
+        return jsonify({'error': 'No vehicle provided'}), 400
+    
+    if not isinstance(vehicle_id, str):
+        return jsonify({'error': 'vehicle must be a string'}), 400
+    
+    if not isinstance(features, list) or not all(isinstance(f, str) for f in features):
+        return jsonify({'error': 'features must be a list of strings'}), 400
+    
+    config = load_config()
     if not config:
         return jsonify({'error': 'Configuration not loaded'}), 500
     
@@ -172,79 +607,158 @@ def api_availability():
         return jsonify({'error': f'Market {market} not found'}), 404
     
     avail_data = config['availability'][market]
+    pricing_data = config.get('pricing', {}).get(market, {})
+    market_index = get_market_index(config, market)
+    registry = get_registry(config)
     
-    if vehicle_id:
-        features = []
-        matrix = avail_data.get('matrix', {})
-        for feature, vehicles in matrix.items():
-            status = vehicles.get(vehicle_id, 'NA')
-            features.append({
-                'feature': feature,
-                'status': status
-            })
-        return jsonify({'vehicle': vehicle_id, 'features': features})
+    if vehicle_id not in market_index.get('priceArrays', {}).get('vehicleRows', {}):
+        return jsonify({'error': f'Vehicle {vehicle_id} not found in market {market}'}), 404
+    
+    features = list(dict.fromkeys(features))
+    
+    invalid = []
+    for feature in features:
+        result = validate_feature_selection(feature, vehicle_id, avail_data)
+        if not result['valid']:
+            invalid.append({'feature': feature, 'reason': result['reason']})
+    
+    if invalid:
+        return jsonify({'error': 'Invalid feature selection', 'invalid': invalid}), 400
+    
+    base_price = get_vehicle_base_price(vehicle_id, pricing_data, market_index.get('basePrices'))
+    feature_prices = get_vehicle_feature_prices(vehicle_id, pricing_data, columns=market_index.get('columns'))
+    totals = calculate_total_price(base_price, features, feature_prices)
     
-    return jsonify(avail_data.get('matrix', {}))
+    options = []
+    for feature in features:
+        price = feature_prices.get(feature, 0)
+        options.append({
+            'feature': feature,
+            'price': price,
+            'formatted': format_price(price, market, registry)
+        })
+    
+    return jsonify({
+        'market': market,
+        'vehicle': vehicle_id,
+        'options': options,
+        'basePrice': totals['basePrice'],
+        'optionsPrice': totals['optionsPrice'],
+        'totalPrice': totals['totalPrice'],
+        'basePriceFormatted': format_price(totals['basePrice'], market, registry),
+        'optionsPriceFormatted': format_price(totals['optionsPrice'], market, registry),
+        'totalPriceFormatted': format_price(totals['totalPrice'], market, registry)
+    })
 
-@app.route('/api/pricing')
-def api_pricing():
-    market = request.args.get('market', 'UK')
-    vehicle_id = request.args.get('vehicle')
+def is_well_formed_quote(quote):
+    if not isinstance(quote, dict):
+        return False
+    features = quote.get('features', [])
+    return (isinstance(quote.get('market', 'UK'), str)
+            and isinstance(quote.get('vehicle'), (str, type(None)))
+            and isinstance(features, list)
+            and all(isinstance(f, str) for f in features))
+
+@app.route('/api/quote/batch', methods=['POST'])
+def api_quote_batch():
+    data = request.get_json(silent=True) or {}
+    quotes = data.get('quotes')
     
-    config = load_config()
+    if not isinstance(quotes, list):
+        return jsonify({'error': 'quotes must be a list'}), 400
     
+    config = load_config()
     if not config:
         return jsonify({'error': 'Configuration not loaded'}), 500
     
-    if market not in config.get('pricing', {}):
-        return jsonify({'error': f'Market {market} not found'}), 404
+    catalog = get_catalog(config)
+    results = [None] * len(quotes)
     
-    pricing_data = config['pricing'][market]
+    by_market = {}
+    for position, quote in enumerate(quotes):
+        if not is_well_formed_quote(quote):
+            results[position] = {'valid': False, 'error': 'Malformed quote'}
+            continue
+        by_market.setdefault(quote.get('market', 'UK'), []).append(position)
     
-    if vehicle_id:
-        base_price = get_vehicle_base_price(vehicle_id, pricing_data)
-        feature_prices = {}
+    for market, positions in by_market.items():
+        market_index = catalog['markets'].get(market)
+        if not market_index:
+            for position in positions:
+                results[position] = {'valid': False, 'error': f'Market {market} not found'}
+            continue
         
-        for feature, vehicles in pricing_data.get('featurePrices', {}).items():
-            price = vehicles.get(vehicle_id)
-            if price != 'NA' and price is not None:
-                feature_prices[feature] = {
-                    'price': price,
-                    'formatted': format_price(price, market)
-                }
+        selections = [(quotes[p].get('vehicle'), quotes[p].get('features', [])) for p in positions]
+        totals = calculate_batch_totals(market_index['priceArrays'], selections)
         
-        return jsonify({
-            'vehicle': vehicle_id,
-            'basePrice': base_price,
-            'basePriceFormatted': format_price(base_price, market),
-            'featurePrices': feature_prices,
-            'currencySymbol': get_currency_symbol(market)
-        })
+        found = totals['found'].tolist()
+        valid = totals['valid'].tolist()
+        base = [quote_number(*p) for p in zip(totals['basePrice'].tolist(), totals['baseIsInt'].tolist())]
+        options = [quote_number(*p) for p in zip(totals['optionsPrice'].tolist(), totals['optionsIsInt'].tolist())]
+        total = [quote_number(*p) for p in zip(totals['totalPrice'].tolist(), totals['totalIsInt'].tolist())]
+        
+        for i, position in enumerate(positions):
+            if not found[i]:
+                results[position] = {'valid': False, 'error': 'Vehicle not found'}
+            elif not valid[i]:
+                results[position] = {'valid': False, 'error': 'Invalid feature selection'}
+            else:
+                results[position] = {
+                    'valid': True,
+                    'basePrice': base[i],
+                    'optionsPrice': options[i],
+                    'totalPrice': total[i]
+                }
     
-    return jsonify(pricing_data)
+    return jsonify({'count': len(results), 'results': results})
 
-@app.route('/api/tech')
-def api_tech():
-    vehicle_id = request.args.get('vehicle')
+def apply_parsed_upload(config, file_type, market, parsed):
+    if file_type == 'availability':
+        config['availability'][market] = parsed
+        return f"Parsed availability data for {market}: {len(parsed['features'])} features, {len(parsed['vehicles'])} vehicles"
     
-    config = load_config()
+    elif file_type == 'pricing':
+        config['pricing'][market] = parsed
+        return f"Parsed pricing data for {market}: {len(parsed['vehicles'])} vehicles, {len(parsed['featurePrices'])} features"
     
-    if not config:
-        return jsonify({'error': 'Configuration not loaded'}), 500
-    
-    tech_data = config.get('tech', {})
+    config['tech'] = parsed
+    return f"Parsed technical data: {len(parsed['engines'])} engines, {len(parsed['params'])} parameters"
+
+def process_upload(job, filepath, filename, saved_filename, file_type, market):
+    update_job(job, stage='parsing')
+    start = time.perf_counter()
+    parsed = parse_by_type(filepath, file_type, market, lambda rows: report_progress(job, rows))
+    record_parse(file_type, parsed_row_count(file_type, parsed), time.perf_counter() - start)
     
-    if vehicle_id:
-        specs = get_vehicle_specs(vehicle_id, tech_data)
-        highlights = get_key_highlights(vehicle_id, tech_data)
+    with config_write_guard():
+        config = load_config_copy()
+        if not config:
+            raise RuntimeError('Could not load current configuration')
         
-        return jsonify({
-            'vehicle': vehicle_id,
-            'specs': specs,
-            'highlights': highlights
+        config = ensure_metadata(config)
+        logs = [apply_parsed_upload(config, file_type, market, parsed)]
+        
+        update_job(job, stage='validating')
+        with timed('validate'):
+            validation = validate_config(config)
+        
+        config['metadata']['uploadedFiles'].append({
+            'filename': saved_filename,
+            'originalFilename': filename,
+            'type': file_type,
+            'uploadedAt': datetime.utcnow().isoformat() + 'Z'
         })
+        
+        update_job(job, stage='saving', warnings=validation['warnings'])
+        if not save_config(config, note=f"Upload {filename}"):
+            raise RuntimeError('Failed to save configuration')
     
-    return jsonify(tech_data)
+    return {
+        'success': True,
+        'fileType': file_type,
+        'logs': logs,
+        'validation': validation
+    }
 
 @app.route('/api/author/upload', methods=['POST'])
 def api_author_upload():
@@ -264,13 +778,6 @@ def api_author_upload():
     
     try:
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        saved_filename = f"{timestamp}_{filename}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], saved_filename)
-        
-        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-        file.save(filepath)
-        
         file_type = detect_file_type(filename)
         
         if not file_type:
@@ -279,100 +786,169 @@ def api_author_upload():
                 'hint': 'Filename should contain: availability/dummy, pricing, or technical/tech'
             }), 400
         
-        config = load_config()
+        market = None
+        if file_type in ('availability', 'pricing'):
+            registry = get_registry(load_config())
+            market = extract_market_from_filename(filename, registry)
+            if not market:
+                return jsonify({'error': f"Could not detect market from filename. Include one of {', '.join(get_market_codes(registry))} in filename."}), 400
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        saved_filename = f"{timestamp}_{filename}"
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], saved_filename)
+        
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        file.save(filepath)
+        
+        job = submit_job('upload', job_function(process_upload), filepath, filename, saved_filename, file_type, market,
+                         filename=filename, fileType=file_type, market=market)
+        if not job:
+            return jsonify({'error': 'Too many uploads in progress, try again shortly'}), 429
+        
+        return jsonify({
+            'success': True,
+            'jobId': job['id'],
+            'status': job['status'],
+            'statusUrl': url_for('api_author_job', job_id=job['id'])
+        }), 202
+    
+    except Exception as e:
+        return jsonify({'error': f'Upload failed: {str(e)}'}), 500
+
+def process_bulk_upload(job, entries):
+    update_job(job, stage='parsing')
+    parsed_rows = [0]
+    
+    def on_parsed(entry, parsed, done):
+        parsed_rows[0] += parsed_row_count(entry['fileType'], parsed)
+        report_progress(job, parsed_rows[0], files=done)
+    
+    parsed_files = parse_workbooks(entries, on_parsed)
+    
+    with config_write_guard():
+        config = load_config_copy()
         if not config:
-            return jsonify({'error': 'Could not load current configuration'}), 500
+            raise RuntimeError('Could not load current configuration')
         
         config = ensure_metadata(config)
-        
         logs = []
-        warnings = []
+        seen = set()
         
-        if file_type == 'availability':
-            market = extract_market_from_filename(filename)
-            if not market:
-                return jsonify({'error': 'Could not detect market from filename. Include UK, EU, or US in filename.'}), 400
-            
-            parsed = parse_availability_file(filepath)
+        for entry, parsed in zip(entries, parsed_files):
+            target = (entry['fileType'], entry['market'])
+            if target in seen:
+                logs.append(f"{entry['originalFilename']} replaces an earlier file for the same data")
+            seen.add(target)
             
-            if market not in config['availability']:
-                config['availability'][market] = {}
-            
-            config['availability'][market] = parsed
-            logs.append(f"Parsed availability data for {market}: {len(parsed['features'])} features, {len(parsed['vehicles'])} vehicles")
+            logs.append(apply_parsed_upload(config, entry['fileType'], entry['market'], parsed))
+            config['metadata']['uploadedFiles'].append({
+                'filename': entry['filename'],
+                'originalFilename': entry['originalFilename'],
+                'type': entry['fileType'],
+                'uploadedAt': datetime.utcnow().isoformat() + 'Z'
+            })
         
-        elif file_type == 'pricing':
-            market = extract_market_from_filename(filename)
-            if not market:
-                return jsonify({'error': 'Could not detect market from filename. Include UK, EU, or US in filename.'}), 400
-            
-            parsed = parse_pricing_file(filepath, market)
-            
-            if market not in config['pricing']:
-                config['pricing'][market] = {}
-            
-            config['pricing'][market] = parsed
-            logs.append(f"Parsed pricing data for {market}: {len(parsed['vehicles'])} vehicles, {len(parsed['featurePrices'])} features")
+        update_job(job, stage='validating')
+        with timed('validate'):
+            validation = validate_config(config)
         
-        elif file_type == 'tech':
-            parsed = parse_tech_file(filepath)
-            config['tech'] = parsed
-            logs.append(f"Parsed technical data: {len(parsed['engines'])} engines, {len(parsed['params'])} parameters")
+        update_job(job, stage='saving', warnings=validation['warnings'])
+        if not save_config(config, note=f"Bulk upload of {len(entries)} files"):
+            raise RuntimeError('Failed to save configuration')
+    
+    return {
+        'success': True,
+        'files': [{'filename': e['originalFilename'], 'fileType': e['fileType'], 'market': e['market']} for e in entries],
+        'logs': logs,
+        'validation': validation
+    }
+
+@app.route('/api/author/upload/bulk', methods=['POST'])
+def api_author_upload_bulk():
+    if not is_author():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    files = request.files.getlist('files') + request.files.getlist('file')
+    files = [f for f in files if f.filename]
+    
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+    
+    try:
+        entries, errors = save_workbooks(files, app.config['UPLOAD_FOLDER'], get_registry(load_config()))
         
-        validation = validate_config(config)
+        if errors:
+            return jsonify({'error': 'Some files could not be accepted', 'errors': errors}), 400
         
-        config['metadata']['uploadedFiles'].append({
-            'filename': saved_filename,
-            'originalFilename': filename,
-            'type': file_type,
-            'uploadedAt': datetime.utcnow().isoformat() + 'Z'
-        })
+        if not entries:
+            return jsonify({'error': 'No .xlsx workbooks found'}), 400
         
-        if save_config(config):
-            return jsonify({
-                'success': True,
-                'fileType': file_type,
-                'logs': logs,
-                'validation': validation
-            })
-        else:
-            return jsonify({'error': 'Failed to save configuration'}), 500
+        job = submit_job('bulk-upload', job_function(process_bulk_upload), entries,
+                         files=[e['originalFilename'] for e in entries])
+        if not job:
+            return jsonify({'error': 'Too many uploads in progress, try again shortly'}), 429
+        
+        return jsonify({
+            'success': True,
+            'jobId': job['id'],
+            'status': job['status'],
+            'statusUrl': url_for('api_author_job', job_id=job['id'])
+        }), 202
     
     except Exception as e:
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
 
+@app.route('/api/author/jobs/<job_id>')
+def api_author_job(job_id):
+    if not is_author():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    job = get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job)
+
 @app.route('/api/author/ai-edit', methods=['POST'])
 def api_author_ai_edit():
     if not is_author():
         return jsonify({'error': 'Unauthorized'}), 401
     
-    global working_config
-    
     data = request.get_json()
     instructions = data.get('instructions', '')
     
     if not instructions:
         return jsonify({'error': 'No instructions provided'}), 400
     
-    config = load_config()
-    if not config:
+    snapshot = load_snapshot()
+    if not snapshot:
         return jsonify({'error': 'Could not load configuration'}), 500
     
-    config = ensure_metadata(config)
+    try:
+        base, working, draft = load_working_config(snapshot)
+    except PatchError as e:
+        return draft_conflict_response(e)
     
-    result = apply_ai_edit(config, instructions)
+    previous = working if working is not None else base
+    result = apply_ai_edit(previous, instructions)
     
     if result['success']:
-        working_config = result['config']
+        working = result['config']
+        
+        warnings = list(result.get('warnings', []))
+        if not generate_patch(previous, working):
+            warnings.append('The instructions did not change the configuration. Check the feature, market and vehicle names.')
         
-        diff = generate_diff(config, working_config)
+        patch = generate_patch(base, working)
+        save_draft(session_draft_id(create=True), snapshot['version'], patch)
         
         return jsonify({
             'success': True,
             'method': result.get('method', 'unknown'),
             'changes': result.get('changes', []),
-            'diff': diff,
-            'preview': working_config
+            'warnings': warnings,
+            'diff': generate_diff(base, working, patch),
+            'patch': patch
         })
     else:
         return jsonify({
@@ -386,12 +962,21 @@ def api_author_save():
     if not is_author():
         return jsonify({'error': 'Unauthorized'}), 401
     
-    global working_config
-    
-    if working_config:
-        working_config = ensure_metadata(working_config)
+    with config_write_guard():
+        snapshot = load_snapshot()
+        if not snapshot:
+            return jsonify({'error': 'Could not load configuration'}), 500
+        
+        try:
+            base, working, draft = load_working_config(snapshot)
+        except PatchError as e:
+            return draft_conflict_response(e)
+        
+        if working is None:
+            return jsonify({'error': 'No working configuration to save'}), 400
         
-        validation = validate_config(working_config)
+        with timed('validate'):
+            validation = validate_config(working)
         if not validation['valid']:
             return jsonify({
                 'error': 'Configuration validation failed',
@@ -399,39 +984,161 @@ def api_author_save():
                 'warnings': validation['warnings']
             }), 400
         
-        if save_config(working_config):
-            working_config = None
-            return jsonify({
-                'success': True,
-                'message': 'Configuration saved successfully',
-                'warnings': validation['warnings']
-            })
-        else:
-            return jsonify({'error': 'Failed to save configuration'}), 500
+        saved = save_config(working, note='Author edit')
+    
+    if saved:
+        discard_draft(session_draft_id())
+        return jsonify({
+            'success': True,
+            'message': 'Configuration saved successfully',
+            'warnings': validation['warnings']
+        })
     else:
-        return jsonify({'error': 'No working configuration to save'}), 400
+        return jsonify({'error': 'Failed to save configuration'}), 500
 
 @app.route('/api/author/discard', methods=['POST'])
 def api_author_discard():
     if not is_author():
         return jsonify({'error': 'Unauthorized'}), 401
     
-    global working_config
-    working_config = None
+    discard_draft(session_draft_id())
     
     return jsonify({'success': True, 'message': 'Working configuration discarded'})
 
-@app.route('/api/author/status')
-def api_author_status():
+@app.route('/api/author/versions')
+def api_author_versions():
+    if not is_author():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    limit = request.args.get('limit', 50, type=int)
+    head = history.get_head()
+    versions = list(reversed(history.list_versions()))[:max(limit, 0)]
+    
+    return jsonify({
+        'current': head['revision'] if head else None,
+        'versions': versions,
+        'storage': history.get_history_stats()
+    })
+
+@app.route('/api/author/versions/<int:revision>/diff')
+def api_author_version_diff(revision):
+    if not is_author():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    versions = history.list_versions()
+    revisions = [v['revision'] for v in versions]
+    if revision not in revisions:
+        return jsonify({'error': f"Version r{revision} not found"}), 404
+    
+    against = request.args.get('against')
+    if against is None:
+        idx = revisions.index(revision)
+        against_config = history.load_version(revisions[idx - 1]) if idx > 0 else {}
+        against = revisions[idx - 1] if idx > 0 else None
+    elif against == 'current':
+        against_config = load_config()
+    else:
+        try:
+            against = int(against.lstrip('r'))
+        except ValueError:
+            return jsonify({'error': 'against must be a revision number or "current"'}), 400
+        against_config = history.load_version(against)
+        if against_config is None:
+            return jsonify({'error': f"Version r{against} not found"}), 404
+    
+    target = history.load_version(revision)
+    patch = generate_patch(against_config, target)
+    
+    return jsonify({
+        'from': against,
+        'to': revision,
+        'patch': patch,
+        'diff': generate_diff(against_config, target, patch)
+    })
+
+@app.route('/api/author/versions/<int:revision>/rollback', methods=['POST'])
+def api_author_version_rollback(revision):
+    if not is_author():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    with config_write_guard():
+        version = history.get_version(revision)
+        if version is None:
+            return jsonify({'error': f"Version r{revision} not found"}), 404
+        
+        # The restored config is published like any save, so every worker
+        # reloads it, and HEAD only moves once that has succeeded. Its chunks
+        # are the stored objects, so recording it re-hashes only metadata.
+        config = dict(history.assemble(version['tree']))
+        config['metadata'] = dict(config.get('metadata', {}))
+        config['metadata']['restoredFrom'] = revision
+        saved = save_config(config, note=f"Rollback to r{revision}", source_tree=version['tree'])
+    
+    if saved:
+        return jsonify({
+            'success': True,
+            'message': f"Configuration rolled back to r{revision}",
+            'revision': config['metadata']['revision']
+        })
+    else:
+        return jsonify({'error': 'Failed to roll back configuration'}), 500
+
+@app.route('/api/author/export')
+def api_author_export():
     if not is_author():
         return jsonify({'error': 'Unauthorized'}), 401
     
     config = load_config()
     if not config:
+        return jsonify({'error': 'Could not load configuration'}), 500
+    
+    return Response(
+        json.dumps(config, indent=2),
+        mimetype='application/json',
+        headers={'Content-Disposition': 'attachment; filename=config.json'}
+    )
+
+@app.route('/api/author/profiles')
+def api_author_profiles():
+    if not is_author():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({
+        'profiles': profiler.list_profiles(),
+        'sampleRate': profiler.PROFILE_SAMPLE_RATE,
+        'keep': profiler.PROFILE_KEEP
+    })
+
+@app.route('/api/author/profiles/<profile_id>')
+def api_author_profile(profile_id):
+    if not is_author():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    entry, data = profiler.get_profile(profile_id)
+    if entry is None:
+        return jsonify({'error': f'Profile {profile_id} not found'}), 404
+    
+    if request.args.get('format') == 'text':
+        return Response(profiler.render_text(entry, data), mimetype='text/plain')
+    
+    extension = 'pstats' if entry['mode'] == 'cprofile' else 'folded'
+    return Response(
+        data,
+        mimetype='application/octet-stream',
+        headers={'Content-Disposition': f'attachment; filename=profile-{profile_id}.{extension}'}
+    )
+
+@app.route('/api/author/status')
+def api_author_status():
+    if not is_author():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    snapshot = load_snapshot()
+    if not snapshot:
         return jsonify({'error': 'Configuration not loaded'}), 500
     
-    config = ensure_metadata(config)
-    metadata = config.get('metadata', {})
+    config = snapshot['config']
+    metadata = get_metadata(config)
     
     stats = {
         'markets': {},
@@ -445,14 +1152,58 @@ def api_author_status():
             'features': len(config['availability'].get(market, {}).get('features', []))
         }
     
-    validation = validate_config(config)
+    validation = validate_snapshot(snapshot)
+    
+    draft = load_draft(session_draft_id())
+    if draft:
+        draft = {
+            'baseVersion': draft['baseVersion'],
+            'operations': len(draft['patch']),
+            'updatedAt': draft['updatedAt'],
+            'stale': draft['baseVersion'] != snapshot['version']
+        }
     
     return jsonify({
         'metadata': metadata,
+        'draft': draft,
         'stats': stats,
-        'validation': validation
+        'validation': validation,
+        'storage': CONFIG_BACKEND,
+        'configCache': config_store.get_stats(),
+        'responseCache': response_cache.get_stats(),
+        'validationCache': get_validation_stats(),
+        'drafts': get_draft_stats()
     })
 
+def cache_samples():
+    config_stats = config_store.get_stats()
+    response_stats = response_cache.get_stats()
+    validation_stats = get_validation_stats()
+    
+    # Hit ratio per cache is hit / (hit + miss) over rate() of these.
+    return [
+        ('falcon_cache_requests_total', 'counter', 'Cache lookups by cache and result', [
+            ({'cache': 'config', 'result': 'hit'}, config_stats['hits']),
+            ({'cache': 'config', 'result': 'miss'}, config_stats['reloads']),
+            ({'cache': 'response', 'result': 'hit'}, response_stats['hits']),
+            ({'cache': 'response', 'result': 'miss'}, response_stats['misses']),
+            ({'cache': 'validation', 'result': 'hit'}, validation_stats['marketsReused']),
+            ({'cache': 'validation', 'result': 'miss'}, validation_stats['marketsChecked'])
+        ]),
+        ('falcon_config_load_errors_total', 'counter', 'Failed config loads', [({}, config_stats['errors'])]),
+        ('falcon_config_generation', 'gauge', 'Config snapshots loaded by this process', [({}, config_stats['generation'])]),
+        ('falcon_response_cache_evictions_total', 'counter', 'Responses evicted from the response cache', [({}, response_stats['evictions'])]),
+        ('falcon_response_cache_bytes', 'gauge', 'Encoded bytes held by the response cache', [({}, response_stats['bytes'])]),
+        ('falcon_response_cache_entries', 'gauge', 'Responses held by the response cache', [({}, response_stats['entries'])])
+    ]
+
+@app.route('/metrics')
+def prometheus_metrics():
+    if metrics.METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {metrics.METRICS_TOKEN}":
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return Response(metrics.render(cache_samples()), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api')
 def api_index():
     endpoints = {
@@ -462,13 +1213,28 @@ def api_index():
             'GET /api/features?market=UK': 'Get features for a market',
             'GET /api/availability?market=UK&vehicle=...': 'Get availability matrix',
             'GET /api/pricing?market=UK&vehicle=...': 'Get pricing information',
-            'GET /api/tech?vehicle=...': 'Get technical specifications'
+            'GET /api/tech?vehicle=...': 'Get technical specifications',
+            'GET /api/tech?market=US&vehicle=...': 'Get technical specifications in the market\'s units (imperial for US)',
+            'GET /api/vehicle-bundle?market=UK&vehicle=...': 'Get availability, pricing and specs for a vehicle in one response',
+            'GET /api/search?market=UK&standard=...&feature=...&engine=...&minPrice=&maxPrice=&maxSpec=0-100 km/h (s):8&sort=price&page=1': 'Search vehicles with paginated results and facet counts',
+            'GET /api/export?market=all&format=csv': 'Stream availability status, option price and base price per market, vehicle and feature (csv, ndjson or xlsx)',
+            'POST /api/quote': 'Validate a feature selection and price it',
+            'POST /api/quote/batch': 'Price many (market, vehicle, features) selections in one request',
+            'GET /metrics': 'Prometheus metrics: route latency, stage timings, cache hits and parser throughput (Bearer METRICS_TOKEN if set)'
         },
         'Author Endpoints (requires authentication)': {
-            'POST /api/author/upload': 'Upload Excel file',
+            'POST /api/author/upload': 'Upload Excel file (processed in the background)',
+            'POST /api/author/upload/bulk': 'Upload several Excel files or a .zip of them, applied as one change',
+            'GET /api/author/jobs/<id>': 'Get upload job progress and result',
             'POST /api/author/ai-edit': 'Apply AI-powered edits',
             'POST /api/author/save': 'Save working configuration',
             'POST /api/author/discard': 'Discard working configuration',
+            'GET /api/author/export': 'Download the saved configuration as JSON',
+            'GET /api/author/versions': 'List saved configuration versions',
+            'GET /api/author/versions/<revision>/diff?against=...': 'JSON Patch between a version and the one before it, another version or "current"',
+            'POST /api/author/versions/<revision>/rollback': 'Restore a saved version',
+            'GET /api/author/profiles': 'List recent request profiles (profile any request with X-Profile: 1 or ?profile=1|cprofile|sample)',
+            'GET /api/author/profiles/<id>?format=text': 'Download a profile (.pstats for cProfile, collapsed stacks for the sampler) or read its summary',
             'GET /api/author/status': 'Get data status and validation'
         }
     }
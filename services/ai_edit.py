@@ -2,10 +2,232 @@ import os
 import json
 import re
 
-def apply_ai_edit_openai(config, instructions):
-    try:
+from services.edit_rules import apply_edit_script
+from services.json_patch import generate_patch, describe_patch, apply_patch, escape_token
+
+# 'scoped' sends only the markets/sections/features an instruction refers to
+# and asks for a JSON Patch back; 'full' sends the whole config as before.
+AI_EDIT_SCOPE = os.getenv('AI_EDIT_SCOPE', 'scoped')
+AI_EDIT_MODEL = os.getenv('AI_EDIT_MODEL', 'gpt-3.5-turbo')
+
+PRICING_WORDS = {'price', 'option', 'options', 'prices', 'pricing', 'cost', 'costs', 'increase', 'decrease', 'discount', 'cheaper', 'base'}
+AVAILABILITY_WORDS = {'standard', 'optional', 'option', 'options', 'available', 'availability', 'unavailable'}
+# S, O and NA are only status codes after "to" or "as" ("set Sunroof to S");
+# on their own they turn up in ordinary text ("it's").
+STATUS_CODE = re.compile(r'\b(?:to|as)\s+(?:s|o|na|n/a)\b')
+TECH_WORDS = {'spec', 'specs', 'specification', 'engine', 'engines', 'param', 'parameter'}
+STRUCTURE_WORDS = {'add', 'remove', 'delete', 'feature', 'features'}
+
+def extract_json_text(result_text):
+    json_match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
+    if json_match:
+        return json_match.group(1)
+    elif result_text.startswith('```') and result_text.endswith('```'):
+        return result_text[3:-3].strip()
+    return result_text
+
+class LocalEditClient:
+    # Offline stand-in for the OpenAI client. It reads the configuration (or
+    # excerpt) and instructions out of the prompt and applies them with the
+    # rule based editor. Scoped prompts are answered with a JSON Patch and
+    # full prompts with the whole modified configuration, the same contracts
+    # the prompts ask of the model.
+    def __init__(self):
+        self.chat = self
+        self.completions = self
+    
+    def create(self, model=None, messages=None, **kwargs):
+        prompt = messages[-1]['content']
+        document_text, _, instructions = prompt.partition('\n\nInstructions: ')
+        heading, document_text = document_text.split('\n', 1)
+        document = json.loads(document_text)
+        instructions = instructions.split('\n\n', 1)[0]
+        
+        result = apply_ai_edit_stub(document, instructions)
+        modified = result['config'] if result['success'] else document
+        if heading.startswith('Configuration excerpt'):
+            content = json.dumps(generate_patch(document, modified))
+        else:
+            content = json.dumps(modified)
+        
+        message = type('Message', (), {'content': content})()
+        choice = type('Choice', (), {'message': message})()
+        return type('Response', (), {'choices': [choice]})()
+
+def get_ai_client():
+    if os.getenv('AI_EDIT_CLIENT') == 'local':
+        return LocalEditClient()
+    if os.getenv('OPENAI_API_KEY'):
         from openai import OpenAI
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        return OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    return None
+
+def client_method(client):
+    return 'local' if isinstance(client, LocalEditClient) else 'openai'
+
+def resolve_edit_scope(config, instructions):
+    text = instructions.lower()
+    words = set(re.findall(r'[a-z0-9]+', text))
+    
+    markets = [m for m in config.get('markets', []) if m.lower() in words]
+    if not markets:
+        markets = list(config.get('markets', []))
+    
+    tech = config.get('tech', {})
+    params = [p for p in tech.get('params', []) if re.sub(r'\s*\(.*?\)', '', p).lower() in text]
+    engines = [e for e in tech.get('engines', []) if e.lower() in text]
+    structural = bool(words & STRUCTURE_WORDS) and not words & TECH_WORDS
+    
+    sections = []
+    if structural or words & AVAILABILITY_WORDS or STATUS_CODE.search(text):
+        sections.append('availability')
+    if structural or words & PRICING_WORDS:
+        sections.append('pricing')
+    if params or engines or words & TECH_WORDS:
+        sections.append('tech')
+    
+    if not sections:
+        return None
+    
+    features = set()
+    for market in markets:
+        features.update(config.get('availability', {}).get(market, {}).get('features', []))
+        features.update(config.get('pricing', {}).get(market, {}).get('featurePrices', {}).keys())
+    matched_features = sorted(f for f in features if isinstance(f, str) and f.lower() in text)
+    
+    return {
+        'markets': markets,
+        'sections': sections,
+        'features': matched_features,
+        'params': params,
+        'engines': engines
+    }
+
+def build_scoped_slice(config, scope):
+    wanted = set(scope['features'])
+    # The scoped markets are listed so "for all" instructions resolve to them.
+    excerpt = {'markets': [m for m in config.get('markets', []) if m in scope['markets']]}
+    
+    def keep(rows):
+        if not wanted:
+            return dict(rows)
+        return {k: v for k, v in rows.items() if k in wanted}
+    
+    if 'availability' in scope['sections']:
+        excerpt['availability'] = {}
+        for market in scope['markets']:
+            avail_data = config.get('availability', {}).get(market)
+            if avail_data is not None:
+                excerpt['availability'][market] = {
+                    'features': avail_data.get('features', []),
+                    'vehicles': avail_data.get('vehicles', []),
+                    'matrix': keep(avail_data.get('matrix', {}))
+                }
+    
+    if 'pricing' in scope['sections']:
+        excerpt['pricing'] = {}
+        for market in scope['markets']:
+            pricing_data = config.get('pricing', {}).get(market)
+            if pricing_data is not None:
+                excerpt['pricing'][market] = {
+                    'vehicles': pricing_data.get('vehicles', []),
+                    'featurePrices': keep(pricing_data.get('featurePrices', {}))
+                }
+    
+    if 'tech' in scope['sections']:
+        table = config.get('tech', {}).get('table', {})
+        params = scope['params'] or list(table.keys())
+        excerpt['tech'] = {
+            'engines': config.get('tech', {}).get('engines', []),
+            'params': config.get('tech', {}).get('params', []),
+            'table': {p: table[p] for p in params if p in table}
+        }
+    
+    return excerpt
+
+def scope_prefixes(scope):
+    prefixes = []
+    for section in ('availability', 'pricing'):
+        if section in scope['sections']:
+            prefixes.extend(f"/{section}/{escape_token(m)}/" for m in scope['markets'])
+    if 'tech' in scope['sections']:
+        prefixes.extend(['/tech/table/', '/tech/params/', '/tech/engines/'])
+    return prefixes
+
+def check_patch_scope(patch, scope):
+    if not isinstance(patch, list):
+        raise ValueError('Model response is not a JSON Patch array')
+    prefixes = scope_prefixes(scope)
+    for op in patch:
+        if not isinstance(op, dict):
+            raise ValueError('Patch operations must be objects')
+        for pointer in (op.get('path'), op.get('from')):
+            if pointer is not None and not any(pointer.startswith(prefix) for prefix in prefixes):
+                raise ValueError(f"Patch touches {pointer}, outside the scope of the instruction")
+
+def apply_ai_edit_scoped(config, instructions, client, scope):
+    method = f"{client_method(client)}-scoped"
+    try:
+        excerpt = build_scoped_slice(config, scope)
+        
+        system_prompt = """You are a configuration editor for a vehicle configurator system.
+You will receive an excerpt of a JSON configuration and natural language instructions.
+Return ONLY a JSON array of RFC 6902 JSON Patch operations that apply the instructions.
+Paths are absolute JSON pointers into the full configuration, and the excerpt uses the same paths.
+Only touch paths that appear in the excerpt. Do not include any explanatory text.
+
+Excerpt structure:
+- markets: the markets this excerpt covers ("all" means these); read-only
+- availability.<market>.features: every feature name, in order (list indices are absolute)
+- availability.<market>.matrix.<feature>.<vehicle>: S=Standard, O=Optional, NA=Not Available
+- pricing.<market>.vehicles[i].basePrice and pricing.<market>.featurePrices.<feature>.<vehicle>
+- tech.params and tech.engines: every spec and engine name, in order
+- tech.table.<param>.<engine>: technical specification values"""
+        
+        user_prompt = f"""Configuration excerpt:
+{json.dumps(excerpt)}
+
+Instructions: {instructions}
+
+Return the JSON Patch array."""
+        
+        response = client.chat.completions.create(
+            model=AI_EDIT_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.1,
+            max_tokens=1500
+        )
+        
+        patch = json.loads(extract_json_text(response.choices[0].message.content.strip()))
+        if isinstance(patch, dict) and 'patch' in patch:
+            patch = patch['patch']
+        check_patch_scope(patch, scope)
+        
+        return {
+            'success': True,
+            'config': apply_patch(config, patch),
+            'patch': patch,
+            'scope': scope,
+            'changes': describe_patch(config, patch),
+            'method': method
+        }
+    
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'method': method
+        }
+
+def apply_ai_edit_openai(config, instructions, client=None):
+    method = client_method(client) if client is not None else 'openai'
+    try:
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
         
         system_prompt = """You are a configuration editor for a vehicle configurator system. 
 You will receive a JSON configuration and natural language instructions to modify it.
@@ -33,7 +255,7 @@ Instructions: {instructions}
 Return the modified configuration as valid JSON."""
         
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=AI_EDIT_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
@@ -42,144 +264,45 @@ Return the modified configuration as valid JSON."""
             max_tokens=4000
         )
         
-        result_text = response.choices[0].message.content.strip()
-        
-        json_match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
-        if json_match:
-            result_text = json_match.group(1)
-        elif result_text.startswith('```') and result_text.endswith('```'):
-            result_text = result_text[3:-3].strip()
+        result_text = extract_json_text(response.choices[0].message.content.strip())
         
         modified_config = json.loads(result_text)
         
         return {
             'success': True,
             'config': modified_config,
-            'method': 'openai'
+            'method': method
         }
     
     except Exception as e:
         return {
             'success': False,
             'error': str(e),
-            'method': 'openai'
+            'method': method
         }
 
 def apply_ai_edit_stub(config, instructions):
-    import copy
-    modified_config = copy.deepcopy(config)
-    
-    instructions_lower = instructions.lower()
-    applied_changes = []
+    result = apply_edit_script(config, instructions)
+    result['method'] = 'stub'
     
-    set_pattern = r'set\s+(.+?)\s+to\s+(s|o|na)\s+for\s+(uk|eu|us)\s+(.+?)(?:\s|$)'
-    set_match = re.search(set_pattern, instructions_lower, re.IGNORECASE)
+    if not result['success']:
+        result['error'] = f"Could not parse instructions ({result['error']}). Try patterns like: \"set [feature] to O for UK [vehicle]\", \"increase base price by 500 for US Sport\" or \"+2% on all EU options\""
     
-    if set_match:
-        feature = set_match.group(1).strip()
-        status = set_match.group(2).upper()
-        market = set_match.group(3).upper()
-        vehicle_pattern = set_match.group(4).strip()
-        
-        feature_capitalized = feature.title()
-        
-        if market in modified_config.get('availability', {}):
-            avail_data = modified_config['availability'][market]
-            matrix = avail_data.get('matrix', {})
-            
-            matching_features = [f for f in matrix.keys() if feature.lower() in f.lower()]
-            if matching_features:
-                feature = matching_features[0]
-            else:
-                feature = feature_capitalized
-            
-            if feature in matrix:
-                for vehicle_id in matrix[feature].keys():
-                    if vehicle_pattern in vehicle_id.lower() or 'all' in vehicle_pattern:
-                        matrix[feature][vehicle_id] = status
-                        applied_changes.append(f"Set '{feature}' to '{status}' for '{vehicle_id}' in {market}")
-        
-        return {
-            'success': True,
-            'config': modified_config,
-            'changes': applied_changes,
-            'method': 'stub'
-        }
-    
-    price_pattern = r'(increase|decrease)\s+(.+?)\s+(?:price|by)\s+.*?(\d+)\s+for\s+(uk|eu|us)\s+(.+?)(?:\s|$)'
-    price_match = re.search(price_pattern, instructions_lower, re.IGNORECASE)
-    
-    if price_match:
-        action = price_match.group(1)
-        price_type = price_match.group(2).strip()
-        amount = float(price_match.group(3))
-        market = price_match.group(4).upper()
-        vehicle_pattern = price_match.group(5).strip()
-        
-        if action == 'decrease':
-            amount = -amount
-        
-        if market in modified_config.get('pricing', {}):
-            pricing_data = modified_config['pricing'][market]
-            
-            if 'base' in price_type:
-                for vehicle in pricing_data.get('vehicles', []):
-                    if vehicle_pattern in vehicle['id'].lower() or 'all' in vehicle_pattern:
-                        vehicle['basePrice'] += amount
-                        applied_changes.append(f"{action.capitalize()}d base price by {abs(amount)} for '{vehicle['id']}' in {market}")
-            
-            else:
-                feature_prices = pricing_data.get('featurePrices', {})
-                for feature, vehicles in feature_prices.items():
-                    for vehicle_id, price in vehicles.items():
-                        if isinstance(price, (int, float)) and (vehicle_pattern in vehicle_id.lower() or 'all' in vehicle_pattern):
-                            vehicles[vehicle_id] += amount
-                            applied_changes.append(f"{action.capitalize()}d '{feature}' price by {abs(amount)} for '{vehicle_id}' in {market}")
-        
-        return {
-            'success': True,
-            'config': modified_config,
-            'changes': applied_changes,
-            'method': 'stub'
-        }
-    
-    return {
-        'success': False,
-        'error': 'Could not parse instructions. Try patterns like: "set [feature] to O for UK [vehicle]" or "increase base price by 500 for US Sport"',
-        'method': 'stub',
-        'changes': []
-    }
+    return result
 
 def apply_ai_edit(config, instructions):
-    if os.getenv('OPENAI_API_KEY'):
-        return apply_ai_edit_openai(config, instructions)
-    else:
+    client = get_ai_client()
+    if client is None:
         return apply_ai_edit_stub(config, instructions)
+    
+    if AI_EDIT_SCOPE != 'full':
+        scope = resolve_edit_scope(config, instructions)
+        if scope:
+            return apply_ai_edit_scoped(config, instructions, client, scope)
+    
+    return apply_ai_edit_openai(config, instructions, client)
 
-def generate_diff(original, modified):
-    diff = []
-    
-    def compare_dicts(path, orig, mod):
-        all_keys = set(list(orig.keys()) + list(mod.keys()))
-        for key in all_keys:
-            new_path = f"{path}.{key}" if path else key
-            
-            if key not in orig:
-                diff.append(f"+ ADDED {new_path}: {mod[key]}")
-            elif key not in mod:
-                diff.append(f"- REMOVED {new_path}: {orig[key]}")
-            elif orig[key] != mod[key]:
-                if isinstance(orig[key], dict) and isinstance(mod[key], dict):
-                    compare_dicts(new_path, orig[key], mod[key])
-                elif isinstance(orig[key], list) and isinstance(mod[key], list):
-                    if orig[key] != mod[key]:
-                        diff.append(f"~ MODIFIED {new_path}: {orig[key]} → {mod[key]}")
-                else:
-                    diff.append(f"~ MODIFIED {new_path}: {orig[key]} → {mod[key]}")
-    
-    if isinstance(original, dict) and isinstance(modified, dict):
-        compare_dicts("", original, modified)
-    else:
-        diff.append(f"Complete replacement: {original} → {modified}")
-    
-    return diff
+def generate_diff(original, modified, patch=None):
+    if patch is None:
+        patch = generate_patch(original, modified)
+    return describe_patch(original, patch)
@@ -1,9 +1,23 @@
+from services import columnar
+
 def get_feature_status(feature, vehicle_id, availability_data):
     matrix = availability_data.get('matrix', {})
     if feature in matrix:
         return matrix[feature].get(vehicle_id, 'NA')
     return 'NA'
 
+def get_vehicle_features(vehicle_id, availability_data, columns=None):
+    if columns is not None:
+        return columnar.vehicle_statuses(columns, vehicle_id)
+    
+    features = []
+    for feature, vehicles in availability_data.get('matrix', {}).items():
+        features.append({
+            'feature': feature,
+            'status': vehicles.get(vehicle_id, 'NA')
+        })
+    return features
+
 def get_available_features(vehicle_id, availability_data):
     matrix = availability_data.get('matrix', {})
     available = []
@@ -0,0 +1,151 @@
+import multiprocessing
+import os
+import shutil
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from werkzeug.utils import secure_filename
+
+from services.parser import parse_by_type, detect_file_type, extract_market_from_filename
+from services.markets import get_market_codes
+from services.metrics import record_parse
+
+PARSE_PROCESSES = int(os.getenv('BULK_PARSE_PROCESSES', str(min(4, os.cpu_count() or 1))))
+MAX_WORKBOOKS = int(os.getenv('BULK_MAX_WORKBOOKS', '50'))
+MAX_UNZIPPED_BYTES = int(os.getenv('BULK_MAX_UNZIPPED_BYTES', str(200 * 1024 * 1024)))
+
+def unique_path(folder, filename):
+    path = os.path.join(folder, filename)
+    counter = 1
+    while os.path.exists(path):
+        stem, ext = os.path.splitext(filename)
+        path = os.path.join(folder, f"{stem}_{counter}{ext}")
+        counter += 1
+    return path
+
+def describe_workbook(filename, path, registry=None):
+    file_type = detect_file_type(filename)
+    if not file_type:
+        return None, f"{filename}: could not detect file type (include availability/dummy, pricing, or technical/tech)"
+
+    market = None
+    if file_type in ('availability', 'pricing'):
+        market = extract_market_from_filename(filename, registry)
+        if not market:
+            return None, f"{filename}: could not detect market from filename (include one of {', '.join(get_market_codes(registry))})"
+
+    return {
+        'filename': os.path.basename(path),
+        'originalFilename': filename,
+        'path': path,
+        'fileType': file_type,
+        'market': market
+    }, None
+
+def extract_zip(stream, upload_folder, prefix):
+    saved = []
+    with zipfile.ZipFile(stream) as archive:
+        members = [
+            m for m in archive.infolist()
+            if not m.is_dir() and m.filename.lower().endswith('.xlsx') and not m.filename.startswith('__MACOSX/')
+        ]
+        if len(members) > MAX_WORKBOOKS:
+            raise ValueError(f"archive contains more than {MAX_WORKBOOKS} workbooks")
+        if sum(m.file_size for m in members) > MAX_UNZIPPED_BYTES:
+            raise ValueError('archive is too large once extracted')
+
+        for member in members:
+            filename = secure_filename(os.path.basename(member.filename))
+            path = unique_path(upload_folder, f"{prefix}_{filename}")
+            with archive.open(member) as src, open(path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            saved.append((filename, path))
+    return saved
+
+def save_workbooks(files, upload_folder, registry=None):
+    os.makedirs(upload_folder, exist_ok=True)
+    prefix = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    saved = []
+    errors = []
+    for file in files:
+        filename = secure_filename(file.filename or '')
+        if filename.endswith('.xlsx'):
+            path = unique_path(upload_folder, f"{prefix}_{filename}")
+            file.save(path)
+            saved.append((filename, path))
+        elif filename.endswith('.zip'):
+            try:
+                saved.extend(extract_zip(file.stream, upload_folder, prefix))
+            except (zipfile.BadZipFile, ValueError) as e:
+                errors.append(f"{filename}: {e}")
+        else:
+            errors.append(f"{filename or 'unnamed file'}: only .xlsx and .zip files are allowed")
+
+    if len(saved) > MAX_WORKBOOKS:
+        errors.append(f"at most {MAX_WORKBOOKS} workbooks can be uploaded at once")
+
+    entries = []
+    for filename, path in saved:
+        entry, error = describe_workbook(filename, path, registry)
+        if error:
+            errors.append(error)
+        else:
+            entries.append(entry)
+
+    if errors:
+        for _, path in saved:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return [], errors
+
+    return entries, []
+
+def parsed_row_count(file_type, parsed):
+    if file_type == 'availability':
+        return len(parsed['features'])
+    elif file_type == 'pricing':
+        return len(parsed['featurePrices'])
+    return len(parsed['params'])
+
+def timed_parse(path, file_type, market):
+    # Runs in the worker process; the parent records the metrics.
+    start = time.perf_counter()
+    parsed = parse_by_type(path, file_type, market)
+    return parsed, time.perf_counter() - start
+
+def parse_workbooks(entries, on_parsed=None):
+    results = [None] * len(entries)
+    workers = min(PARSE_PROCESSES, len(entries))
+
+    if workers <= 1:
+        for idx, entry in enumerate(entries):
+            results[idx], seconds = timed_parse(entry['path'], entry['fileType'], entry['market'])
+            record_parse(entry['fileType'], parsed_row_count(entry['fileType'], results[idx]), seconds)
+            if on_parsed:
+                on_parsed(entry, results[idx], idx + 1)
+        return results
+
+    # spawn rather than fork: this runs on a job thread of a multithreaded server.
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(timed_parse, entry['path'], entry['fileType'], entry['market']): idx
+            for idx, entry in enumerate(entries)
+        }
+        done = 0
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                results[idx], seconds = future.result()
+            except Exception as e:
+                raise RuntimeError(f"{entries[idx]['originalFilename']}: {e}")
+            record_parse(entries[idx]['fileType'], parsed_row_count(entries[idx]['fileType'], results[idx]), seconds)
+            done += 1
+            if on_parsed:
+                on_parsed(entries[idx], results[idx], done)
+
+    return results
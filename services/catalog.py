@@ -0,0 +1,68 @@
+import threading
+
+from services.columnar import build_market_columns
+from services.pricing import index_base_prices, build_price_arrays
+from services.tech import index_engine_specs, parse_tech_specs, build_spec_views
+from services.search import build_search_index
+from services.metrics import timed
+
+# Lookup indexes compiled from a config snapshot. The catalog is cached by the
+# identity of the config it was built from, so it must only be used with
+# configs that are never mutated (i.e. the shared snapshot from config_store).
+_lock = threading.Lock()
+_cached = None
+
+def build_market_index(availability_data, pricing_data, tech_specs=None):
+    # Per-vehicle feature and price lookups and batch quotes read the columnar
+    # model. It is built in addition to the JSON snapshot, which stays resident
+    # for edits, validation, history and exports, so it costs memory; it is
+    # there to make those lookups and quotes fast.
+    columns = build_market_columns(availability_data, pricing_data)
+    base_prices = index_base_prices(pricing_data)
+    vehicles = availability_data.get('vehicles', [])
+    return {
+        'vehicles': vehicles,
+        'columns': columns,
+        'basePrices': base_prices,
+        'priceArrays': build_price_arrays(availability_data, pricing_data, columns),
+        'search': build_search_index(vehicles, columns, base_prices, tech_specs or {})
+    }
+
+def build_catalog(config):
+    availability = config.get('availability', {})
+    pricing = config.get('pricing', {})
+
+    tech = config.get('tech', {})
+    # Tech values are parsed into numbers once per config version; the
+    # search index and both unit-system views are built from that.
+    tech_specs = parse_tech_specs(tech)
+
+    markets = {}
+    for market in list(availability.keys()) + [m for m in pricing.keys() if m not in availability]:
+        markets[market] = build_market_index(availability.get(market, {}), pricing.get(market, {}), tech_specs)
+
+    return {
+        'markets': markets,
+        'engineSpecs': index_engine_specs(tech),
+        'techSpecs': tech_specs,
+        'specViews': build_spec_views(tech, tech_specs)
+    }
+
+def get_catalog(config):
+    global _cached
+    cached = _cached
+    if cached is not None and cached[0] is config:
+        return cached[1]
+
+    with _lock:
+        cached = _cached
+        if cached is not None and cached[0] is config:
+            return cached[1]
+
+        with timed('catalog_build'):
+            catalog = build_catalog(config)
+        _cached = (config, catalog)
+        return catalog
+
+def get_market_index(config, market):
+    return get_catalog(config)['markets'].get(market, {})
@@ -0,0 +1,188 @@
+import sys
+
+import numpy as np
+
+# Columnar view of one market's availability matrix and feature prices, built
+# alongside the JSON snapshot (which stays the source of truth) to speed up
+# per-vehicle lookups and quotes. Vehicle and feature ids are interned once on
+# two axes, statuses are a uint8 code per (vehicle, feature) and prices a
+# float64 array on the same axes, so "everything for vehicle X" is a row slice
+# and "feature Y on every vehicle" a column slice. priceKinds records what each
+# JSON price cell held (missing, float, int, the 'NA' marker or anything else)
+# so lookups return the same values the JSON had. Cells come back in the
+# column order their matrix rows share, which is the order the parsers write.
+
+STATUS_LABELS = ['NA', 'S', 'O']
+STATUS_NA = 0
+STATUS_STANDARD = 1
+STATUS_OPTIONAL = 2
+STATUS_MISSING = 255
+
+PRICE_MISSING = 0
+PRICE_FLOAT = 1
+PRICE_INT = 2
+PRICE_NA = 3
+PRICE_OTHER = 4
+
+def _axis(names, index, *sources):
+    for source in sources:
+        for name in source:
+            if name not in index:
+                if isinstance(name, str):
+                    name = sys.intern(name)
+                index[name] = len(names)
+                names.append(name)
+
+def _column_order(rows):
+    # Cell order shared by the rows of a matrix: the first row's keys, plus
+    # any key a later row introduces.
+    order = {}
+    for cells in rows.values():
+        for key in cells:
+            if key not in order:
+                order[key] = len(order)
+    return list(order)
+
+def build_market_columns(availability_data, pricing_data):
+    availability_data = availability_data or {}
+    pricing_data = pricing_data or {}
+    matrix = availability_data.get('matrix', {})
+    feature_prices = pricing_data.get('featurePrices', {})
+    pricing_vehicles = pricing_data.get('vehicles', [])
+
+    matrix_columns = _column_order(matrix)
+    price_columns = _column_order(feature_prices)
+
+    vehicles, vehicle_index = [], {}
+    _axis(vehicles, vehicle_index, availability_data.get('vehicles', []), matrix_columns,
+          price_columns, [v.get('id') for v in pricing_vehicles])
+    features, feature_index = [], {}
+    _axis(features, feature_index, matrix.keys(), feature_prices.keys())
+
+    labels = list(STATUS_LABELS)
+    label_codes = {label: code for code, label in enumerate(labels)}
+    status = np.full((len(vehicles), len(features)), STATUS_MISSING, dtype=np.uint8)
+    for feature, cells in matrix.items():
+        col = feature_index[feature]
+        for vehicle_id, value in cells.items():
+            code = label_codes.get(value)
+            if code is None:
+                code = len(labels)
+                if code >= STATUS_MISSING:
+                    raise ValueError('Too many distinct availability statuses')
+                labels.append(value)
+                label_codes[value] = code
+            status[vehicle_index[vehicle_id], col] = code
+
+    prices = np.full((len(vehicles), len(features)), np.nan, dtype=np.float64)
+    kinds = np.zeros((len(vehicles), len(features)), dtype=np.uint8)
+    extras = {}
+    for feature, cells in feature_prices.items():
+        col = feature_index[feature]
+        for vehicle_id, value in cells.items():
+            row = vehicle_index[vehicle_id]
+            if isinstance(value, float):
+                prices[row, col] = value
+                kinds[row, col] = PRICE_FLOAT
+            elif isinstance(value, int) and not isinstance(value, bool):
+                prices[row, col] = value
+                kinds[row, col] = PRICE_INT
+            elif value == 'NA':
+                kinds[row, col] = PRICE_NA
+            else:
+                kinds[row, col] = PRICE_OTHER
+                extras[(row, col)] = value
+
+    return {
+        'vehicles': vehicles,
+        'features': features,
+        'vehicleIndex': vehicle_index,
+        'featureIndex': feature_index,
+        'statusLabels': labels,
+        'status': status,
+        'prices': prices,
+        'priceKinds': kinds,
+        'priceExtras': extras,
+        'matrixFeatures': np.array([feature_index[f] for f in matrix], dtype=np.int32),
+        'matrixVehicles': np.array([vehicle_index[v] for v in matrix_columns], dtype=np.int32),
+        'priceFeatures': np.array([feature_index[f] for f in feature_prices], dtype=np.int32),
+        'priceVehicles': np.array([vehicle_index[v] for v in price_columns], dtype=np.int32),
+        'availabilityFeatures': list(availability_data.get('features', [])),
+        'availabilityVehicles': list(availability_data.get('vehicles', [])),
+        'pricingVehicles': [dict(v) for v in pricing_vehicles]
+    }
+
+def _price_value(columns, row, col, kind):
+    if kind == PRICE_FLOAT:
+        return float(columns['prices'][row, col])
+    if kind == PRICE_INT:
+        return int(columns['prices'][row, col])
+    if kind == PRICE_NA:
+        return 'NA'
+    return columns['priceExtras'][(row, col)]
+
+def vehicle_row(columns, vehicle_id):
+    return columns['vehicleIndex'].get(vehicle_id)
+
+def vehicle_statuses(columns, vehicle_id):
+    # Status of every matrix feature for one vehicle, in matrix order; cells
+    # the matrix does not have read as 'NA'.
+    features = columns['features']
+    labels = columns['statusLabels']
+    matrix_features = columns['matrixFeatures']
+    row = vehicle_row(columns, vehicle_id)
+    if row is None:
+        return [{'feature': features[col], 'status': 'NA'} for col in matrix_features.tolist()]
+
+    codes = columns['status'][row, matrix_features].tolist()
+    return [
+        {'feature': features[col], 'status': labels[code] if code != STATUS_MISSING else 'NA'}
+        for col, code in zip(matrix_features.tolist(), codes)
+    ]
+
+def vehicle_prices(columns, vehicle_id):
+    # Priced features for one vehicle in pricing order, skipping 'NA' and
+    # empty cells.
+    row = vehicle_row(columns, vehicle_id)
+    if row is None:
+        return {}
+
+    features = columns['features']
+    price_features = columns['priceFeatures']
+    kinds = columns['priceKinds'][row, price_features].tolist()
+    prices = {}
+    for col, kind in zip(price_features.tolist(), kinds):
+        if kind == PRICE_MISSING or kind == PRICE_NA:
+            continue
+        value = _price_value(columns, row, col, kind)
+        if value is not None:
+            prices[features[col]] = value
+    return prices
+
+def vehicle_cells(columns, vehicle_id):
+    # (feature, status, price) for every matrix feature of one vehicle, in
+    # matrix order. Missing statuses read as 'NA'; price is None where the
+    # pricing sheet has no price or 'NA'.
+    features = columns['features']
+    labels = columns['statusLabels']
+    matrix_features = columns['matrixFeatures']
+    row = vehicle_row(columns, vehicle_id)
+    if row is None:
+        return [(features[col], 'NA', None) for col in matrix_features.tolist()]
+
+    codes = columns['status'][row, matrix_features].tolist()
+    kinds = columns['priceKinds'][row, matrix_features].tolist()
+    cells = []
+    for col, code, kind in zip(matrix_features.tolist(), codes, kinds):
+        price = None if kind == PRICE_MISSING or kind == PRICE_NA else _price_value(columns, row, col, kind)
+        cells.append((features[col], labels[code] if code != STATUS_MISSING else 'NA', price))
+    return cells
+
+def option_cells(columns, rows, cols):
+    # Option prices, optional flags and which prices the JSON held as floats
+    # for the (row, col) cells given; prices that are not numbers count as 0.
+    kinds = columns['priceKinds'][rows, cols]
+    numeric = (kinds == PRICE_FLOAT) | (kinds == PRICE_INT)
+    option_prices = np.where(numeric, columns['prices'][rows, cols], 0.0)
+    optional = columns['status'][rows, cols] == STATUS_OPTIONAL
+    return option_prices, optional, kinds == PRICE_FLOAT
@@ -0,0 +1,196 @@
+import json
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from services.metrics import record_timing
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Process-wide snapshot of the config file. The snapshot dict is replaced
+# wholesale on reload, never mutated, so readers always see either the old
+# or the new config. Callers that need to modify the config must copy it.
+_lock = threading.Lock()
+_write_lock = threading.RLock()
+_write_depth = 0
+_write_lock_file = None
+_snapshot = None
+_generation = 0
+_stats = {
+    'hits': 0,
+    'reloads': 0,
+    'errors': 0
+}
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _is_current(snapshot, path, stamp):
+    return snapshot is not None and snapshot['path'] == path and snapshot['stamp'] == stamp
+
+def get_revision(config):
+    if not isinstance(config, dict):
+        return 0
+    return config.get('metadata', {}).get('revision', 0)
+
+def _config_version(config):
+    if not isinstance(config, dict):
+        return ''
+    metadata = config.get('metadata', {})
+    if 'revision' in metadata:
+        return f"r{metadata['revision']}"
+    return metadata.get('lastUpdated', '')
+
+def _swap(path, stamp, config):
+    global _snapshot, _generation
+    _generation += 1
+    _snapshot = {
+        'path': path,
+        'stamp': stamp,
+        'generation': _generation,
+        'version': _config_version(config),
+        'config': config
+    }
+    _stats['reloads'] += 1
+    return _snapshot
+
+def get_snapshot(path):
+    try:
+        stamp = _file_stamp(path)
+    except OSError as e:
+        print(f"Error loading config: {e}")
+        _stats['errors'] += 1
+        return None
+
+    snapshot = _snapshot
+    if _is_current(snapshot, path, stamp):
+        _stats['hits'] += 1
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if _is_current(snapshot, path, stamp):
+            _stats['hits'] += 1
+            return snapshot
+
+        start = time.perf_counter()
+        try:
+            with open(path, 'r') as f:
+                config = json.load(f)
+        except Exception as e:
+            print(f"Error loading config: {e}")
+            _stats['errors'] += 1
+            if snapshot is not None and snapshot['path'] == path:
+                return snapshot
+            return None
+
+        record_timing('config_load', time.perf_counter() - start)
+        return _swap(path, stamp, config)
+
+def get_db_snapshot(path):
+    # Same contract as get_snapshot() for the SQLite backend: the stamp is a
+    # token rewritten by every committed save, so checking it is one indexed
+    # read and the catalog is only re-materialized after a change.
+    from services import sqlite_store
+
+    try:
+        stamp = sqlite_store.read_stamp(path)
+    except sqlite3.Error as e:
+        print(f"Error loading config: {e}")
+        _stats['errors'] += 1
+        snapshot = _snapshot
+        if snapshot is not None and snapshot['path'] == path:
+            return snapshot
+        return None
+
+    snapshot = _snapshot
+    if _is_current(snapshot, path, stamp):
+        _stats['hits'] += 1
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if _is_current(snapshot, path, stamp):
+            _stats['hits'] += 1
+            return snapshot
+
+        start = time.perf_counter()
+        try:
+            config = sqlite_store.export_config(path)
+        except sqlite3.Error as e:
+            print(f"Error loading config: {e}")
+            _stats['errors'] += 1
+            if snapshot is not None and snapshot['path'] == path:
+                return snapshot
+            return None
+
+        record_timing('config_load', time.perf_counter() - start)
+        return _swap(path, stamp, config)
+
+@contextmanager
+def write_lock(path):
+    # Serializes config writers across threads (RLock) and across worker
+    # processes (flock on a sidecar lock file). Re-entrant within a thread.
+    global _write_depth, _write_lock_file
+    with _write_lock:
+        if _write_depth == 0 and fcntl is not None:
+            _write_lock_file = open(path + '.lock', 'a')
+            fcntl.flock(_write_lock_file, fcntl.LOCK_EX)
+        _write_depth += 1
+        try:
+            yield
+        finally:
+            _write_depth -= 1
+            if _write_depth == 0 and _write_lock_file is not None:
+                fcntl.flock(_write_lock_file, fcntl.LOCK_UN)
+                _write_lock_file.close()
+                _write_lock_file = None
+
+def write_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.config-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+def publish(path, config_text):
+    with _lock:
+        return _swap(path, _file_stamp(path), json.loads(config_text))
+
+def publish_stamped(path, stamp, config_text):
+    with _lock:
+        return _swap(path, stamp, json.loads(config_text))
+
+def get_stats():
+    snapshot = _snapshot
+    stats = dict(_stats)
+    stats['generation'] = snapshot['generation'] if snapshot else 0
+    return stats
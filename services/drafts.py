@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from services.config_store import write_atomic
+
+# Author drafts, one per session. A draft is the JSON Patch from the config
+# version it was started on to the author's working copy, so it costs about
+# as much as the edit itself. DRAFT_STORE picks where drafts live: 'memory'
+# (per process, LRU bounded), or 'file'/'sqlite' under DRAFT_STORE_PATH so
+# every worker process sees the same drafts.
+DRAFT_STORE = os.getenv('DRAFT_STORE', 'memory')
+DRAFT_STORE_PATH = os.getenv('DRAFT_STORE_PATH')
+MAX_DRAFTS = int(os.getenv('DRAFT_STORE_MAX_DRAFTS', '256'))
+
+def _now():
+    return datetime.utcnow().isoformat() + 'Z'
+
+def _valid_id(draft_id):
+    return bool(draft_id) and all(c in '0123456789abcdef' for c in draft_id)
+
+class MemoryDraftStore:
+    def __init__(self, max_drafts=MAX_DRAFTS):
+        self.max_drafts = max_drafts
+        self._lock = threading.Lock()
+        self._drafts = OrderedDict()
+
+    def get(self, draft_id):
+        with self._lock:
+            draft = self._drafts.get(draft_id)
+            if draft is not None:
+                self._drafts.move_to_end(draft_id)
+            return draft
+
+    def put(self, draft_id, draft):
+        with self._lock:
+            self._drafts[draft_id] = draft
+            self._drafts.move_to_end(draft_id)
+            while len(self._drafts) > self.max_drafts:
+                self._drafts.popitem(last=False)
+
+    def delete(self, draft_id):
+        with self._lock:
+            self._drafts.pop(draft_id, None)
+
+    def count(self):
+        with self._lock:
+            return len(self._drafts)
+
+class FileDraftStore:
+    def __init__(self, folder):
+        self.folder = folder
+
+    def _path(self, draft_id):
+        return os.path.join(self.folder, f"{draft_id}.json")
+
+    def get(self, draft_id):
+        if not _valid_id(draft_id):
+            return None
+        try:
+            with open(self._path(draft_id), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, draft_id, draft):
+        os.makedirs(self.folder, exist_ok=True)
+        write_atomic(self._path(draft_id), json.dumps(draft))
+
+    def delete(self, draft_id):
+        if not _valid_id(draft_id):
+            return
+        try:
+            os.remove(self._path(draft_id))
+        except OSError:
+            pass
+
+    def count(self):
+        try:
+            return sum(1 for name in os.listdir(self.folder) if name.endswith('.json'))
+        except OSError:
+            return 0
+
+class SqliteDraftStore:
+    def __init__(self, path):
+        self.path = path
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with self._lock:
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS drafts ('
+                    'id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at TEXT NOT NULL)'
+                )
+                connection.commit()
+                self._initialized = True
+        return connection
+
+    def get(self, draft_id):
+        connection = self._connect()
+        try:
+            row = connection.execute('SELECT data FROM drafts WHERE id = ?', (draft_id,)).fetchone()
+        finally:
+            connection.close()
+        return json.loads(row[0]) if row else None
+
+    def put(self, draft_id, draft):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO drafts (id, data, updated_at) VALUES (?, ?, ?)',
+                    (draft_id, json.dumps(draft), draft['updatedAt'])
+                )
+        finally:
+            connection.close()
+
+    def delete(self, draft_id):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute('DELETE FROM drafts WHERE id = ?', (draft_id,))
+        finally:
+            connection.close()
+
+    def count(self):
+        connection = self._connect()
+        try:
+            return connection.execute('SELECT COUNT(*) FROM drafts').fetchone()[0]
+        finally:
+            connection.close()
+
+def create_store(kind=None, path=None):
+    kind = kind or DRAFT_STORE
+    if kind == 'file':
+        return FileDraftStore(path or DRAFT_STORE_PATH or 'data/drafts')
+    elif kind == 'sqlite':
+        folder = os.path.dirname(path or DRAFT_STORE_PATH or 'data/drafts.db')
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        return SqliteDraftStore(path or DRAFT_STORE_PATH or 'data/drafts.db')
+    return MemoryDraftStore()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_store()
+    return _store
+
+def set_store(store):
+    global _store
+    with _store_lock:
+        _store = store
+
+def load_draft(draft_id):
+    if not draft_id:
+        return None
+    return get_store().get(draft_id)
+
+def save_draft(draft_id, base_version, patch):
+    draft = {
+        'baseVersion': base_version,
+        'patch': patch,
+        'updatedAt': _now()
+    }
+    get_store().put(draft_id, draft)
+    return draft
+
+def discard_draft(draft_id):
+    if draft_id:
+        get_store().delete(draft_id)
+
+def get_draft_stats():
+    store = get_store()
+    return {
+        'store': type(store).__name__,
+        'drafts': store.count()
+    }
@@ -0,0 +1,377 @@
+import re
+from functools import lru_cache
+
+# Rule-based configuration edits. Instructions are compiled once against a
+# small grammar, and a script applies all of them in one pass over a
+# copy-on-write view of the config: only the containers on the path to a
+# changed value are copied, everything else is shared with the input.
+#
+#   set <feature> to S|O|NA for <market|all> [vehicles]
+#   set|change <spec> for <engine> to <value>
+#   increase|decrease <base|options|feature> price by <n>[%] for <market|all> [vehicles]
+#   +<n>[%] | -<n>[%] on [all] [market] <base prices|options|feature> [for vehicles]
+#   add [feature] <feature> to <market|all> [as S|O|NA] [at <price>]
+#   add spec <spec> [with <value>]
+#   remove [feature] <feature> from <market|all>
+#   remove spec <spec>
+#
+# Statements are separated by newlines or semicolons; blank lines and lines
+# starting with # are ignored.
+
+STATUS = r'(?P<status>s|o|na|n/a|standard|optional|not available|unavailable)'
+AMOUNT = r'(?P<amount>\d+(?:\.\d+)?)\s*(?P<percent>%|percent)?'
+
+PATTERNS = [
+    ('set_status', re.compile(
+        r'^set\s+(?P<feature>.+?)\s+to\s+' + STATUS + r'\s+for\s+(?P<market>\S+)(?:\s+(?P<vehicles>.+))?$',
+        re.IGNORECASE)),
+    ('set_spec', re.compile(
+        r'^(?:set|change)\s+(?P<param>.+?)\s+for\s+(?P<engine>.+?)\s+to\s+(?P<value>.+)$',
+        re.IGNORECASE)),
+    ('adjust_price', re.compile(
+        r'^(?P<action>increase|decrease)\s+(?P<target>.+?)\s+(?:prices?|by)\s+.*?' + AMOUNT +
+        r'\s+for\s+(?P<market>\S+)(?:\s+(?P<vehicles>.+))?$',
+        re.IGNORECASE)),
+    ('shift_price', re.compile(
+        r'^(?P<sign>[+-])\s*' + AMOUNT + r'\s+on\s+(?P<target>.+?)(?:\s+for\s+(?P<vehicles>.+))?$',
+        re.IGNORECASE)),
+    ('add_spec', re.compile(
+        r'^add\s+(?:spec|param|parameter)\s+(?P<param>.+?)(?:\s+with\s+(?P<value>.+))?$',
+        re.IGNORECASE)),
+    ('remove_spec', re.compile(
+        r'^remove\s+(?:spec|param|parameter)\s+(?P<param>.+)$',
+        re.IGNORECASE)),
+    ('add_feature', re.compile(
+        r'^add\s+(?:feature\s+)?(?P<feature>.+?)\s+to\s+(?P<market>\S+)(?:\s+as\s+' + STATUS + r')?'
+        r'(?:\s+(?:at|price)\s+(?P<price>\d+(?:\.\d+)?))?$',
+        re.IGNORECASE)),
+    ('remove_feature', re.compile(
+        r'^remove\s+(?:feature\s+)?(?P<feature>.+?)\s+from\s+(?P<market>\S+)$',
+        re.IGNORECASE)),
+]
+
+STATUS_CODES = {
+    's': 'S', 'standard': 'S',
+    'o': 'O', 'optional': 'O',
+    'na': 'NA', 'n/a': 'NA', 'not available': 'NA', 'unavailable': 'NA'
+}
+
+GENERIC_VEHICLE_WORDS = {'trim', 'trims', 'vehicle', 'vehicles', 'model', 'models', 'variants'}
+
+SPLIT_STATEMENTS = re.compile(r'[\n;]')
+
+class EditSession:
+    def __init__(self, config):
+        self.config = config
+        self.owned = {}
+        self.changes = []
+        self.warnings = []
+
+    def own(self, node):
+        # Containers copied earlier in this session are modified in place;
+        # anything else is still shared with the input and is copied first.
+        if id(node) in self.owned:
+            return node
+        node = dict(node) if isinstance(node, dict) else list(node)
+        self.owned[id(node)] = node
+        return node
+
+    def writable(self, *path):
+        self.config = node = self.own(self.config)
+        for key in path:
+            child = self.own(node[key])
+            node[key] = child
+            node = child
+        return node
+
+@lru_cache(maxsize=4096)
+def compile_statement(statement):
+    for name, pattern in PATTERNS:
+        match = pattern.match(statement)
+        if match:
+            return name, {k: v.strip() if v else v for k, v in match.groupdict().items()}
+    return None
+
+def compile_script(script):
+    ops = []
+    errors = []
+    for line_no, statement in enumerate(SPLIT_STATEMENTS.split(script), start=1):
+        statement = statement.strip().rstrip('.')
+        if not statement or statement.startswith('#'):
+            continue
+        op = compile_statement(statement)
+        if op is None:
+            errors.append(f"Statement {line_no}: could not parse '{statement}'")
+        else:
+            ops.append(op)
+    return ops, errors
+
+def resolve_markets(session, market, section):
+    data = session.config.get(section, {})
+    if market.lower() == 'all':
+        return [m for m in session.config.get('markets', []) if m in data]
+    market = market.upper()
+    if market not in data:
+        session.warnings.append(f"Market '{market}' has no {section} data")
+        return []
+    return [market]
+
+def resolve_name(names, wanted):
+    wanted_lower = wanted.lower()
+    for name in names:
+        if str(name).lower() == wanted_lower:
+            return name
+    for name in names:
+        if wanted_lower in str(name).lower():
+            return name
+    return None
+
+def split_market(session, market, vehicles):
+    # "for all US trims": the market follows 'all' rather than replacing it.
+    if market.lower() == 'all' and vehicles:
+        words = vehicles.split(None, 1)
+        if words[0].upper() in session.config.get('markets', []):
+            return words[0], words[1] if len(words) > 1 else None
+    return market, vehicles
+
+def select_vehicles(vehicles, vehicle_ids):
+    # None selects every vehicle. The whole phrase is matched first; if it
+    # matches nothing, its first word is used on its own, as the original
+    # single-pattern editor did ("for UK Sport Premium" -> "sport").
+    if not vehicles:
+        return None
+    words = vehicles.lower().split()
+    if 'all' in words or all(word in GENERIC_VEHICLE_WORDS for word in words):
+        return None
+    phrase = vehicles.lower()
+    selected = {v for v in vehicle_ids if phrase in v.lower()}
+    if not selected:
+        selected = {v for v in vehicle_ids if words[0] in v.lower()}
+    return selected
+
+def vehicle_matches(selected, vehicle_id):
+    return selected is None or vehicle_id in selected
+
+def format_amount(amount, percent):
+    return f"{abs(amount)}%" if percent else abs(amount)
+
+def shift(value, amount, percent):
+    if percent:
+        return round(value * (1 + amount / 100), 2)
+    return value + amount
+
+def is_price(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def set_status(session, args):
+    status = STATUS_CODES[args['status'].lower()]
+    market, vehicles = split_market(session, args['market'], args['vehicles'])
+    for market in resolve_markets(session, market, 'availability'):
+        matrix = session.config['availability'][market].get('matrix', {})
+        feature = resolve_name(matrix.keys(), args['feature'])
+        if feature is None:
+            session.warnings.append(f"Feature '{args['feature']}' not found in {market}")
+            continue
+
+        selected = select_vehicles(vehicles, matrix[feature].keys())
+        row = None
+        for vehicle_id, current in matrix[feature].items():
+            if vehicle_matches(selected, vehicle_id) and current != status:
+                if row is None:
+                    row = session.writable('availability', market, 'matrix', feature)
+                row[vehicle_id] = status
+                session.changes.append(f"Set '{feature}' to '{status}' for '{vehicle_id}' in {market}")
+
+def set_spec(session, args):
+    table = session.config.get('tech', {}).get('table', {})
+    param = resolve_name(table.keys(), args['param'])
+    if param is None:
+        session.warnings.append(f"Spec '{args['param']}' not found")
+        return
+    engine = resolve_name(table[param].keys(), args['engine'])
+    if engine is None:
+        session.warnings.append(f"Engine '{args['engine']}' not found for '{param}'")
+        return
+
+    session.writable('tech', 'table', param)[engine] = args['value']
+    session.changes.append(f"Set '{param}' to '{args['value']}' for '{engine}'")
+
+def price_target(target):
+    target = target.lower()
+    if 'base' in target:
+        return 'base'
+    if 'option' in target:
+        return 'options'
+    return target
+
+def apply_price_change(session, market, target, amount, percent, vehicles, action):
+    label = format_amount(amount, percent)
+    pricing_data = session.config['pricing'][market]
+
+    selected = select_vehicles(vehicles, [v['id'] for v in pricing_data.get('vehicles', [])])
+
+    if target == 'base':
+        for idx, vehicle in enumerate(pricing_data.get('vehicles', [])):
+            if vehicle_matches(selected, vehicle['id']) and is_price(vehicle.get('basePrice')):
+                new_price = shift(vehicle['basePrice'], amount, percent)
+                if new_price == vehicle['basePrice']:
+                    continue
+                session.writable('pricing', market, 'vehicles', idx)['basePrice'] = new_price
+                session.changes.append(f"{action.capitalize()}d base price by {label} for '{vehicle['id']}' in {market}")
+        return
+
+    feature_prices = pricing_data.get('featurePrices', {})
+    features = list(feature_prices.keys())
+    matrix = None
+    if target == 'options':
+        matrix = session.config.get('availability', {}).get(market, {}).get('matrix', {})
+    elif target not in ('', 'price', 'prices', 'feature', 'features', 'all', 'option'):
+        feature = resolve_name(features, target)
+        if feature is not None:
+            features = [feature]
+
+    for feature in features:
+        row = None
+        statuses = matrix.get(feature, {}) if matrix is not None else None
+        for vehicle_id, price in feature_prices[feature].items():
+            if not is_price(price) or not vehicle_matches(selected, vehicle_id):
+                continue
+            if statuses is not None and statuses.get(vehicle_id) != 'O':
+                continue
+            new_price = shift(price, amount, percent)
+            if new_price == price:
+                continue
+            if row is None:
+                row = session.writable('pricing', market, 'featurePrices', feature)
+            row[vehicle_id] = new_price
+            session.changes.append(f"{action.capitalize()}d '{feature}' price by {label} for '{vehicle_id}' in {market}")
+
+def adjust_price(session, args):
+    amount = float(args['amount'])
+    if args['action'].lower() == 'decrease':
+        amount = -amount
+    target = price_target(args['target'])
+    market, vehicles = split_market(session, args['market'], args['vehicles'])
+    for market in resolve_markets(session, market, 'pricing'):
+        apply_price_change(session, market, target, amount, args['percent'], vehicles, args['action'].lower())
+
+def shift_price(session, args):
+    amount = float(args['amount'])
+    action = 'increase'
+    if args['sign'] == '-':
+        amount = -amount
+        action = 'decrease'
+
+    words = args['target'].split()
+    if words and words[0].lower() == 'all':
+        words = words[1:]
+    market = 'all'
+    if words and (words[0].upper() in session.config.get('pricing', {}) or words[0].lower() == 'all'):
+        market = words[0]
+        words = words[1:]
+
+    target = price_target(' '.join(words))
+    for market in resolve_markets(session, market, 'pricing'):
+        apply_price_change(session, market, target, amount, args['percent'], args['vehicles'], action)
+
+def add_feature(session, args):
+    feature = args['feature']
+    status = STATUS_CODES[args['status'].lower()] if args['status'] else 'NA'
+    if status == 'NA':
+        price = 'NA'
+    elif status == 'S':
+        price = 0
+    else:
+        price = float(args['price']) if args['price'] else 0
+
+    for market in resolve_markets(session, args['market'], 'availability'):
+        avail_data = session.config['availability'][market]
+        if feature in avail_data.get('matrix', {}):
+            session.warnings.append(f"Feature '{feature}' already exists in {market}")
+            continue
+
+        vehicles = avail_data.get('vehicles', [])
+        session.writable('availability', market, 'features').append(feature)
+        session.writable('availability', market, 'matrix')[feature] = {v: status for v in vehicles}
+
+        if market in session.config.get('pricing', {}):
+            price_vehicles = [v['id'] for v in session.config['pricing'][market].get('vehicles', [])]
+            session.writable('pricing', market, 'featurePrices')[feature] = {v: price for v in price_vehicles}
+
+        session.changes.append(f"Added '{feature}' as '{status}' in {market}")
+
+def remove_feature(session, args):
+    for market in resolve_markets(session, args['market'], 'availability'):
+        avail_data = session.config['availability'][market]
+        feature = resolve_name(avail_data.get('matrix', {}).keys(), args['feature'])
+        if feature is None:
+            session.warnings.append(f"Feature '{args['feature']}' not found in {market}")
+            continue
+
+        if feature in avail_data.get('features', []):
+            session.writable('availability', market, 'features').remove(feature)
+        del session.writable('availability', market, 'matrix')[feature]
+
+        if feature in session.config.get('pricing', {}).get(market, {}).get('featurePrices', {}):
+            del session.writable('pricing', market, 'featurePrices')[feature]
+
+        session.changes.append(f"Removed '{feature}' from {market}")
+
+def add_spec(session, args):
+    tech = session.config.get('tech')
+    if tech is None:
+        session.warnings.append('No tech data loaded')
+        return
+    param = args['param']
+    if param in tech.get('table', {}):
+        session.warnings.append(f"Spec '{param}' already exists")
+        return
+
+    value = args['value'] or 'N/A'
+    session.writable('tech', 'params').append(param)
+    session.writable('tech', 'table')[param] = {engine: value for engine in tech.get('engines', [])}
+    session.changes.append(f"Added spec '{param}'")
+
+def remove_spec(session, args):
+    table = session.config.get('tech', {}).get('table', {})
+    param = resolve_name(table.keys(), args['param'])
+    if param is None:
+        session.warnings.append(f"Spec '{args['param']}' not found")
+        return
+
+    if param in session.config['tech'].get('params', []):
+        session.writable('tech', 'params').remove(param)
+    del session.writable('tech', 'table')[param]
+    session.changes.append(f"Removed spec '{param}'")
+
+HANDLERS = {
+    'set_status': set_status,
+    'set_spec': set_spec,
+    'adjust_price': adjust_price,
+    'shift_price': shift_price,
+    'add_feature': add_feature,
+    'remove_feature': remove_feature,
+    'add_spec': add_spec,
+    'remove_spec': remove_spec
+}
+
+def apply_edit_script(config, script):
+    ops, errors = compile_script(script)
+    if errors or not ops:
+        return {
+            'success': False,
+            'error': '; '.join(errors) if errors else 'No instructions found',
+            'errors': errors,
+            'changes': []
+        }
+
+    session = EditSession(config)
+    for name, args in ops:
+        HANDLERS[name](session, args)
+
+    return {
+        'success': True,
+        'config': session.config,
+        'changes': session.changes,
+        'warnings': session.warnings
+    }
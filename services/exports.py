@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from openpyxl import Workbook
+
+from services.catalog import get_catalog
+from services.columnar import vehicle_cells
+from services.markets import get_registry
+
+# Flat (market, vehicle, feature) export of availability status, option
+# price and base price. Rows come from a generator walking the columnar model
+# one vehicle at a time, and the CSV/NDJSON writers yield a chunk per
+# vehicle, so nothing proportional to the catalog is held in memory and the
+# response starts with the first vehicle. XLSX cannot be sent before the
+# workbook is closed; it is written with openpyxl's write-only mode (which
+# streams rows to disk) into a spooled temp file that is then sent in
+# chunks.
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx')
+}
+
+COLUMNS = ['market', 'currency', 'vehicle', 'basePrice', 'feature', 'status', 'price']
+
+XLSX_SPOOL_BYTES = int(os.getenv('EXPORT_XLSX_SPOOL_BYTES', str(8 * 1024 * 1024)))
+CHUNK_BYTES = 64 * 1024
+
+def iter_vehicles(config, markets):
+    # Yields (market, currency, vehicle, base price, cells) per vehicle, where
+    # cells are the vehicle's (feature, status, price) in matrix order.
+    catalog = get_catalog(config)
+    registry = get_registry(config)
+    for market in markets:
+        market_index = catalog['markets'].get(market, {})
+        columns = market_index.get('columns')
+        if columns is None:
+            continue
+        currency = registry['markets'].get(market, registry['fallback'])['currency']
+        base_prices = market_index['basePrices']
+        for vehicle_id in market_index['vehicles']:
+            yield market, currency, vehicle_id, base_prices.get(vehicle_id), vehicle_cells(columns, vehicle_id)
+
+def iter_vehicle_rows(config, markets):
+    # Yields one list of rows per vehicle.
+    for market, currency, vehicle_id, base_price, cells in iter_vehicles(config, markets):
+        yield [[market, currency, vehicle_id, base_price, feature, status, price] for feature, status, price in cells]
+
+def stream_csv(config, markets):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for rows in iter_vehicle_rows(config, markets):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def stream_ndjson(config, markets):
+    # Same as json.dumps(dict(zip(COLUMNS, row))) per row, but the part shared
+    # by a vehicle's rows is encoded once, and feature names and statuses are
+    # encoded once per export.
+    encoded = {}
+
+    def encode(value):
+        text = encoded.get(value)
+        if text is None:
+            text = encoded[value] = json.dumps(value, ensure_ascii=False)
+        return text
+
+    for market, currency, vehicle_id, base_price, cells in iter_vehicles(config, markets):
+        head = (
+            f'{{"market": {encode(market)}, "currency": {encode(currency)}, '
+            f'"vehicle": {json.dumps(vehicle_id, ensure_ascii=False)}, "basePrice": {json.dumps(base_price)}, "feature": '
+        )
+        yield ''.join(
+            f'{head}{encode(feature)}, "status": {encode(status)}, "price": {json.dumps(price)}}}\n'
+            for feature, status, price in cells
+        )
+
+def stream_xlsx(config, markets):
+    workbook = Workbook(write_only=True)
+    sheets = {}
+    for rows in iter_vehicle_rows(config, markets):
+        market = rows[0][0] if rows else None
+        if market is None:
+            continue
+        sheet = sheets.get(market)
+        if sheet is None:
+            sheet = workbook.create_sheet(title=market[:31])
+            sheet.append(COLUMNS)
+            sheets[market] = sheet
+        for row in rows:
+            sheet.append(row)
+    if not sheets:
+        workbook.create_sheet(title='export').append(COLUMNS)
+
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_BYTES) as f:
+        workbook.save(f)
+        f.seek(0)
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+def stream_export(config, markets, export_format):
+    if export_format == 'csv':
+        return stream_csv(config, markets)
+    elif export_format == 'ndjson':
+        return stream_ndjson(config, markets)
+    return stream_xlsx(config, markets)
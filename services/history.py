@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+# Version history of saved configs. Each save is split into chunks (one per
+# market for availability and pricing, one per other top-level key), and
+# every chunk is stored once under the SHA-256 of its JSON, so versions that
+# leave a market untouched share its object on disk. A version is a small
+# tree object naming its chunks; versions.jsonl lists them in order and HEAD
+# names the tree currently published.
+HISTORY_FOLDER = os.getenv('HISTORY_FOLDER', 'data/history')
+MAX_CACHED_OBJECTS = int(os.getenv('HISTORY_CACHE_OBJECTS', '256'))
+
+PER_MARKET_SECTIONS = ('availability', 'pricing')
+
+_lock = threading.Lock()
+_objects = OrderedDict()
+
+def _now():
+    return datetime.utcnow().isoformat() + 'Z'
+
+def _object_path(digest):
+    return os.path.join(HISTORY_FOLDER, 'objects', digest[:2], digest[2:])
+
+def _write_file(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def store_object(node, stats=None):
+    # stats, if given, counts the objects and bytes this call adds.
+    text = json.dumps(node, separators=(',', ':'))
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    path = _object_path(digest)
+    if not os.path.exists(path):
+        data = zlib.compress(text.encode('utf-8'))
+        _write_file(path, data)
+        if stats is not None:
+            stats['objects'] += 1
+            stats['bytes'] += len(data)
+    return digest
+
+def load_object(digest):
+    # Objects are immutable, so parsed ones are cached and shared: two
+    # versions with the same chunk get the very same object back, which lets
+    # generate_patch() skip it by identity. Callers must not mutate them.
+    with _lock:
+        node = _objects.get(digest)
+        if node is not None:
+            _objects.move_to_end(digest)
+            return node
+
+    with open(_object_path(digest), 'rb') as f:
+        node = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+
+    with _lock:
+        _objects[digest] = node
+        while len(_objects) > MAX_CACHED_OBJECTS:
+            _objects.popitem(last=False)
+    return node
+
+def _known_chunks(tree_digest):
+    # id -> (object, digest) for the chunk objects of a stored tree, so a config
+    # assembled from it (a rollback) is re-split without hashing the chunks
+    # it still shares with that tree.
+    tree = load_object(tree_digest)
+    digests = list(tree['chunks'].values())
+    for entries in tree['markets'].values():
+        digests.extend(digest for _, digest in entries)
+    known = {}
+    for digest in digests:
+        node = load_object(digest)
+        known[id(node)] = (node, digest)
+    return known
+
+def split_config(config, known=None, stats=None):
+    known = known or {}
+
+    def store(node):
+        entry = known.get(id(node))
+        if entry is not None and entry[0] is node:
+            return entry[1]
+        return store_object(node, stats)
+
+    tree = {'keys': list(config.keys()), 'chunks': {}, 'markets': {}}
+    for key, value in config.items():
+        if key in PER_MARKET_SECTIONS and isinstance(value, dict):
+            tree['markets'][key] = [[market, store(data)] for market, data in value.items()]
+        else:
+            tree['chunks'][key] = store(value)
+    return store_object(tree, stats)
+
+def assemble(tree_digest):
+    tree = load_object(tree_digest)
+    config = {}
+    for key in tree['keys']:
+        if key in tree['markets']:
+            config[key] = {market: load_object(digest) for market, digest in tree['markets'][key]}
+        else:
+            config[key] = load_object(tree['chunks'][key])
+    return config
+
+def _versions_path():
+    return os.path.join(HISTORY_FOLDER, 'versions.jsonl')
+
+def _head_path():
+    return os.path.join(HISTORY_FOLDER, 'HEAD')
+
+def _stats_path():
+    return os.path.join(HISTORY_FOLDER, 'stats.json')
+
+def list_versions():
+    try:
+        with open(_versions_path(), 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+def get_version(revision):
+    for version in list_versions():
+        if version['revision'] == revision:
+            return version
+    return None
+
+def get_head():
+    try:
+        with open(_head_path(), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def set_head(version):
+    _write_file(_head_path(), json.dumps({'revision': version['revision'], 'tree': version['tree']}).encode('utf-8'))
+
+def record_version(config, revision, note=None, source_tree=None):
+    # Called with the config write lock held, so appends and HEAD updates from
+    # different workers cannot interleave. source_tree names the stored tree
+    # config was assembled from, if any.
+    known = _known_chunks(source_tree) if source_tree else None
+    stats = _read_stats() or _count_storage()
+    version = {
+        'revision': revision,
+        'tree': split_config(config, known, stats),
+        'savedAt': _now(),
+        'note': note
+    }
+    os.makedirs(HISTORY_FOLDER, exist_ok=True)
+    with open(_versions_path(), 'a') as f:
+        f.write(json.dumps(version) + '\n')
+    stats['versions'] += 1
+    _write_file(_stats_path(), json.dumps(stats).encode('utf-8'))
+    set_head(version)
+    return version
+
+def load_version(revision):
+    version = get_version(revision)
+    if version is None:
+        return None
+    return assemble(version['tree'])
+
+def _count_storage():
+    objects = 0
+    size = 0
+    for root, _, files in os.walk(os.path.join(HISTORY_FOLDER, 'objects')):
+        for name in files:
+            if name.startswith('.tmp-'):
+                continue
+            objects += 1
+            size += os.path.getsize(os.path.join(root, name))
+    return {
+        'versions': len(list_versions()),
+        'objects': objects,
+        'bytes': size
+    }
+
+def _read_stats():
+    try:
+        with open(_stats_path(), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def get_history_stats():
+    # record_version() keeps stats.json up to date under the write lock; a
+    # history written before it existed is counted once, on the next save.
+    return _read_stats() or _count_storage()
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Background jobs for author uploads. The worker pool is deliberately small so
+# parsing cannot take over the process serving public requests. Job state is
+# mirrored to JOBS_FOLDER so a status poll answered by another worker process
+# still finds it.
+MAX_WORKERS = int(os.getenv('UPLOAD_WORKERS', '2'))
+MAX_PENDING = int(os.getenv('UPLOAD_QUEUE_LIMIT', '20'))
+MAX_HISTORY = int(os.getenv('UPLOAD_JOB_HISTORY', '100'))
+JOBS_FOLDER = os.getenv('JOBS_FOLDER', 'data/jobs')
+
+FINISHED_STATUSES = ('succeeded', 'failed')
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='upload-job')
+_lock = threading.Lock()
+_jobs = OrderedDict()
+
+def _now():
+    return datetime.utcnow().isoformat() + 'Z'
+
+def _job_path(job_id):
+    return os.path.join(JOBS_FOLDER, f"{job_id}.json")
+
+def _persist(job):
+    try:
+        os.makedirs(JOBS_FOLDER, exist_ok=True)
+        tmp_path = _job_path(job['id']) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, _job_path(job['id']))
+    except Exception as e:
+        print(f"Error saving job state: {e}")
+
+def _snapshot(job):
+    return json.loads(json.dumps(job))
+
+def _pending_count():
+    return sum(1 for job in _jobs.values() if job['status'] not in FINISHED_STATUSES)
+
+def update_job(job, **fields):
+    with _lock:
+        job.update(fields)
+        job['updatedAt'] = _now()
+        snapshot = _snapshot(job)
+    _persist(snapshot)
+
+def report_progress(job, rows, files=None):
+    with _lock:
+        job['progress']['rows'] = rows
+        if files is not None:
+            job['progress']['files'] = files
+        job['updatedAt'] = _now()
+        snapshot = _snapshot(job)
+    _persist(snapshot)
+
+def _run(job, fn, args):
+    update_job(job, status='running', startedAt=_now())
+    try:
+        result = fn(job, *args)
+        update_job(job, status='succeeded', stage=None, result=result, finishedAt=_now())
+    except Exception as e:
+        update_job(job, status='failed', stage=None, error=str(e), finishedAt=_now())
+
+def submit_job(job_type, fn, *args, **details):
+    with _lock:
+        if _pending_count() >= MAX_PENDING:
+            return None
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'type': job_type,
+            'status': 'queued',
+            'stage': None,
+            'details': details,
+            'progress': {'rows': 0},
+            'warnings': [],
+            'result': None,
+            'error': None,
+            'createdAt': _now(),
+            'updatedAt': _now()
+        }
+        _jobs[job['id']] = job
+
+        while len(_jobs) > MAX_HISTORY:
+            oldest_id, oldest = next(iter(_jobs.items()))
+            if oldest['status'] not in FINISHED_STATUSES:
+                break
+            _jobs.pop(oldest_id)
+            try:
+                os.remove(_job_path(oldest_id))
+            except OSError:
+                pass
+
+        snapshot = _snapshot(job)
+
+    _persist(snapshot)
+    _executor.submit(_run, job, fn, args)
+    return snapshot
+
+def get_job(job_id):
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            return _snapshot(job)
+
+    if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+        return None
+
+    try:
+        with open(_job_path(job_id), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,225 @@
+import copy
+
+# RFC 6902 JSON Patch generation and application. Diffs recurse only into
+# subtrees that are not the same object, and lists are compared element by
+# element after trimming their common prefix and suffix, so the patch size
+# tracks the size of the change rather than the size of the document.
+
+class PatchError(ValueError):
+    pass
+
+def escape_token(token):
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+def unescape_token(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+def join_pointer(path, token):
+    return f"{path}/{escape_token(token)}"
+
+def split_pointer(pointer):
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise PatchError(f"Invalid JSON pointer: {pointer}")
+    return [unescape_token(token) for token in pointer[1:].split('/')]
+
+def _same(a, b):
+    return a is b or (type(a) is type(b) and not isinstance(a, (dict, list)) and a == b)
+
+def _diff(original, modified, path, patch):
+    if _same(original, modified):
+        return
+
+    if isinstance(original, dict) and isinstance(modified, dict):
+        for key in original:
+            if key not in modified:
+                patch.append({'op': 'remove', 'path': join_pointer(path, key)})
+        for key, value in modified.items():
+            if key not in original:
+                patch.append({'op': 'add', 'path': join_pointer(path, key), 'value': value})
+            else:
+                _diff(original[key], value, join_pointer(path, key), patch)
+        return
+
+    if isinstance(original, list) and isinstance(modified, list):
+        _diff_list(original, modified, path, patch)
+        return
+
+    patch.append({'op': 'replace', 'path': path, 'value': modified})
+
+def _diff_list(original, modified, path, patch):
+    start = 0
+    limit = min(len(original), len(modified))
+    while start < limit and _equal(original[start], modified[start]):
+        start += 1
+
+    end = 0
+    while end < limit - start and _equal(original[-1 - end], modified[-1 - end]):
+        end += 1
+
+    original_middle = original[start:len(original) - end]
+    modified_middle = modified[start:len(modified) - end]
+    common = min(len(original_middle), len(modified_middle))
+
+    for offset in range(common):
+        _diff(original_middle[offset], modified_middle[offset], join_pointer(path, start + offset), patch)
+
+    for offset in range(len(original_middle) - 1, common - 1, -1):
+        patch.append({'op': 'remove', 'path': join_pointer(path, start + offset)})
+
+    for offset in range(common, len(modified_middle)):
+        patch.append({'op': 'add', 'path': join_pointer(path, start + offset), 'value': modified_middle[offset]})
+
+def _equal(a, b):
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    return a == b
+
+def _json_equal(a, b):
+    # RFC 6902 'test' semantics: numbers compare by value (1 == 1.0), but
+    # booleans are literals and never equal a number.
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[key], b[key]) for key in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    return _equal(a, b)
+
+def generate_patch(original, modified):
+    patch = []
+    _diff(original, modified, '', patch)
+    return patch
+
+def resolve_pointer(document, pointer):
+    node = document
+    for token in split_pointer(pointer):
+        node = _child(node, token, pointer)
+    return node
+
+def _child(node, token, pointer):
+    if isinstance(node, dict):
+        if token not in node:
+            raise PatchError(f"Path not found: {pointer}")
+        return node[token]
+    if isinstance(node, list):
+        index = _list_index(node, token, pointer)
+        if index >= len(node):
+            raise PatchError(f"Path not found: {pointer}")
+        return node[index]
+    raise PatchError(f"Path not found: {pointer}")
+
+def _list_index(node, token, pointer, allow_end=False):
+    if token == '-' and allow_end:
+        return len(node)
+    if not token.isdigit() or (len(token) > 1 and token[0] == '0'):
+        raise PatchError(f"Invalid list index in {pointer}")
+    index = int(token)
+    if index > len(node) or (index == len(node) and not allow_end):
+        raise PatchError(f"List index out of range in {pointer}")
+    return index
+
+def _writable(node, owned):
+    # Containers copied earlier in the same apply_patch() call can be
+    # modified in place; anything else is shared with the input and copied.
+    if id(node) in owned:
+        return node
+    node = dict(node) if isinstance(node, dict) else list(node)
+    owned[id(node)] = node
+    return node
+
+def _apply_op(document, op, owned):
+    operation = op.get('op')
+    pointer = op.get('path')
+    if pointer is None:
+        raise PatchError('Patch operation is missing a path')
+
+    if operation == 'test':
+        if not _json_equal(resolve_pointer(document, pointer), op.get('value')):
+            raise PatchError(f"Test failed at {pointer}")
+        return document
+
+    if operation in ('move', 'copy'):
+        value = resolve_pointer(document, op.get('from', ''))
+        if operation == 'move':
+            document = _apply_op(document, {'op': 'remove', 'path': op['from']}, owned)
+        return _apply_op(document, {'op': 'add', 'path': pointer, 'value': copy.deepcopy(value)}, owned)
+
+    if operation not in ('add', 'remove', 'replace'):
+        raise PatchError(f"Unsupported patch operation: {operation}")
+
+    tokens = split_pointer(pointer)
+    if not tokens:
+        if operation == 'remove':
+            raise PatchError('Cannot remove the document root')
+        return op.get('value')
+
+    # Copy-on-write: only the containers along the path are copied, every
+    # untouched subtree is shared with the input document.
+    if not isinstance(document, (dict, list)):
+        raise PatchError(f"Path not found: {pointer}")
+    root = _writable(document, owned)
+    parent = root
+    for token in tokens[:-1]:
+        child = _child(parent, token, pointer)
+        if not isinstance(child, (dict, list)):
+            raise PatchError(f"Path not found: {pointer}")
+        child = _writable(child, owned)
+        if isinstance(parent, dict):
+            parent[token] = child
+        else:
+            parent[_list_index(parent, token, pointer)] = child
+        parent = child
+
+    last = tokens[-1]
+    if isinstance(parent, dict):
+        if operation in ('remove', 'replace') and last not in parent:
+            raise PatchError(f"Path not found: {pointer}")
+        if operation == 'remove':
+            del parent[last]
+        else:
+            parent[last] = op.get('value')
+    elif isinstance(parent, list):
+        if operation == 'add':
+            parent.insert(_list_index(parent, last, pointer, allow_end=True), op.get('value'))
+        elif operation == 'remove':
+            del parent[_list_index(parent, last, pointer)]
+        else:
+            parent[_list_index(parent, last, pointer)] = op.get('value')
+    else:
+        raise PatchError(f"Path not found: {pointer}")
+
+    return root
+
+def apply_patch(document, patch):
+    owned = {}
+    for op in patch:
+        if not isinstance(op, dict):
+            raise PatchError('Patch operations must be objects')
+        document = _apply_op(document, op, owned)
+    return document
+
+def describe_patch(original, patch):
+    lines = []
+    for op in patch:
+        path = '.'.join(split_pointer(op['path']))
+        if op['op'] == 'add':
+            lines.append(f"+ ADDED {path}: {op['value']}")
+        elif op['op'] == 'remove':
+            lines.append(f"- REMOVED {path}: {_describe_old(original, op['path'])}")
+        elif op['op'] == 'replace':
+            lines.append(f"~ MODIFIED {path}: {_describe_old(original, op['path'])} → {op['value']}")
+        else:
+            lines.append(f"~ {op['op'].upper()} {path}")
+    return lines
+
+def _describe_old(original, pointer):
+    try:
+        return resolve_pointer(original, pointer)
+    except PatchError:
+        return '?'
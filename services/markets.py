@@ -0,0 +1,143 @@
+import json
+import os
+import re
+import threading
+
+# Market registry: currency, symbol, number format, unit system and filename
+# aliases per market code. The built-in entries cover UK/EU/US;
+# MARKETS_FILE (a JSON object keyed by market code) adds markets or
+# overrides any field. A registry is built once per config version, and
+# every market gets its price formatter compiled up front, so formatting a
+# price is a dict lookup plus one str.format.
+MARKETS_FILE = os.getenv('MARKETS_FILE', 'data/markets.json')
+
+DEFAULT_SETTINGS = {
+    'currency': 'USD',
+    'symbol': '$',
+    'units': 'metric',
+    'decimals': 2,
+    'grouping': ',',
+    'decimal': '.',
+    'pattern': '{symbol}{amount}',
+    'aliases': []
+}
+
+DEFAULT_MARKETS = {
+    'UK': {'currency': 'GBP', 'symbol': '£', 'aliases': ['GB', 'GBR']},
+    'EU': {'currency': 'EUR', 'symbol': '€', 'aliases': ['EUR', 'EUROPE']},
+    'US': {'currency': 'USD', 'symbol': '$', 'units': 'imperial', 'aliases': ['USA']}
+}
+
+_lock = threading.Lock()
+_cached = None
+
+def make_formatter(settings):
+    number = f"{{:,.{int(settings['decimals'])}f}}".format
+    separators = str.maketrans({',': settings['grouping'], '.': settings['decimal']})
+    swap = (settings['grouping'], settings['decimal']) != (',', '.')
+    prefix, _, suffix = settings['pattern'].replace('{symbol}', settings['symbol']).partition('{amount}')
+
+    def format_amount(price):
+        if not isinstance(price, (int, float)):
+            price = 0
+        text = number(price)
+        if swap:
+            text = text.translate(separators)
+        return prefix + text + suffix
+
+    return format_amount
+
+def build_market(code, settings=None):
+    market = dict(DEFAULT_SETTINGS)
+    market.update(settings or {})
+    market['code'] = code
+    market['format'] = make_formatter(market)
+    return market
+
+def load_market_settings(path=None):
+    path = path or MARKETS_FILE
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Error loading market registry {path}: {e}")
+        return {}
+
+def build_registry(market_codes=(), settings=None):
+    merged = {code: dict(values) for code, values in DEFAULT_MARKETS.items()}
+    for code, values in (settings or {}).items():
+        merged.setdefault(code, {}).update(values)
+    for code in market_codes:
+        merged.setdefault(code, {})
+
+    markets = {code: build_market(code, values) for code, values in merged.items()}
+
+    tokens = {}
+    for code, market in markets.items():
+        for alias in [code] + list(market['aliases']):
+            tokens.setdefault(tuple(filename_tokens(alias)), code)
+
+    return {
+        'markets': markets,
+        'fallback': build_market(None),
+        'tokens': tokens,
+        'longestAlias': max((len(key) for key in tokens), default=1),
+        'gluedAliases': sorted(((key[0], code) for key, code in tokens.items() if len(key) == 1),
+                               key=lambda entry: -len(entry[0]))
+    }
+
+def get_registry(config=None):
+    # Cached by the identity of the config it was built for, like the catalog.
+    global _cached
+    cached = _cached
+    if cached is not None and (config is None or cached[0] is config):
+        return cached[1]
+
+    with _lock:
+        cached = _cached
+        if cached is not None and (config is None or cached[0] is config):
+            return cached[1]
+
+        registry = build_registry((config or {}).get('markets', []), load_market_settings())
+        if config is not None:
+            _cached = (config, registry)
+        return registry
+
+def get_market(market, registry=None):
+    registry = registry or get_registry()
+    return registry['markets'].get(market) or registry['fallback']
+
+def get_market_codes(registry=None):
+    registry = registry or get_registry()
+    return list(registry['markets'].keys())
+
+def filename_tokens(text):
+    # 'Pricing_UK-2024.xlsx' -> ['PRICING', 'UK', '2024', 'XLSX'], and
+    # 'pricingUSA' -> ['PRICING', 'USA'].
+    tokens = []
+    for word in re.findall(r'[A-Za-z]+|\d+', text):
+        tokens.extend(re.split(r'(?<=[a-z])(?=[A-Z])', word))
+    return [token.upper() for token in tokens if token]
+
+def match_market_from_filename(filename, registry=None):
+    # Whole-token matches first, so 'RUSSIA' or 'BUSINESS' never read as US.
+    # Multi-word aliases ('United States') match as consecutive tokens; the
+    # earliest match in the name wins.
+    registry = registry or get_registry()
+    tokens = filename_tokens(filename)
+    for start in range(len(tokens)):
+        for length in range(min(registry['longestAlias'], len(tokens) - start), 0, -1):
+            code = registry['tokens'].get(tuple(tokens[start:start + length]))
+            if code:
+                return code
+
+    # Fallback for an alias run into another word ('availabilityuk.xlsx',
+    # 'UKpricing.xlsx'): a token that starts or ends with one, longest alias
+    # first. Only reached when no whole token matched.
+    for token in tokens:
+        for alias, code in registry['gluedAliases']:
+            if len(token) > len(alias) and (token.startswith(alias) or token.endswith(alias)):
+                return code
+    return None
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+
+# In-process Prometheus metrics: fixed-bucket histograms and counters kept in
+# plain dicts under one lock, so recording a value is a bisect and a few
+# integer adds. Stage timings taken during a request are also collected on
+# flask.g for the Server-Timing header. Under gunicorn every worker keeps its
+# own numbers; scrape each worker, or sum them in Prometheus.
+SERVER_TIMING = os.getenv('SERVER_TIMING', '1') == '1'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    'falcon_request_duration_seconds': 'Time to build a response, by route template, method and status',
+    'falcon_stage_duration_seconds': 'Time spent in hot-path stages (config load, catalog build, payload build, encode, validate, parse)',
+    'falcon_parser_rows_total': 'Rows parsed from uploaded workbooks',
+    'falcon_parser_seconds_total': 'Time spent parsing uploaded workbooks'
+}
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def observe(name, value, **labels):
+    key = _key(name, labels)
+    slot = bisect_left(BUCKETS, value)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        histogram[0][slot] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def record_timing(stage, seconds):
+    observe('falcon_stage_duration_seconds', seconds, stage=stage)
+    if SERVER_TIMING and has_request_context():
+        timings = g.setdefault('timings', {})
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+def record_parse(file_type, rows, seconds):
+    # Rows per second is rate(falcon_parser_rows_total) / rate(falcon_parser_seconds_total).
+    inc('falcon_parser_rows_total', rows, type=file_type)
+    inc('falcon_parser_seconds_total', seconds, type=file_type)
+    record_timing('parse', seconds)
+
+@contextmanager
+def timed(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(stage, time.perf_counter() - start)
+
+def start_request():
+    g.request_start = time.perf_counter()
+
+def finish_request(response, route, method):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    observe('falcon_request_duration_seconds', elapsed, route=route, method=method, status=str(response.status_code))
+
+    if SERVER_TIMING:
+        # Streamed responses (exports) are timed up to the headers only.
+        entries = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in g.get('timings', {}).items()]
+        entries.append(f"total;dur={elapsed * 1000:.2f}")
+        response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _header(lines, name, kind, help_text):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+def render(extra=()):
+    # extra: (name, kind, help, [(labels dict, value), ...]) for values read
+    # at scrape time, such as cache hit counts.
+    with _lock:
+        histograms = {key: (list(h[0]), h[1], h[2]) for key, h in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    seen = set()
+    for (name, labels), (counts, total, count) in sorted(histograms.items()):
+        if name not in seen:
+            _header(lines, name, 'histogram', HELP.get(name, name))
+            seen.add(name)
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS + (float('inf'),), counts):
+            cumulative += bucket
+            lines.append(f"{name}_bucket{_labels(labels, [('le', _number(bound))])} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+
+    for (name, labels), value in sorted(counters.items()):
+        if name not in seen:
+            _header(lines, name, 'counter', HELP.get(name, name))
+            seen.add(name)
+        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    for name, kind, help_text, samples in extra:
+        _header(lines, name, kind, help_text)
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(sorted(labels.items()))} {_number(value)}")
+
+    return '\n'.join(lines) + '\n'
@@ -2,89 +2,262 @@ import pandas as pd
 import json
 from datetime import datetime
 import os
+from openpyxl import load_workbook
+from services.markets import match_market_from_filename
 
-def parse_availability_file(file_path):
-    df = pd.read_excel(file_path, engine='openpyxl')
-    
-    features = df.iloc[:, 0].tolist()
-    features = [f for f in features if pd.notna(f) and f != '']
-    
+# 'stream' walks the workbook row by row with openpyxl; 'pandas' loads it into
+# a DataFrame and converts it with whole-frame operations. The pandas path
+# reproduces the original parsers exactly. The stream path differs in two
+# ways, both deliberate:
+# - tech values are the cell as written ('185'), where pandas turns a numeric
+#   column with blanks into floats ('185.0');
+# - a base price column holding only whole numbers keeps its prices (18750.0),
+#   where the original check missed numpy ints and gave 0.
+PARSER_ENGINE = os.getenv('PARSER_ENGINE', 'stream')
+PROGRESS_EVERY = 1000
+
+# Cell values pandas.read_excel treats as missing by default. The streaming
+# parsers honour the same set so blank and NA cells come out the same way on
+# both paths.
+NA_VALUES = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null'
+}
+
+def is_missing(value):
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:
+        return True
+    return isinstance(value, str) and value in NA_VALUES
+
+def iter_sheet_rows(file_path):
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for row in sheet.iter_rows(values_only=True):
+            if all(is_missing(value) for value in row):
+                continue
+            yield row
+    finally:
+        workbook.close()
+
+def read_header(rows):
+    header = list(next(rows, None) or [])
+    while header and header[-1] is None:
+        header.pop()
+
+    columns = []
+    seen = {}
+    for idx, name in enumerate(header):
+        if name is None or name == '':
+            name = f"Unnamed: {idx}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+
+    return columns
+
+def split_row(row, width):
+    label = row[0] if row else None
+    values = list(row[1:width])
+    if len(values) < width - 1:
+        values.extend([None] * (width - 1 - len(values)))
+    return label, values
+
+def report_rows(progress, count, final=False):
+    if progress and (final or count % PROGRESS_EVERY == 0):
+        progress(count)
+
+def read_frame(file_path):
+    return pd.read_excel(file_path, engine='openpyxl')
+
+def frame_body(df, labels):
+    keep = (labels.notna() & (labels != '')).to_numpy()
+    return labels[keep].tolist(), df.iloc[keep, 1:]
+
+def frame_text(body, missing, strip=False):
+    text = body.astype(str)
+    if strip:
+        text = text.apply(lambda col: col.str.strip())
+    return text.where(body.notna(), missing).to_numpy(dtype=object).tolist()
+
+def availability_from_frame(df):
     vehicles = df.columns[1:].tolist()
-    
-    matrix = {}
-    for idx, feature in enumerate(features):
-        matrix[feature] = {}
-        for vehicle in vehicles:
-            value = df.iloc[idx][vehicle]
-            if pd.notna(value):
-                matrix[feature][vehicle] = str(value).strip()
-            else:
-                matrix[feature][vehicle] = "NA"
-    
+    features, body = frame_body(df, df.iloc[:, 0])
+    rows = frame_text(body, "NA", strip=True)
+
     return {
         "features": features,
         "vehicles": vehicles,
-        "matrix": matrix
+        "matrix": {feature: dict(zip(vehicles, row)) for feature, row in zip(features, rows)}
     }
 
-def parse_pricing_file(file_path, market):
-    df = pd.read_excel(file_path, engine='openpyxl')
-    
+def pricing_from_frame(df):
+    columns = df.columns[1:].tolist()
+    labels = df.iloc[:, 0]
+    is_base = (labels == 'Base Price').to_numpy()
+
     vehicles = []
-    feature_prices = {}
-    
-    for col in df.columns[1:]:
-        base_price_row = df[df.iloc[:, 0] == 'Base Price']
-        if not base_price_row.empty:
-            base_price = base_price_row[col].values[0]
-            if pd.notna(base_price):
+    if is_base.any():
+        base_row = df.iloc[is_base.argmax(), 1:]
+        for col, present, base_price in zip(columns, base_row.notna().tolist(), base_row.tolist()):
+            if present:
                 vehicles.append({
                     "id": col,
                     "basePrice": float(base_price) if isinstance(base_price, (int, float)) else 0
                 })
-    
-    for idx, row in df.iterrows():
-        feature_name = row.iloc[0]
-        if pd.notna(feature_name) and feature_name != 'Base Price':
-            feature_prices[feature_name] = {}
-            for col in df.columns[1:]:
-                value = row[col]
-                if pd.notna(value):
-                    try:
-                        feature_prices[feature_name][col] = float(value)
-                    except:
-                        feature_prices[feature_name][col] = "NA"
-                else:
-                    feature_prices[feature_name][col] = "NA"
-    
+
+    feature_names, body = frame_body(df[~is_base], labels[~is_base])
+    # float64 so integer-only columns come out as 1200.0, like float(value).
+    numeric = body.apply(lambda col: pd.to_numeric(col, errors='coerce').astype('float64'))
+    rows = numeric.astype(object).where(numeric.notna(), "NA").to_numpy(dtype=object).tolist()
+
     return {
         "vehicles": vehicles,
-        "featurePrices": feature_prices
+        "featurePrices": {feature: dict(zip(columns, row)) for feature, row in zip(feature_names, rows)}
     }
 
-def parse_tech_file(file_path):
-    df = pd.read_excel(file_path, engine='openpyxl')
-    
+def tech_from_frame(df):
     engines = df.columns[1:].tolist()
-    params = df.iloc[:, 0].tolist()
-    params = [p for p in params if pd.notna(p) and p != '']
-    
+    params, body = frame_body(df, df.iloc[:, 0])
+    rows = frame_text(body, "N/A")
+
+    return {
+        "engines": engines,
+        "params": params,
+        "table": {param: dict(zip(engines, row)) for param, row in zip(params, rows)}
+    }
+
+def parse_availability_file(file_path, engine=None, progress=None):
+    if (engine or PARSER_ENGINE) == 'pandas':
+        parsed = availability_from_frame(read_frame(file_path))
+        report_rows(progress, len(parsed['features']), final=True)
+        return parsed
+
+    rows = iter_sheet_rows(file_path)
+    columns = read_header(rows)
+    vehicles = columns[1:]
+    width = len(columns)
+
+    features = []
+    matrix = {}
+    for row in rows:
+        feature, values = split_row(row, width)
+        if is_missing(feature):
+            continue
+
+        features.append(feature)
+        matrix[feature] = {
+            vehicle: "NA" if is_missing(value) else str(value).strip()
+            for vehicle, value in zip(vehicles, values)
+        }
+        report_rows(progress, len(features))
+
+    report_rows(progress, len(features), final=True)
+
+    return {
+        "features": features,
+        "vehicles": vehicles,
+        "matrix": matrix
+    }
+
+def parse_pricing_file(file_path, market, engine=None, progress=None):
+    if (engine or PARSER_ENGINE) == 'pandas':
+        parsed = pricing_from_frame(read_frame(file_path))
+        report_rows(progress, len(parsed['featurePrices']), final=True)
+        return parsed
+
+    rows = iter_sheet_rows(file_path)
+    columns = read_header(rows)
+    price_columns = columns[1:]
+    width = len(columns)
+
+    vehicles = []
+    feature_prices = {}
+    base_price_seen = False
+
+    for row in rows:
+        feature_name, values = split_row(row, width)
+
+        if feature_name == 'Base Price':
+            if base_price_seen:
+                continue
+            base_price_seen = True
+            for col, base_price in zip(price_columns, values):
+                if not is_missing(base_price):
+                    vehicles.append({
+                        "id": col,
+                        "basePrice": float(base_price) if isinstance(base_price, (int, float)) else 0
+                    })
+            continue
+
+        if is_missing(feature_name):
+            continue
+
+        prices = {}
+        for col, value in zip(price_columns, values):
+            if is_missing(value):
+                prices[col] = "NA"
+                continue
+            try:
+                prices[col] = float(value)
+            except (TypeError, ValueError):
+                prices[col] = "NA"
+        feature_prices[feature_name] = prices
+        report_rows(progress, len(feature_prices))
+
+    report_rows(progress, len(feature_prices), final=True)
+
+    return {
+        "vehicles": vehicles,
+        "featurePrices": feature_prices
+    }
+
+def parse_tech_file(file_path, engine=None, progress=None):
+    if (engine or PARSER_ENGINE) == 'pandas':
+        parsed = tech_from_frame(read_frame(file_path))
+        report_rows(progress, len(parsed['params']), final=True)
+        return parsed
+
+    rows = iter_sheet_rows(file_path)
+    columns = read_header(rows)
+    engines = columns[1:]
+    width = len(columns)
+
+    params = []
     table = {}
-    for idx, param in enumerate(params):
-        table[param] = {}
-        for engine in engines:
-            value = df.iloc[idx][engine]
-            if pd.notna(value):
-                table[param][engine] = str(value)
-            else:
-                table[param][engine] = "N/A"
-    
+    for row in rows:
+        param, values = split_row(row, width)
+        if is_missing(param):
+            continue
+
+        params.append(param)
+        table[param] = {
+            engine: "N/A" if is_missing(value) else str(value)
+            for engine, value in zip(engines, values)
+        }
+        report_rows(progress, len(params))
+
+    report_rows(progress, len(params), final=True)
+
     return {
         "engines": engines,
         "params": params,
         "table": table
     }
 
+def parse_by_type(file_path, file_type, market=None, progress=None):
+    if file_type == 'availability':
+        return parse_availability_file(file_path, progress=progress)
+    elif file_type == 'pricing':
+        return parse_pricing_file(file_path, market, progress=progress)
+    return parse_tech_file(file_path, progress=progress)
+
 def detect_file_type(filename):
     filename_lower = filename.lower()
     if 'availability' in filename_lower or 'dummy' in filename_lower:
@@ -95,12 +268,5 @@ def detect_file_type(filename):
         return 'tech'
     return None
 
-def extract_market_from_filename(filename):
-    filename_upper = filename.upper()
-    if 'UK' in filename_upper:
-        return 'UK'
-    elif 'EU' in filename_upper:
-        return 'EU'
-    elif 'US' in filename_upper or 'USA' in filename_upper:
-        return 'US'
-    return None
+def extract_market_from_filename(filename, registry=None):
+    return match_market_from_filename(filename, registry)
@@ -1,16 +1,13 @@
-def get_currency_symbol(market):
-    symbols = {
-        'UK': '£',
-        'EU': '€',
-        'US': '$'
-    }
-    return symbols.get(market, '$')
+import numpy as np
+
+from services import columnar
+from services.markets import get_market
+
+def get_currency_symbol(market, registry=None):
+    return get_market(market, registry)['symbol']
 
-def format_price(price, market):
-    symbol = get_currency_symbol(market)
-    if isinstance(price, (int, float)):
-        return f"{symbol}{price:,.2f}"
-    return f"{symbol}0.00"
+def format_price(price, market, registry=None):
+    return get_market(market, registry)['format'](price)
 
 def calculate_total_price(base_price, selected_features, feature_prices):
     total = base_price
@@ -29,12 +26,32 @@ def calculate_total_price(base_price, selected_features, feature_prices):
         'totalPrice': total
     }
 
-def get_vehicle_base_price(vehicle_id, pricing_data):
+def index_base_prices(pricing_data):
+    base_prices = {}
+    for vehicle in pricing_data.get('vehicles', []):
+        base_prices.setdefault(vehicle['id'], vehicle.get('basePrice', 0))
+    return base_prices
+
+def get_vehicle_base_price(vehicle_id, pricing_data, base_prices=None):
+    if base_prices is not None:
+        return base_prices.get(vehicle_id, 0)
+    
     for vehicle in pricing_data.get('vehicles', []):
         if vehicle['id'] == vehicle_id:
             return vehicle.get('basePrice', 0)
     return 0
 
+def get_vehicle_feature_prices(vehicle_id, pricing_data, columns=None):
+    if columns is not None:
+        return columnar.vehicle_prices(columns, vehicle_id)
+    
+    prices = {}
+    for feature, vehicles in pricing_data.get('featurePrices', {}).items():
+        price = vehicles.get(vehicle_id)
+        if price != 'NA' and price is not None:
+            prices[feature] = price
+    return prices
+
 def get_feature_price(feature, vehicle_id, pricing_data):
     feature_prices = pricing_data.get('featurePrices', {})
     if feature in feature_prices:
@@ -43,3 +60,77 @@ def get_feature_price(feature, vehicle_id, pricing_data):
             return None
         return price
     return None
+
+def build_price_arrays(availability_data, pricing_data, columns=None):
+    # Batch quotes read the columnar model's arrays in place; only the
+    # availability vehicles and matrix features are quotable.
+    if columns is None:
+        columns = columnar.build_market_columns(availability_data, pricing_data)
+    
+    vehicle_index = columns['vehicleIndex']
+    feature_index = columns['featureIndex']
+    base_prices = index_base_prices(pricing_data)
+    base = [base_prices.get(vehicle_id, 0) for vehicle_id in columns['vehicles']]
+    
+    return {
+        'vehicleRows': {vehicle_id: vehicle_index[vehicle_id] for vehicle_id in availability_data.get('vehicles', [])},
+        'featureCols': {feature: feature_index[feature] for feature in availability_data.get('matrix', {})},
+        'basePrices': np.array([p if isinstance(p, (int, float)) else 0 for p in base], dtype=np.float64),
+        'baseIsInt': np.array([not isinstance(p, float) for p in base], dtype=bool),
+        'columns': columns
+    }
+
+def calculate_batch_totals(price_arrays, selections):
+    vehicle_rows = price_arrays['vehicleRows']
+    feature_cols = price_arrays['featureCols']
+    count = len(selections)
+    
+    rows = np.full(count, -1, dtype=np.int64)
+    unknown_feature = np.zeros(count, dtype=bool)
+    item_idx = []
+    cols = []
+    
+    for item, (vehicle_id, features) in enumerate(selections):
+        row = vehicle_rows.get(vehicle_id)
+        if row is None:
+            continue
+        rows[item] = row
+        for feature in set(features):
+            col = feature_cols.get(feature)
+            if col is None:
+                unknown_feature[item] = True
+            else:
+                item_idx.append(item)
+                cols.append(col)
+    
+    item_idx = np.array(item_idx, dtype=np.int64)
+    cols = np.array(cols, dtype=np.int64)
+    selected_rows = rows[item_idx]
+    
+    option_prices, optional, float_prices = columnar.option_cells(price_arrays['columns'], selected_rows, cols)
+    options_total = np.bincount(item_idx, weights=option_prices, minlength=count)
+    not_optional = np.bincount(item_idx, weights=(~optional).astype(np.float64), minlength=count)
+    float_options = np.bincount(item_idx, weights=float_prices.astype(np.float64), minlength=count)
+    
+    found = rows >= 0
+    base = np.zeros(count, dtype=np.float64)
+    base[found] = price_arrays['basePrices'][rows[found]]
+    base_is_int = np.ones(count, dtype=bool)
+    base_is_int[found] = price_arrays['baseIsInt'][rows[found]]
+    options_is_int = float_options == 0
+    
+    # The *IsInt flags say where calculate_total_price() would have summed
+    # only ints, so callers can return the same number types as /api/quote.
+    return {
+        'found': found,
+        'valid': found & ~unknown_feature & (not_optional == 0),
+        'basePrice': base,
+        'optionsPrice': options_total,
+        'totalPrice': base + options_total,
+        'baseIsInt': base_is_int,
+        'optionsIsInt': options_is_int,
+        'totalIsInt': base_is_int & options_is_int
+    }
+
+def quote_number(value, is_int):
+    return int(value) if is_int else value
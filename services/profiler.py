@@ -0,0 +1,155 @@
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from types import SimpleNamespace
+
+# Opt-in request profiling. A request is profiled when an author asks for it
+# (X-Profile header or ?profile=, value 'cprofile', 'sample' or 1 for
+# PROFILE_MODE) or when it falls in the PROFILE_SAMPLE_RATE fraction, which
+# always uses the stack sampler. Upload jobs started by a profiled request
+# are profiled too, as their own entry. The last PROFILE_KEEP profiles are
+# kept in memory per process.
+#
+# cProfile output is a marshalled pstats dump (load it with pstats.Stats or
+# snakeviz). It is exact but slows the profiled code down, and from Python
+# 3.12 one profiler is active per process, so a cProfile request that finds
+# one running falls back to the sampler. The sampler reads the thread's stack
+# every PROFILE_INTERVAL_MS and produces collapsed stacks for flamegraph.pl
+# or speedscope.
+PROFILE_MODES = ('cprofile', 'sample')
+PROFILE_MODE = os.getenv('PROFILE_MODE', 'cprofile')
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '20'))
+
+_lock = threading.Lock()
+_cprofile_lock = threading.Lock()
+_profiles = deque(maxlen=PROFILE_KEEP)
+
+class CProfileSession:
+    mode = 'cprofile'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        _cprofile_lock.release()
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+class StackSampler:
+    mode = 'sample'
+
+    def __init__(self, thread_id=None, interval=None):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = (interval or PROFILE_INTERVAL_MS) / 1000
+        self.stacks = Counter()
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='profile-sampler', daemon=True)
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.done.set()
+        self.thread.join()
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()).encode('utf-8')
+
+def requested_mode(args, headers):
+    value = headers.get('X-Profile') or args.get('profile')
+    if not value or value in ('0', 'false'):
+        return None
+    if value in PROFILE_MODES:
+        return value
+    return PROFILE_MODE if PROFILE_MODE in PROFILE_MODES else 'cprofile'
+
+def sampled():
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+def start(mode):
+    if mode == 'cprofile' and _cprofile_lock.acquire(blocking=False):
+        session = CProfileSession()
+        try:
+            session.start()
+        except ValueError:
+            # Another tool (a debugger or coverage) holds the profiler slot.
+            _cprofile_lock.release()
+            session = StackSampler()
+            session.start()
+    else:
+        session = StackSampler()
+        session.start()
+    session.started = time.perf_counter()
+    session.startedAt = datetime.utcnow().isoformat() + 'Z'
+    return session
+
+def stop(session, **details):
+    data = session.stop()
+    entry = {
+        'id': uuid.uuid4().hex[:12],
+        'mode': session.mode,
+        'startedAt': session.startedAt,
+        'seconds': round(time.perf_counter() - session.started, 6),
+        'bytes': len(data),
+        'details': details
+    }
+    with _lock:
+        _profiles.append((entry, data))
+    return entry['id']
+
+def wrap_job(fn, mode, **details):
+    # For submit_job: profiles the job on whichever worker thread runs it.
+    def profiled_job(job, *args):
+        session = start(mode)
+        try:
+            return fn(job, *args)
+        finally:
+            stop(session, job=job['id'], type=job['type'], **details)
+    return profiled_job
+
+def list_profiles():
+    with _lock:
+        return [dict(entry) for entry, _ in reversed(_profiles)]
+
+def get_profile(profile_id):
+    with _lock:
+        for entry, data in _profiles:
+            if entry['id'] == profile_id:
+                return dict(entry), data
+    return None, None
+
+def render_text(entry, data, limit=60):
+    if entry['mode'] == 'sample':
+        if not data:
+            return 'No samples: the request finished within one sampling interval\n'
+        lines = data.decode('utf-8').splitlines()[:limit]
+        return '\n'.join(lines) + '\n'
+
+    stream = io.StringIO()
+    dump = SimpleNamespace(stats=marshal.loads(data), create_stats=lambda: None)
+    pstats.Stats(dump, stream=stream).sort_stats('cumulative').print_stats(limit)
+    return stream.getvalue()
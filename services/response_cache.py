@@ -0,0 +1,84 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# Encoded JSON bodies for read-only endpoints, keyed by request parameters and
+# bounded by total body size. Entries belong to one config generation; the
+# whole cache is dropped as soon as a different generation is seen.
+MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_generation = None
+_size = 0
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'evictions': 0,
+    'invalidations': 0
+}
+
+def make_etag(version, body):
+    version_digest = hashlib.sha1(str(version).encode('utf-8')).hexdigest()[:8]
+    body_digest = hashlib.sha1(body).hexdigest()[:16]
+    return f"{version_digest}-{body_digest}"
+
+def _clear():
+    global _size
+    _entries.clear()
+    _size = 0
+    _stats['invalidations'] += 1
+
+def get(generation, key):
+    global _generation
+    with _lock:
+        if generation != _generation:
+            if _entries:
+                _clear()
+            _generation = generation
+
+        entry = _entries.get(key)
+        if entry is None:
+            _stats['misses'] += 1
+            return None
+
+        _entries.move_to_end(key)
+        _stats['hits'] += 1
+        return entry
+
+def put(generation, key, body, etag):
+    global _size
+    entry = (body, etag)
+    if len(body) > MAX_BYTES:
+        return entry
+
+    with _lock:
+        if generation != _generation:
+            return entry
+
+        previous = _entries.pop(key, None)
+        if previous is not None:
+            _size -= len(previous[0])
+
+        _entries[key] = entry
+        _size += len(body)
+
+        while _size > MAX_BYTES:
+            _, (evicted_body, _) = _entries.popitem(last=False)
+            _size -= len(evicted_body)
+            _stats['evictions'] += 1
+
+    return entry
+
+def invalidate():
+    with _lock:
+        _clear()
+
+def get_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats['entries'] = len(_entries)
+        stats['bytes'] = _size
+        stats['maxBytes'] = MAX_BYTES
+    return stats
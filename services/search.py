@@ -0,0 +1,213 @@
+import numpy as np
+
+from services.columnar import STATUS_STANDARD, STATUS_OPTIONAL
+from services.tech import extract_engine_from_vehicle
+
+# Inverted indexes for vehicle search in one market. Vehicles are numbered in
+# market order and every filter is a bitset over those numbers (uint64 words,
+# bit i = vehicle i). There is one bitset per (feature, status), built once
+# per config snapshot and stacked into a matrix, so feature facet counts are
+# one popcount over it. Engines are a code per vehicle (counted with
+# bincount), and base prices and numeric tech params are kept as sorted
+# arrays, so a range filter is two binary searches.
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+SORT_KEYS = ('market', 'price', '-price')
+
+def _bits(mask):
+    # Packs the last axis of a boolean array into uint64 words.
+    data = np.packbits(mask, axis=-1, bitorder='little')
+    padding = np.zeros(data.shape[:-1] + (-data.shape[-1] % 8,), dtype=np.uint8)
+    return np.ascontiguousarray(np.concatenate([data, padding], axis=-1)).view('<u8')
+
+def _mask(bits, count):
+    return np.unpackbits(bits.view(np.uint8), bitorder='little', count=count).astype(bool)
+
+def _count(bits):
+    return np.bitwise_count(bits).sum(axis=-1)
+
+def _sorted_column(values):
+    values = np.array(values, dtype=np.float64)
+    order = np.argsort(values, kind='stable')
+    numeric = int(np.count_nonzero(~np.isnan(values)))
+    return {'values': values[order][:numeric], 'order': order[:numeric]}
+
+def build_search_index(vehicles, columns, base_prices, tech_specs):
+    vehicles = list(dict.fromkeys(vehicles))
+    count = len(vehicles)
+    vehicle_index = columns['vehicleIndex']
+    rows = np.array([vehicle_index[v] for v in vehicles], dtype=np.int64)
+
+    features = [columns['features'][col] for col in columns['matrixFeatures'].tolist()]
+    codes = columns['status'][np.ix_(rows, columns['matrixFeatures'])].T
+    feature_bits = np.stack([_bits(codes == STATUS_STANDARD), _bits(codes == STATUS_OPTIONAL)], axis=1)
+
+    vehicle_engines = [extract_engine_from_vehicle(vehicle_id) for vehicle_id in vehicles]
+    engines = [engine for engine in dict.fromkeys(vehicle_engines) if engine]
+    engine_index = {engine: code for code, engine in enumerate(engines)}
+    engine_codes = np.array([engine_index.get(engine, -1) for engine in vehicle_engines], dtype=np.int64)
+
+    prices = []
+    for vehicle_id in vehicles:
+        price = base_prices.get(vehicle_id)
+        prices.append(price if isinstance(price, (int, float)) and not isinstance(price, bool) else np.nan)
+
+    specs = {}
+    for param, spec in tech_specs.items():
+        values = []
+        for engine in vehicle_engines:
+            value = spec['values'].get(engine)
+            values.append(np.nan if value is None else value)
+        column = _sorted_column(values)
+        if len(column['order']):
+            specs[param] = column
+
+    return {
+        'vehicles': vehicles,
+        'count': count,
+        'all': _bits(np.ones(count, dtype=bool)),
+        'features': features,
+        'featureIndex': {feature: col for col, feature in enumerate(features)},
+        'featureBits': feature_bits,
+        'engines': engines,
+        'engineIndex': engine_index,
+        'engineCodes': engine_codes,
+        'prices': np.array(prices, dtype=np.float64),
+        'priceColumn': _sorted_column(prices),
+        'specs': specs
+    }
+
+def _range_bits(column, count, low=None, high=None):
+    values = column['values']
+    start = 0 if low is None else int(np.searchsorted(values, low, side='left'))
+    end = len(values) if high is None else int(np.searchsorted(values, high, side='right'))
+    mask = np.zeros(count, dtype=bool)
+    mask[column['order'][start:end]] = True
+    return _bits(mask)
+
+def parse_search_args(args):
+    # Turns request args into a query dict; raises ValueError with a message
+    # fit for the client on anything malformed.
+    def number(name):
+        value = args.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number")
+
+    def spec_limits(name):
+        limits = {}
+        for item in args.getlist(name):
+            param, sep, value = item.rpartition(':')
+            if not sep or not param:
+                raise ValueError(f"{name} must look like 'Parameter:value'")
+            try:
+                limits[param] = float(value)
+            except ValueError:
+                raise ValueError(f"{name} value for {param} must be a number")
+        return limits
+
+    try:
+        page = int(args.get('page', 1))
+        per_page = int(args.get('perPage', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('page and perPage must be integers')
+
+    sort = args.get('sort', 'market')
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+
+    return {
+        'standard': args.getlist('standard'),
+        'available': args.getlist('feature'),
+        'engines': args.getlist('engine'),
+        'minPrice': number('minPrice'),
+        'maxPrice': number('maxPrice'),
+        'minSpec': spec_limits('minSpec'),
+        'maxSpec': spec_limits('maxSpec'),
+        'sort': sort,
+        'page': max(page, 1),
+        'perPage': min(max(per_page, 1), MAX_PAGE_SIZE)
+    }
+
+def match_vehicles(index, query):
+    count = index['count']
+    bits = index['all']
+
+    for feature in query['standard'] + query['available']:
+        if feature not in index['featureIndex']:
+            raise KeyError(f"Unknown feature: {feature}")
+
+    for feature in query['standard']:
+        bits = bits & index['featureBits'][index['featureIndex'][feature], 0]
+
+    for feature in query['available']:
+        statuses = index['featureBits'][index['featureIndex'][feature]]
+        bits = bits & (statuses[0] | statuses[1])
+
+    if query['engines']:
+        wanted = [index['engineIndex'][e] for e in query['engines'] if e in index['engineIndex']]
+        bits = bits & _bits(np.isin(index['engineCodes'], wanted))
+
+    if query['minPrice'] is not None or query['maxPrice'] is not None:
+        bits = bits & _range_bits(index['priceColumn'], count, query['minPrice'], query['maxPrice'])
+
+    for param in set(query['minSpec']) | set(query['maxSpec']):
+        column = index['specs'].get(param)
+        if column is None:
+            raise KeyError(f"Unknown or non-numeric parameter: {param}")
+        bits = bits & _range_bits(column, count, query['minSpec'].get(param), query['maxSpec'].get(param))
+
+    return bits
+
+def get_facets(index, bits):
+    feature_counts = _count(index['featureBits'] & bits).tolist()
+    features = {
+        feature: {'S': standard, 'O': optional}
+        for feature, (standard, optional) in zip(index['features'], feature_counts)
+    }
+
+    mask = _mask(bits, index['count'])
+    engine_codes = index['engineCodes'][mask]
+    engine_counts = np.bincount(engine_codes[engine_codes >= 0], minlength=len(index['engines']))
+    engines = {index['engines'][code]: int(engine_counts[code]) for code in np.flatnonzero(engine_counts).tolist()}
+
+    prices = index['prices'][mask]
+    prices = prices[~np.isnan(prices)]
+
+    return {
+        'features': features,
+        'engines': engines,
+        'basePrice': {
+            'min': float(prices.min()) if len(prices) else None,
+            'max': float(prices.max()) if len(prices) else None
+        }
+    }
+
+def search_vehicles(index, query):
+    bits = match_vehicles(index, query)
+    total = int(_count(bits))
+
+    mask = _mask(bits, index['count'])
+    if query['sort'] == 'market':
+        rows = np.flatnonzero(mask)
+    else:
+        # Vehicles without a numeric base price sort last either way.
+        order = index['priceColumn']['order']
+        if query['sort'] == '-price':
+            order = order[::-1]
+        unpriced = np.isnan(index['prices'])
+        rows = np.concatenate([order[mask[order]], np.flatnonzero(mask & unpriced)])
+
+    start = (query['page'] - 1) * query['perPage']
+    page_rows = rows[start:start + query['perPage']].tolist()
+
+    return {
+        'total': total,
+        'vehicles': [index['vehicles'][row] for row in page_rows],
+        'facets': get_facets(index, bits)
+    }
@@ -0,0 +1,367 @@
+import argparse
+import json
+import sqlite3
+import threading
+import uuid
+
+# Normalized SQLite storage for the config. Every availability cell, feature
+# price and tech value is its own row, so a change rewrites only the rows
+# that differ, inside one transaction. Value columns are declared without a
+# type so ints, floats and strings come back exactly as they went in, and
+# export_config() reproduces the JSON document key for key. This is a storage
+# backend only: requests never query these tables, they read the in-memory
+# snapshot loaded through export_config(), so the primary keys (which cover
+# every write and the per-market reads) are the only indexes.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lists (
+    section TEXT NOT NULL,
+    market TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name,
+    PRIMARY KEY (section, market, position)
+);
+CREATE TABLE IF NOT EXISTS rows (
+    section TEXT NOT NULL,
+    market TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (section, market, name)
+);
+CREATE TABLE IF NOT EXISTS vehicles (
+    market TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    vehicle TEXT NOT NULL,
+    base_price,
+    has_base_price INTEGER NOT NULL,
+    PRIMARY KEY (market, position)
+);
+CREATE TABLE IF NOT EXISTS availability (
+    market TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    vehicle TEXT NOT NULL,
+    status,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (market, feature, vehicle)
+);
+CREATE TABLE IF NOT EXISTS prices (
+    market TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    vehicle TEXT NOT NULL,
+    price,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (market, feature, vehicle)
+);
+CREATE TABLE IF NOT EXISTS tech_specs (
+    param TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    value,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (param, engine)
+);
+DROP INDEX IF EXISTS vehicles_market_vehicle;
+DROP INDEX IF EXISTS availability_market_vehicle;
+DROP INDEX IF EXISTS prices_market_vehicle;
+DROP INDEX IF EXISTS tech_specs_engine;
+"""
+
+# section name in `rows` -> (cell table, row column, column column, value column)
+CELL_TABLES = {
+    'availability': ('availability', 'feature', 'vehicle', 'status'),
+    'pricing': ('prices', 'feature', 'vehicle', 'price'),
+    'tech': ('tech_specs', 'param', 'engine', 'value')
+}
+
+_local = threading.local()
+
+def _identical(a, b):
+    # Like ==, but 19000 and 19000.0 differ: both must round-trip as written.
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return list(a.keys()) == list(b.keys()) and all(_identical(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_identical(x, y) for x, y in zip(a, b))
+    return a == b
+
+def connect(path):
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(SCHEMA)
+    return connection
+
+def _get_meta(connection, key, default=None):
+    row = connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+def _set_meta(connection, key, value):
+    connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+def _stamp_connection(path):
+    # read_stamp() runs on every request, so each thread keeps one read
+    # connection per database. Outside a transaction it sees every commit.
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    connection = connections.get(path)
+    if connection is None:
+        connection = connections[path] = sqlite3.connect(path, timeout=30)
+    return connection
+
+def read_stamp(path):
+    connection = _stamp_connection(path)
+    try:
+        row = connection.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+    except sqlite3.Error:
+        _local.connections.pop(path, None)
+        connection.close()
+        raise
+    if row is None:
+        raise sqlite3.DatabaseError(f"{path} has no config imported")
+    return json.loads(row[0])
+
+def is_empty(path):
+    connection = connect(path)
+    try:
+        return _get_meta(connection, 'stamp') is None
+    finally:
+        connection.close()
+
+def _write_list(connection, section, market, names):
+    connection.execute('DELETE FROM lists WHERE section = ? AND market = ?', (section, market))
+    connection.executemany(
+        'INSERT INTO lists (section, market, position, name) VALUES (?, ?, ?, ?)',
+        [(section, market, position, name) for position, name in enumerate(names)]
+    )
+
+def _read_list(connection, section, market):
+    return [row[0] for row in connection.execute(
+        'SELECT name FROM lists WHERE section = ? AND market = ? ORDER BY position', (section, market))]
+
+def _sync_list(connection, section, market, old_names, new_names):
+    if _identical(old_names, new_names):
+        return
+    _write_list(connection, section, market, new_names)
+
+def _write_cells(connection, section, market, name, cells):
+    table, row_col, col_col, value_col = CELL_TABLES[section]
+    if section == 'tech':
+        connection.execute(f"DELETE FROM {table} WHERE {row_col} = ?", (name,))
+        connection.executemany(
+            f"INSERT INTO {table} ({row_col}, {col_col}, {value_col}, position) VALUES (?, ?, ?, ?)",
+            [(name, column, value, position) for position, (column, value) in enumerate(cells.items())]
+        )
+    else:
+        connection.execute(f"DELETE FROM {table} WHERE market = ? AND {row_col} = ?", (market, name))
+        connection.executemany(
+            f"INSERT INTO {table} (market, {row_col}, {col_col}, {value_col}, position) VALUES (?, ?, ?, ?, ?)",
+            [(market, name, column, value, position) for position, (column, value) in enumerate(cells.items())]
+        )
+
+def _delete_cells(connection, section, market, name):
+    table, row_col = CELL_TABLES[section][:2]
+    if section == 'tech':
+        connection.execute(f"DELETE FROM {table} WHERE {row_col} = ?", (name,))
+    else:
+        connection.execute(f"DELETE FROM {table} WHERE market = ? AND {row_col} = ?", (market, name))
+
+def _sync_rows(connection, section, market, old_rows, new_rows):
+    # Rewrites the cells of rows that were added or changed and deletes rows
+    # that are gone; untouched rows (usually shared with the old config) cost
+    # one identity check.
+    if old_rows is new_rows:
+        return
+    old_rows = old_rows or {}
+    new_rows = new_rows or {}
+
+    for name in old_rows:
+        if name not in new_rows:
+            _delete_cells(connection, section, market, name)
+            connection.execute('DELETE FROM rows WHERE section = ? AND market = ? AND name = ?', (section, market, name))
+
+    for name, cells in new_rows.items():
+        old_cells = old_rows.get(name)
+        if old_cells is not None and _identical(old_cells, cells):
+            continue
+        _write_cells(connection, section, market, name, cells)
+
+    if list(old_rows.keys()) != list(new_rows.keys()):
+        connection.execute('DELETE FROM rows WHERE section = ? AND market = ?', (section, market))
+        connection.executemany(
+            'INSERT INTO rows (section, market, name, position) VALUES (?, ?, ?, ?)',
+            [(section, market, name, position) for position, name in enumerate(new_rows)]
+        )
+
+def _read_rows(connection, section, market):
+    table, row_col, col_col, value_col = CELL_TABLES[section]
+    rows = {}
+    for (name,) in connection.execute(
+            'SELECT name FROM rows WHERE section = ? AND market = ? ORDER BY position', (section, market)):
+        rows[name] = {}
+
+    if section == 'tech':
+        cells = connection.execute(f"SELECT {row_col}, {col_col}, {value_col} FROM {table} ORDER BY {row_col}, position")
+    else:
+        cells = connection.execute(
+            f"SELECT {row_col}, {col_col}, {value_col} FROM {table} WHERE market = ? ORDER BY {row_col}, position",
+            (market,))
+    for name, column, value in cells:
+        if name in rows:
+            rows[name][column] = value
+    return rows
+
+def _sync_vehicles(connection, market, old_vehicles, new_vehicles):
+    if _identical(old_vehicles, new_vehicles):
+        return
+    connection.execute('DELETE FROM vehicles WHERE market = ?', (market,))
+    connection.executemany(
+        'INSERT INTO vehicles (market, position, vehicle, base_price, has_base_price) VALUES (?, ?, ?, ?, ?)',
+        [(market, position, v.get('id'), v.get('basePrice'), 1 if 'basePrice' in v else 0)
+         for position, v in enumerate(new_vehicles)]
+    )
+
+def _read_vehicles(connection, market):
+    vehicles = []
+    for vehicle, base_price, has_base_price in connection.execute(
+            'SELECT vehicle, base_price, has_base_price FROM vehicles WHERE market = ? ORDER BY position', (market,)):
+        entry = {'id': vehicle}
+        if has_base_price:
+            entry['basePrice'] = base_price
+        vehicles.append(entry)
+    return vehicles
+
+def _delete_market(connection, section, market):
+    if section == 'availability':
+        connection.execute('DELETE FROM availability WHERE market = ?', (market,))
+        connection.execute("DELETE FROM lists WHERE section IN ('availability.vehicles', 'availability.features') AND market = ?", (market,))
+    else:
+        connection.execute('DELETE FROM prices WHERE market = ?', (market,))
+        connection.execute('DELETE FROM vehicles WHERE market = ?', (market,))
+    connection.execute('DELETE FROM rows WHERE section = ? AND market = ?', (section, market))
+
+def _sync(connection, old, new):
+    old = old or {}
+    _sync_list(connection, 'markets', '', old.get('markets'), new.get('markets', []))
+
+    for section in ('availability', 'pricing'):
+        old_section = old.get(section, {})
+        new_section = new.get(section, {})
+        if old_section is new_section:
+            continue
+
+        for market in old_section:
+            if market not in new_section:
+                _delete_market(connection, section, market)
+
+        for market, data in new_section.items():
+            old_data = old_section.get(market)
+            if old_data is data:
+                continue
+            old_data = old_data or {}
+            if section == 'availability':
+                _sync_list(connection, 'availability.features', market, old_data.get('features'), data.get('features', []))
+                _sync_list(connection, 'availability.vehicles', market, old_data.get('vehicles'), data.get('vehicles', []))
+                _sync_rows(connection, 'availability', market, old_data.get('matrix'), data.get('matrix', {}))
+            else:
+                _sync_vehicles(connection, market, old_data.get('vehicles'), data.get('vehicles', []))
+                _sync_rows(connection, 'pricing', market, old_data.get('featurePrices'), data.get('featurePrices', {}))
+
+        if list(old_section.keys()) != list(new_section.keys()) or not old:
+            _set_meta(connection, section, list(new_section.keys()))
+
+    old_tech = old.get('tech', {})
+    new_tech = new.get('tech', {})
+    if old_tech is not new_tech:
+        _sync_list(connection, 'tech.engines', '', old_tech.get('engines'), new_tech.get('engines', []))
+        _sync_list(connection, 'tech.params', '', old_tech.get('params'), new_tech.get('params', []))
+        _sync_rows(connection, 'tech', '', old_tech.get('table'), new_tech.get('table', {}))
+    _set_meta(connection, 'hasTech', 'tech' in new)
+
+    _set_meta(connection, 'metadata', new.get('metadata'))
+    stamp = uuid.uuid4().hex
+    _set_meta(connection, 'stamp', stamp)
+    return stamp
+
+def _clear(connection):
+    for table in ('meta', 'lists', 'rows', 'vehicles', 'availability', 'prices', 'tech_specs'):
+        connection.execute(f"DELETE FROM {table}")
+
+def import_config(path, config):
+    connection = connect(path)
+    try:
+        with connection:
+            _clear(connection)
+            return _sync(connection, None, config)
+    finally:
+        connection.close()
+
+def save_changes(path, old, new):
+    # old must be the config currently stored (normally the live snapshot);
+    # only the parts of new that differ from it are written.
+    connection = connect(path)
+    try:
+        with connection:
+            return _sync(connection, old, new)
+    finally:
+        connection.close()
+
+def export_config(path):
+    connection = connect(path)
+    try:
+        config = {'markets': _read_list(connection, 'markets', '')}
+
+        config['availability'] = {}
+        for market in _get_meta(connection, 'availability', []):
+            config['availability'][market] = {
+                'features': _read_list(connection, 'availability.features', market),
+                'vehicles': _read_list(connection, 'availability.vehicles', market),
+                'matrix': _read_rows(connection, 'availability', market)
+            }
+
+        config['pricing'] = {}
+        for market in _get_meta(connection, 'pricing', []):
+            config['pricing'][market] = {
+                'vehicles': _read_vehicles(connection, market),
+                'featurePrices': _read_rows(connection, 'pricing', market)
+            }
+
+        if _get_meta(connection, 'hasTech', True):
+            config['tech'] = {
+                'engines': _read_list(connection, 'tech.engines', ''),
+                'params': _read_list(connection, 'tech.params', ''),
+                'table': _read_rows(connection, 'tech', '')
+            }
+
+        metadata = _get_meta(connection, 'metadata')
+        if metadata is not None:
+            config['metadata'] = metadata
+
+        return config
+    finally:
+        connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Import or export the config between JSON and SQLite.')
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('json_path')
+    parser.add_argument('db_path')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        with open(args.json_path, 'r') as f:
+            import_config(args.db_path, json.load(f))
+        print(f"Imported {args.json_path} into {args.db_path}")
+    else:
+        with open(args.json_path, 'w') as f:
+            json.dump(export_config(args.db_path), f, indent=2)
+        print(f"Exported {args.db_path} to {args.json_path}")
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,30 @@
+import re
+
+from services.markets import get_market
+
+KEY_PARAMS = ['Top Speed (km/h)', '0-100 km/h (s)', 'Power (hp)', 'CO2 Emissions (g/km)']
+
+UNIT_SYSTEMS = ('metric', 'imperial')
+
+PARAM_UNIT = re.compile(r'^(.*?)\s*\(([^()]+)\)\s*$')
+
 def extract_engine_from_vehicle(vehicle_id):
     parts = vehicle_id.split('|')
     if len(parts) >= 2:
         return parts[1].strip()
     return None
 
-def get_engine_specs(engine, tech_data):
+def index_engine_specs(tech_data):
+    engine_specs = {}
+    for param, engines in tech_data.get('table', {}).items():
+        for engine, value in engines.items():
+            engine_specs.setdefault(engine, {})[param] = value
+    return engine_specs
+
+def get_engine_specs(engine, tech_data, engine_specs=None):
+    if engine_specs is not None:
+        return engine_specs.get(engine, {})
+    
     table = tech_data.get('table', {})
     specs = {}
     
@@ -14,12 +34,37 @@ def get_engine_specs(engine, tech_data):
     
     return specs
 
-def get_vehicle_specs(vehicle_id, tech_data):
+def get_vehicle_specs(vehicle_id, tech_data, engine_specs=None):
     engine = extract_engine_from_vehicle(vehicle_id)
     if not engine:
         return {}
     
-    return get_engine_specs(engine, tech_data)
+    return get_engine_specs(engine, tech_data, engine_specs)
+
+def parse_spec_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def split_param_unit(param):
+    match = PARAM_UNIT.match(param)
+    if match:
+        return match.group(1), match.group(2)
+    return param, None
+
+def parse_tech_specs(tech_data):
+    # Typed view of the tech table: the unit taken from each parameter name
+    # and every value as a float, or None where it is not a number ('N/A').
+    specs = {}
+    for param, engines in tech_data.get('table', {}).items():
+        label, unit = split_param_unit(param)
+        specs[param] = {
+            'label': label,
+            'unit': unit,
+            'values': {engine: parse_spec_number(value) for engine, value in engines.items()}
+        }
+    return specs
 
 def convert_speed_to_mph(kmh):
     try:
@@ -33,13 +78,91 @@ def convert_weight_to_lb(kg):
     except:
         return None
 
-def get_key_highlights(vehicle_id, tech_data):
-    specs = get_vehicle_specs(vehicle_id, tech_data)
-    highlights = []
+def convert_distance_to_miles(km):
+    try:
+        return float(km) * 0.621371
+    except:
+        return None
+
+def convert_torque_to_lbft(nm):
+    try:
+        return float(nm) * 0.737562
+    except:
+        return None
+
+def convert_emissions_to_g_per_mile(g_per_km):
+    try:
+        return float(g_per_km) * 1.609344
+    except:
+        return None
+
+def convert_consumption_to_mpg(l_per_100km):
+    try:
+        return 235.215 / float(l_per_100km)
+    except:
+        return None
+
+IMPERIAL_UNITS = {
+    'km/h': ('mph', convert_speed_to_mph, 0),
+    'kg': ('lb', convert_weight_to_lb, 0),
+    'km': ('miles', convert_distance_to_miles, 0),
+    'Nm': ('lb-ft', convert_torque_to_lbft, 0),
+    'g/km': ('g/mile', convert_emissions_to_g_per_mile, 0),
+    'l/100km': ('mpg', convert_consumption_to_mpg, 1)
+}
+
+def get_unit_system(market, registry=None):
+    units = get_market(market, registry)['units']
+    return units if units in UNIT_SYSTEMS else 'metric'
+
+def build_spec_view(tech_data, tech_specs, system):
+    # Display specs per engine in one unit system. Metric values are the
+    # strings from the tech sheet as they are; imperial ones are converted
+    # from the typed values and renamed, e.g. 'Top Speed (km/h)' -> 'Top
+    # Speed (mph)'. Values that are not numbers are passed through.
+    names = {}
+    specs = {}
+    for param, engines in tech_data.get('table', {}).items():
+        spec = tech_specs[param]
+        conversion = IMPERIAL_UNITS.get(spec['unit']) if system == 'imperial' else None
+        name = f"{spec['label']} ({conversion[0]})" if conversion else param
+        names[param] = name
+    
+        for engine, raw in engines.items():
+            value = spec['values'].get(engine)
+            display = raw
+            if conversion and value is not None:
+                converted = conversion[1](value)
+                if converted is not None:
+                    display = f"{converted:.{conversion[2]}f}"
+            specs.setdefault(engine, {})[name] = display
     
-    key_params = ['Top Speed (km/h)', '0-100 km/h (s)', 'Power (hp)', 'CO2 Emissions (g/km)']
+    highlights = {}
+    for engine, engine_specs in specs.items():
+        highlights[engine] = [
+            {'parameter': names[param], 'value': engine_specs[names[param]]}
+            for param in KEY_PARAMS
+            if param in names and names[param] in engine_specs and tech_data['table'][param].get(engine) != 'N/A'
+        ]
+    
+    return {
+        'system': system,
+        'names': names,
+        'specs': specs,
+        'highlights': highlights
+    }
+
+def build_spec_views(tech_data, tech_specs):
+    return {system: build_spec_view(tech_data, tech_specs, system) for system in UNIT_SYSTEMS}
+
+def get_key_highlights(vehicle_id, tech_data, engine_specs=None, view=None):
+    if view is not None:
+        return view['highlights'].get(extract_engine_from_vehicle(vehicle_id), [])
+    
+    specs = get_vehicle_specs(vehicle_id, tech_data, engine_specs)
+    highlights = []
     
-    for param in key_params:
+    for param in KEY_PARAMS:
         if param in specs and specs[param] != 'N/A':
             highlights.append({
                 'parameter': param,
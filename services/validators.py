@@ -1,94 +1,185 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from services.tech import extract_engine_from_vehicle
+
+# Per-market validation results keyed by a content hash of that market's
+# availability and pricing sections, so only markets whose data changed are
+# re-walked.
+MAX_CACHED_MARKETS = 512
+
+_lock = threading.Lock()
+_market_cache = OrderedDict()
+_stats = {
+    'marketsChecked': 0,
+    'marketsReused': 0
+}
+
+def finding(level, code, message, market=None, **details):
+    result = {
+        'level': level,
+        'code': code,
+        'market': market,
+        'message': message
+    }
+    result.update(details)
+    return result
+
+def section_hash(*sections):
+    payload = json.dumps(sections, default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def validate_market(market, avail_data, pricing_data):
+    findings = []
+
+    if avail_data is not None and pricing_data is not None:
+        avail_vehicles = set(avail_data.get('vehicles', []))
+        price_vehicle_ids = set([v['id'] for v in pricing_data.get('vehicles', [])])
+
+        if avail_vehicles != price_vehicle_ids:
+            missing_in_pricing = avail_vehicles - price_vehicle_ids
+            missing_in_avail = price_vehicle_ids - avail_vehicles
+
+            if missing_in_pricing:
+                findings.append(finding('warning', 'vehicles-missing-in-pricing',
+                                        f"Market '{market}': Vehicles in availability but not pricing: {missing_in_pricing}",
+                                        market, vehicles=sorted(missing_in_pricing)))
+            if missing_in_avail:
+                findings.append(finding('warning', 'vehicles-missing-in-availability',
+                                        f"Market '{market}': Vehicles in pricing but not availability: {missing_in_avail}",
+                                        market, vehicles=sorted(missing_in_avail)))
+
+        avail_features = set(avail_data.get('features', []))
+        price_features = set(pricing_data.get('featurePrices', {}).keys())
+
+        if avail_features != price_features:
+            missing_in_pricing = avail_features - price_features
+            missing_in_avail = price_features - avail_features
+
+            if missing_in_pricing:
+                findings.append(finding('warning', 'features-missing-in-pricing',
+                                        f"Market '{market}': Features in availability but not pricing: {missing_in_pricing}",
+                                        market, features=sorted(missing_in_pricing, key=str)))
+            if missing_in_avail:
+                findings.append(finding('warning', 'features-missing-in-availability',
+                                        f"Market '{market}': Features in pricing but not availability: {missing_in_avail}",
+                                        market, features=sorted(missing_in_avail, key=str)))
+
+    if pricing_data is not None:
+        for vehicle in pricing_data.get('vehicles', []):
+            vehicle_id = vehicle.get('id', 'unknown')
+            if 'basePrice' not in vehicle:
+                findings.append(finding('error', 'missing-base-price',
+                                        f"Market '{market}': Vehicle '{vehicle_id}' missing basePrice",
+                                        market, vehicle=vehicle_id))
+            elif not isinstance(vehicle['basePrice'], (int, float)):
+                findings.append(finding('error', 'invalid-base-price',
+                                        f"Market '{market}': Vehicle '{vehicle_id}' has invalid basePrice",
+                                        market, vehicle=vehicle_id))
+
+    if avail_data is not None and pricing_data is not None:
+        matrix = avail_data.get('matrix', {})
+        feature_prices = pricing_data.get('featurePrices', {})
+
+        for feature, vehicles in matrix.items():
+            if feature not in feature_prices:
+                continue
+            prices = feature_prices[feature]
+
+            for vehicle_id, status in vehicles.items():
+                if status == 'S':
+                    price = prices.get(vehicle_id)
+                    if price not in [0, 0.0, 'NA', None]:
+                        findings.append(finding('warning', 'standard-feature-priced',
+                                                f"Market '{market}': Feature '{feature}' is Standard for '{vehicle_id}' but has price {price}",
+                                                market, feature=feature, vehicle=vehicle_id, price=price))
+
+                elif status == 'NA':
+                    price = prices.get(vehicle_id)
+                    if price != 'NA' and price is not None:
+                        findings.append(finding('warning', 'unavailable-feature-priced',
+                                                f"Market '{market}': Feature '{feature}' is NA for '{vehicle_id}' but has price {price}",
+                                                market, feature=feature, vehicle=vehicle_id, price=price))
+
+    engines = set()
+    if avail_data is not None:
+        for vehicle_id in avail_data.get('vehicles', []):
+            engine = extract_engine_from_vehicle(vehicle_id)
+            if engine:
+                engines.add(engine)
+
+    return findings, engines
+
+def cached_validate_market(market, avail_data, pricing_data):
+    key = (market, section_hash(avail_data, pricing_data))
+
+    with _lock:
+        entry = _market_cache.get(key)
+        if entry is not None:
+            _market_cache.move_to_end(key)
+            _stats['marketsReused'] += 1
+            return entry
+
+    entry = validate_market(market, avail_data, pricing_data)
+
+    with _lock:
+        _market_cache[key] = entry
+        while len(_market_cache) > MAX_CACHED_MARKETS:
+            _market_cache.popitem(last=False)
+        _stats['marketsChecked'] += 1
+
+    return entry
+
 def validate_config(config):
-    warnings = []
-    errors = []
-    
+    findings = []
+
     markets = config.get('markets', [])
     availability = config.get('availability', {})
     pricing = config.get('pricing', {})
     tech = config.get('tech', {})
-    
+
     for market in markets:
         if market not in availability:
-            warnings.append(f"Market '{market}' missing from availability data")
+            findings.append(finding('warning', 'market-missing-availability',
+                                    f"Market '{market}' missing from availability data", market))
         if market not in pricing:
-            warnings.append(f"Market '{market}' missing from pricing data")
-    
-    for market in markets:
-        if market in availability and market in pricing:
-            avail_vehicles = set(availability[market].get('vehicles', []))
-            price_vehicle_ids = set([v['id'] for v in pricing[market].get('vehicles', [])])
-            
-            if avail_vehicles != price_vehicle_ids:
-                missing_in_pricing = avail_vehicles - price_vehicle_ids
-                missing_in_avail = price_vehicle_ids - avail_vehicles
-                
-                if missing_in_pricing:
-                    warnings.append(f"Market '{market}': Vehicles in availability but not pricing: {missing_in_pricing}")
-                if missing_in_avail:
-                    warnings.append(f"Market '{market}': Vehicles in pricing but not availability: {missing_in_avail}")
-            
-            avail_features = set(availability[market].get('features', []))
-            price_features = set(pricing[market].get('featurePrices', {}).keys())
-            
-            if avail_features != price_features:
-                missing_in_pricing = avail_features - price_features
-                missing_in_avail = price_features - avail_features
-                
-                if missing_in_pricing:
-                    warnings.append(f"Market '{market}': Features in availability but not pricing: {missing_in_pricing}")
-                if missing_in_avail:
-                    warnings.append(f"Market '{market}': Features in pricing but not availability: {missing_in_avail}")
-    
-    for market in markets:
-        if market in pricing:
-            vehicles = pricing[market].get('vehicles', [])
-            for vehicle in vehicles:
-                if 'basePrice' not in vehicle:
-                    errors.append(f"Market '{market}': Vehicle '{vehicle.get('id', 'unknown')}' missing basePrice")
-                elif not isinstance(vehicle['basePrice'], (int, float)):
-                    errors.append(f"Market '{market}': Vehicle '{vehicle.get('id', 'unknown')}' has invalid basePrice")
-    
+            findings.append(finding('warning', 'market-missing-pricing',
+                                    f"Market '{market}' missing from pricing data", market))
+
+    vehicle_engines = set()
     for market in markets:
-        if market in availability and market in pricing:
-            matrix = availability[market].get('matrix', {})
-            feature_prices = pricing[market].get('featurePrices', {})
-            
-            for feature, vehicles in matrix.items():
-                for vehicle_id, status in vehicles.items():
-                    if status == 'S':
-                        if feature in feature_prices:
-                            price = feature_prices[feature].get(vehicle_id)
-                            if price not in [0, 0.0, 'NA', None]:
-                                warnings.append(f"Market '{market}': Feature '{feature}' is Standard for '{vehicle_id}' but has price {price}")
-                    
-                    elif status == 'NA':
-                        if feature in feature_prices:
-                            price = feature_prices[feature].get(vehicle_id)
-                            if price != 'NA' and price is not None:
-                                warnings.append(f"Market '{market}': Feature '{feature}' is NA for '{vehicle_id}' but has price {price}")
-    
+        if market not in availability and market not in pricing:
+            continue
+
+        market_findings, engines = cached_validate_market(market, availability.get(market), pricing.get(market))
+        findings.extend(market_findings)
+        vehicle_engines.update(engines)
+
     tech_engines = set(tech.get('engines', []))
-    all_vehicles = set()
-    for market in markets:
-        if market in availability:
-            all_vehicles.update(availability[market].get('vehicles', []))
-    
-    vehicle_engines = set()
-    for vehicle in all_vehicles:
-        parts = vehicle.split('|')
-        if len(parts) >= 2:
-            vehicle_engines.add(parts[1].strip())
-    
     missing_engines = vehicle_engines - tech_engines
     if missing_engines:
-        warnings.append(f"Engines referenced in vehicles but missing from tech data: {missing_engines}")
-    
+        findings.append(finding('warning', 'engines-missing-in-tech',
+                                f"Engines referenced in vehicles but missing from tech data: {missing_engines}",
+                                engines=sorted(missing_engines)))
+
+    errors = [f['message'] for f in findings if f['level'] == 'error']
+    warnings = [f['message'] for f in findings if f['level'] == 'warning']
+
     return {
         'valid': len(errors) == 0,
         'warnings': warnings,
-        'errors': errors
+        'errors': errors,
+        'findings': findings
     }
 
+def get_validation_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats['cachedMarkets'] = len(_market_cache)
+    return stats
+
 def validate_base_price_exists(pricing_data):
     for vehicle in pricing_data.get('vehicles', []):
         if 'basePrice' not in vehicle:
@@ -0,0 +1,45 @@
+import pytest
+
+HATCH = 'Falcon | 1.5L | Hatch'
+SPORT = 'Falcon | 2.0L | Sport'
+
+BASE_PRICES = {'UK': 21000.0, 'EU': 24000.0, 'US': 27000.0}
+
+def make_config():
+    # A small catalog in the shape the parsers produce: three markets with
+    # the same two trims and three features, and prices that differ by market.
+    markets = list(BASE_PRICES)
+    return {
+        'markets': markets,
+        'availability': {
+            market: {
+                'features': ['Sunroof', 'Tow Bar', 'Heated Seats'],
+                'vehicles': [HATCH, SPORT],
+                'matrix': {
+                    'Sunroof': {HATCH: 'O', SPORT: 'S'},
+                    'Tow Bar': {HATCH: 'O', SPORT: 'O'},
+                    'Heated Seats': {HATCH: 'NA', SPORT: 'O'}
+                }
+            } for market in markets
+        },
+        'pricing': {
+            market: {
+                'vehicles': [{'id': HATCH, 'basePrice': base}, {'id': SPORT, 'basePrice': base + 5000}],
+                'featurePrices': {
+                    'Sunroof': {HATCH: 850.0, SPORT: 0},
+                    'Tow Bar': {HATCH: 400.0, SPORT: 400.0},
+                    'Heated Seats': {HATCH: 'NA', SPORT: 300}
+                }
+            } for market, base in BASE_PRICES.items()
+        },
+        'tech': {
+            'engines': ['1.5L', '2.0L'],
+            'params': ['Power (hp)'],
+            'table': {'Power (hp)': {'1.5L': '150', '2.0L': '250'}}
+        },
+        'metadata': {'revision': 3, 'path/with~chars': True}
+    }
+
+@pytest.fixture
+def config():
+    return make_config()
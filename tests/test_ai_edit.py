@@ -0,0 +1,43 @@
+import pytest
+
+from services.ai_edit import LocalEditClient, apply_ai_edit_scoped, apply_ai_edit_stub, build_scoped_slice, check_patch_scope, resolve_edit_scope
+from services.json_patch import generate_patch
+
+@pytest.mark.parametrize('instructions', [
+    'increase base price by 500 for all',
+    '+2% on all options',
+    'set Sunroof to NA for all Sport trims',
+    'decrease Tow Bar price by 50 for all'
+])
+def test_scoped_all_markets_edit_matches_unscoped(config, instructions):
+    scope = resolve_edit_scope(config, instructions)
+    scoped = apply_ai_edit_scoped(config, instructions, LocalEditClient(), scope)
+    unscoped = apply_ai_edit_stub(config, instructions)
+
+    assert scoped['success'] and unscoped['success']
+    expected = generate_patch(config, unscoped['config'])
+    assert expected
+    assert scoped['patch'] == expected
+    assert scoped['config'] == unscoped['config']
+
+def test_scoped_slice_lists_only_scoped_markets(config):
+    scope = resolve_edit_scope(config, 'increase base price by 500 for EU')
+    excerpt = build_scoped_slice(config, scope)
+    assert excerpt['markets'] == ['EU']
+    assert list(excerpt['pricing']) == ['EU']
+
+@pytest.mark.parametrize('instructions, sections', [
+    ("increase base price by 500 for UK, it's urgent", ['pricing']),
+    ('decrease Tow Bar price by 5% for EU', ['pricing']),
+    ('set Sunroof to S for UK', ['availability']),
+    ('set Heated Seats to n/a for all', ['availability']),
+    ('set power for 2.0L to 260', ['tech'])
+])
+def test_scope_sections(config, instructions, sections):
+    assert resolve_edit_scope(config, instructions)['sections'] == sections
+
+def test_patch_scope_allows_tech_engines(config):
+    scope = resolve_edit_scope(config, 'rename engine 2.0L to 2.0L Turbo')
+    check_patch_scope([{'op': 'replace', 'path': '/tech/engines/1', 'value': '2.0L Turbo'}], scope)
+    with pytest.raises(ValueError):
+        check_patch_scope([{'op': 'replace', 'path': '/markets/0', 'value': 'GB'}], scope)
@@ -0,0 +1,41 @@
+import copy
+
+from services.edit_rules import apply_edit_script, compile_script
+from tests.conftest import HATCH, SPORT
+
+def test_compile_script_skips_comments_and_reports_bad_lines():
+    ops, errors = compile_script('# prices\nincrease base price by 5% for UK; frobnicate\n\nremove spec Power')
+    assert [name for name, _ in ops] == ['adjust_price', 'remove_spec']
+    assert errors == ["Statement 3: could not parse 'frobnicate'"]
+
+def test_script_applies_every_statement(config):
+    result = apply_edit_script(config, 'set Sunroof to NA for UK Sport\n+10% on US options\nchange power for 2.0L to 260')
+    assert result['success']
+    edited = result['config']
+    assert edited['availability']['UK']['matrix']['Sunroof'][SPORT] == 'NA'
+    assert edited['pricing']['US']['featurePrices']['Tow Bar'][HATCH] == 440.0
+    assert edited['pricing']['US']['featurePrices']['Heated Seats'][SPORT] == 330.0
+    assert edited['pricing']['US']['featurePrices']['Sunroof'][SPORT] == 0
+    assert edited['tech']['table']['Power (hp)']['2.0L'] == '260'
+    assert len(result['changes']) == 6
+
+def test_script_does_not_mutate_its_input(config):
+    before = copy.deepcopy(config)
+    result = apply_edit_script(config, 'add Roof Rails to all as O at 300; remove Tow Bar from US; increase base price by 500 for all')
+    assert config == before
+    edited = result['config']
+    assert edited['availability']['UK']['features'] == ['Sunroof', 'Tow Bar', 'Heated Seats', 'Roof Rails']
+    assert 'Tow Bar' not in edited['pricing']['US']['featurePrices']
+    assert edited['tech'] is config['tech']
+
+def test_unmatched_names_are_reported_as_warnings(config):
+    result = apply_edit_script(config, 'set Cooled Seats to S for UK; remove spec Torque')
+    assert result['success']
+    assert result['changes'] == []
+    assert result['config'] is config
+    assert result['warnings'] == ["Feature 'Cooled Seats' not found in UK", "Spec 'Torque' not found"]
+
+def test_unparseable_script_fails(config):
+    result = apply_edit_script(config, 'make it cheaper')
+    assert not result['success']
+    assert result['changes'] == []
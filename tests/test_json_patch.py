@@ -0,0 +1,117 @@
+import copy
+
+import pytest
+
+from services.json_patch import PatchError, apply_patch, generate_patch
+from tests.conftest import HATCH, SPORT
+
+def change_price(config):
+    config['pricing']['UK']['vehicles'][1]['basePrice'] = 26500.0
+
+def edit_lists(config):
+    config['availability']['UK']['features'].insert(1, 'Roof Rails')
+    config['availability']['UK']['features'].remove('Heated Seats')
+
+def edit_keys(config):
+    del config['metadata']['path/with~chars']
+    config['metadata']['note'] = 'restored'
+    config['availability']['JP'] = {'features': [], 'vehicles': [], 'matrix': {}}
+
+def change_types(config):
+    config['metadata']['revision'] = 3.0
+    config['pricing']['UK']['featurePrices']['Sunroof'][SPORT] = 0.0
+
+def replace_root(config):
+    config.clear()
+
+@pytest.mark.parametrize('edit', [change_price, edit_lists, edit_keys, change_types, replace_root])
+def test_generated_patch_round_trips(config, edit):
+    modified = copy.deepcopy(config)
+    edit(modified)
+    result = apply_patch(config, generate_patch(config, modified))
+    assert result == modified
+    assert repr(result) == repr(modified)
+
+def test_identical_documents_give_an_empty_patch(config):
+    assert generate_patch(config, copy.deepcopy(config)) == []
+
+def test_patch_is_proportional_to_the_change(config):
+    modified = copy.deepcopy(config)
+    modified['pricing']['UK']['vehicles'][0]['basePrice'] = 20000.0
+    assert generate_patch(config, modified) == [
+        {'op': 'replace', 'path': '/pricing/UK/vehicles/0/basePrice', 'value': 20000.0}
+    ]
+
+def test_pointer_tokens_are_escaped(config):
+    modified = copy.deepcopy(config)
+    modified['metadata']['path/with~chars'] = False
+    patch = generate_patch(config, modified)
+    assert patch == [{'op': 'replace', 'path': '/metadata/path~1with~0chars', 'value': False}]
+    assert apply_patch(config, patch) == modified
+
+def test_apply_does_not_mutate_the_input(config):
+    before = copy.deepcopy(config)
+    result = apply_patch(config, [
+        {'op': 'replace', 'path': '/pricing/UK/vehicles/0/basePrice', 'value': 1.0},
+        {'op': 'add', 'path': '/availability/UK/features/-', 'value': 'Tow Hook'},
+        {'op': 'remove', 'path': '/metadata/revision'},
+        {'op': 'move', 'from': '/markets/1', 'path': '/markets/0'},
+        {'op': 'copy', 'from': '/availability/UK', 'path': '/availability/JP'}
+    ])
+    assert config == before
+    assert result['pricing']['UK']['vehicles'][0]['basePrice'] == 1.0
+    assert result['markets'] == ['EU', 'UK', 'US']
+
+def test_apply_shares_untouched_subtrees(config):
+    result = apply_patch(config, [{'op': 'replace', 'path': '/pricing/UK/vehicles/0/basePrice', 'value': 1.0}])
+    assert result is not config
+    assert result['pricing']['UK'] is not config['pricing']['UK']
+    assert result['availability'] is config['availability']
+    assert result['pricing']['EU'] is config['pricing']['EU']
+    assert result['pricing']['UK']['featurePrices'] is config['pricing']['UK']['featurePrices']
+    assert result['pricing']['UK']['vehicles'][1] is config['pricing']['UK']['vehicles'][1]
+
+def test_move(config):
+    result = apply_patch(config, [{'op': 'move', 'from': '/availability/UK/features/2', 'path': '/availability/UK/features/0'}])
+    assert result['availability']['UK']['features'] == ['Heated Seats', 'Sunroof', 'Tow Bar']
+
+    result = apply_patch(config, [{'op': 'move', 'from': '/metadata/revision', 'path': '/metadata/previousRevision'}])
+    assert 'revision' not in result['metadata']
+    assert result['metadata']['previousRevision'] == 3
+    assert config['metadata']['revision'] == 3
+
+def test_copy_does_not_alias_the_source(config):
+    result = apply_patch(config, [
+        {'op': 'copy', 'from': '/pricing/UK', 'path': '/pricing/JP'},
+        {'op': 'replace', 'path': '/pricing/JP/vehicles/0/basePrice', 'value': 19000.0}
+    ])
+    assert result['pricing']['JP']['vehicles'][0]['basePrice'] == 19000.0
+    assert result['pricing']['UK']['vehicles'][0]['basePrice'] == 21000.0
+    assert config['pricing']['UK']['vehicles'][0]['basePrice'] == 21000.0
+
+def test_test_compares_numbers_by_value(config):
+    assert apply_patch(config, [{'op': 'test', 'path': '/metadata/revision', 'value': 3.0}]) is config
+    assert apply_patch(config, [{'op': 'test', 'path': '/pricing/UK/vehicles/0', 'value': {'id': HATCH, 'basePrice': 21000}}]) is config
+
+@pytest.mark.parametrize('pointer, value', [
+    ('/metadata/revision', 4),
+    ('/metadata/revision', '3'),
+    ('/metadata/path~1with~0chars', 1),
+    ('/markets', ['UK']),
+    ('/availability/UK/features/0', 'Tow Bar')
+])
+def test_test_rejects_different_values(config, pointer, value):
+    with pytest.raises(PatchError):
+        apply_patch(config, [{'op': 'test', 'path': pointer, 'value': value}])
+
+@pytest.mark.parametrize('op', [
+    {'op': 'replace', 'path': '/pricing/JP/vehicles', 'value': []},
+    {'op': 'remove', 'path': '/availability/UK/features/3'},
+    {'op': 'add', 'path': '/availability/UK/features/01', 'value': 'x'},
+    {'op': 'remove', 'path': ''},
+    {'op': 'frobnicate', 'path': '/markets'},
+    {'op': 'add', 'path': 'markets', 'value': []}
+])
+def test_invalid_operations_raise(config, op):
+    with pytest.raises(PatchError):
+        apply_patch(config, [op])
@@ -0,0 +1,18 @@
+from services.markets import build_registry, match_market_from_filename
+
+def test_whole_tokens_match_before_glued_aliases():
+    registry = build_registry(['UK', 'EU', 'US'])
+    assert match_market_from_filename('Pricing_UK-2024.xlsx', registry) == 'UK'
+    assert match_market_from_filename('pricingUSA.xlsx', registry) == 'US'
+    assert match_market_from_filename('russia_pricing_eu.xlsx', registry) == 'EU'
+
+def test_alias_run_into_a_word_still_matches():
+    registry = build_registry(['UK', 'EU', 'US'])
+    assert match_market_from_filename('availabilityuk.xlsx', registry) == 'UK'
+    assert match_market_from_filename('UKpricing.xlsx', registry) == 'UK'
+    assert match_market_from_filename('technicalspecseu.xlsx', registry) == 'EU'
+
+def test_alias_inside_a_word_does_not_match():
+    registry = build_registry(['UK', 'EU', 'US'])
+    assert match_market_from_filename('russia_pricing.xlsx', registry) is None
+    assert match_market_from_filename('business.xlsx', registry) is None
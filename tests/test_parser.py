@@ -0,0 +1,49 @@
+from openpyxl import Workbook
+
+from services.parser import parse_availability_file, parse_pricing_file, parse_tech_file
+
+def write_sheet(path, rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+def test_stream_and_pandas_agree_on_availability(tmp_path):
+    path = write_sheet(tmp_path / 'availability_UK.xlsx', [
+        ['Feature', 'Hatch', 'Sport'],
+        ['Sunroof', 'O', ' S '],
+        [None, None, None],
+        ['Tow Bar', 'NA', None]
+    ])
+    streamed = parse_availability_file(path, engine='stream')
+    assert streamed == parse_availability_file(path, engine='pandas')
+    assert streamed['matrix'] == {'Sunroof': {'Hatch': 'O', 'Sport': 'S'}, 'Tow Bar': {'Hatch': 'NA', 'Sport': 'NA'}}
+
+def test_stream_keeps_tech_values_as_written(tmp_path):
+    # A numeric column with a blank is a float column to pandas, so the
+    # pandas path (and the original parser) gives '185.0'.
+    path = write_sheet(tmp_path / 'technical.xlsx', [
+        ['Spec', '1.5L', '2.0L'],
+        ['Power (hp)', '185', 'Petrol'],
+        ['Top Speed (km/h)', None, '240']
+    ])
+    assert parse_tech_file(path, engine='stream')['table'] == {
+        'Power (hp)': {'1.5L': '185', '2.0L': 'Petrol'},
+        'Top Speed (km/h)': {'1.5L': 'N/A', '2.0L': '240'}
+    }
+    assert parse_tech_file(path, engine='pandas')['table']['Power (hp)']['1.5L'] == '185.0'
+
+def test_stream_keeps_whole_number_base_prices(tmp_path):
+    # The original parser gave 0 for a base price column of only ints.
+    path = write_sheet(tmp_path / 'pricing_UK.xlsx', [
+        ['Feature', 'Hatch', 'Sport'],
+        ['Base Price', 18750, 24000.5],
+        ['Sunroof', 1200, 'NA'],
+        ['Tow Bar', 0, 350.5]
+    ])
+    streamed = parse_pricing_file(path, 'UK', engine='stream')
+    assert streamed['vehicles'] == [{'id': 'Hatch', 'basePrice': 18750.0}, {'id': 'Sport', 'basePrice': 24000.5}]
+    assert streamed['featurePrices'] == {'Sunroof': {'Hatch': 1200.0, 'Sport': 'NA'}, 'Tow Bar': {'Hatch': 0.0, 'Sport': 350.5}}
+    assert parse_pricing_file(path, 'UK', engine='pandas')['vehicles'][0] == {'id': 'Hatch', 'basePrice': 0}
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from services.catalog import build_market_index
+from services.pricing import calculate_batch_totals, calculate_total_price, get_vehicle_feature_prices, quote_number
+from tests.conftest import HATCH, SPORT
+
+@pytest.mark.parametrize('vehicle, features', [
+    (HATCH, []),
+    (HATCH, ['Tow Bar']),
+    (HATCH, ['Sunroof', 'Tow Bar']),
+    (SPORT, ['Heated Seats']),
+    (SPORT, ['Tow Bar', 'Heated Seats'])
+])
+def test_batch_totals_keep_single_quote_number_types(config, vehicle, features):
+    config['pricing']['UK']['vehicles'][1]['basePrice'] = 26000
+    availability_data = config['availability']['UK']
+    pricing_data = config['pricing']['UK']
+    index = build_market_index(availability_data, pricing_data)
+
+    base = next(v['basePrice'] for v in pricing_data['vehicles'] if v['id'] == vehicle)
+    single = calculate_total_price(base, features, get_vehicle_feature_prices(vehicle, pricing_data))
+
+    totals = calculate_batch_totals(index['priceArrays'], [(vehicle, features)])
+    assert totals['valid'][0]
+    batch = {
+        key: quote_number(totals[key][0].item(), totals[key.replace('Price', 'IsInt')][0].item())
+        for key in ('basePrice', 'optionsPrice', 'totalPrice')
+    }
+    assert json.dumps(batch, sort_keys=True) == json.dumps(single, sort_keys=True)